@@ -0,0 +1,303 @@
+# location: backend/benchmarks/bench_parsers.py
+# purpose: Reproducible throughput / memory benchmarks for the Takeout parsers, with baselines
+
+"""
+Runs each benchmark in a fresh subprocess (so peak RSS is per benchmark) over
+a synthetic corpus from takeout_corpus.py, and reports:
+
+- rows_per_sec: best of --repeat timed runs
+- peak_rss_mb: process high-water mark after the runs
+- alloc_peak_mb / alloc_bytes_per_row: tracemalloc peak for one extra
+  traced run (skip with --no-alloc; tracing is slow on big corpora)
+
+Baselines live in benchmarks/baselines.json keyed by "<bench>@<rows>".
+--save-baseline records the current numbers; --check exits non-zero when a
+benchmark is slower, or allocates more, than its baseline by > --tolerance.
+
+Usage (from backend/):
+    python benchmarks/bench_parsers.py --rows 100000
+    python benchmarks/bench_parsers.py --rows 100000 --bench json_parse --check
+    python benchmarks/bench_parsers.py --rows 1000000 --no-alloc --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+_HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(_HERE.parent / "src"))
+sys.path.insert(0, str(_HERE))
+
+from takeout_corpus import DEFAULT_SEED, ensure_corpus, iter_rows  # noqa: E402
+
+BASELINES_PATH = _HERE / "baselines.json"
+DEFAULT_CORPUS_DIR = _HERE / ".corpus"
+DEFAULT_TOLERANCE = 0.20
+
+# A benchmark: setup(corpus_paths, rows) -> (run() -> rows processed)
+_Setup = Callable[[Dict[str, Path], int], Callable[[], int]]
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def _bench_json_parse(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_json import parse_takeout_json_file
+
+    def run() -> int:
+        events, _ = parse_takeout_json_file(paths["json"])
+        return len(events)
+
+    return run
+
+
+def _bench_html_parse(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_html import parse_takeout_html_file
+
+    def run() -> int:
+        events, _ = parse_takeout_html_file(paths["html"])
+        return len(events)
+
+    return run
+
+
+def _event_args(rows: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "source_file": "watch-history.json",
+            "source_kind": "json",
+            "occurred_at": r["ts"],
+            "title": f"Watched {r['title']}",
+            "artist": r["artist"],
+        }
+        for r in iter_rows(rows)
+    ]
+
+
+def _bench_build_event(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_common import build_event
+
+    args = _event_args(rows)
+
+    def run() -> int:
+        for kw in args:
+            build_event(**kw)
+        return len(args)
+
+    return run
+
+
+def _bench_fingerprint_sha256(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_common import make_fingerprint
+
+    args = [
+        (a["occurred_at"], a["title"], a["artist"], a["source_file"]) for a in _event_args(rows)
+    ]
+
+    def run() -> int:
+        for ts, title, artist, src in args:
+            make_fingerprint(ts, title, artist, src)
+        return len(args)
+
+    return run
+
+
+def _bench_fingerprint_key(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_common import make_fingerprint_key, to_epoch
+
+    args = [
+        (to_epoch(a["occurred_at"]), a["title"], a["artist"], a["source_file"])
+        for a in _event_args(rows)
+    ]
+
+    def run() -> int:
+        for epoch, title, artist, src in args:
+            make_fingerprint_key(epoch, title, artist, src)
+        return len(args)
+
+    return run
+
+
+def _bench_fingerprint_batch(paths: Dict[str, Path], rows: int) -> Callable[[], int]:
+    from app.data.parsers.takeout_columnar import EventBatch
+    from app.data.parsers.takeout_common import build_event
+    from app.data.parsers.takeout_fingerprint import fingerprint_batch
+
+    batch = EventBatch.from_events(build_event(**kw) for kw in _event_args(rows))
+
+    def run() -> int:
+        return len(fingerprint_batch(batch))
+
+    return run
+
+
+BENCHMARKS: Dict[str, Tuple[Tuple[str, ...], _Setup]] = {
+    # name: (corpus files needed, setup)
+    "json_parse": (("json",), _bench_json_parse),
+    "html_parse": (("html",), _bench_html_parse),
+    "build_event": ((), _bench_build_event),
+    "fingerprint_sha256": ((), _bench_fingerprint_sha256),
+    "fingerprint_key": ((), _bench_fingerprint_key),
+    "fingerprint_batch": ((), _bench_fingerprint_batch),
+}
+
+
+# -------------------------
+# Worker (one benchmark per process)
+# -------------------------
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_worker(name: str, rows: int, corpus_dir: Path, repeat: int, alloc: bool) -> Dict[str, Any]:
+    kinds, setup = BENCHMARKS[name]
+    paths = ensure_corpus(corpus_dir, rows, kinds=kinds) if kinds else {}
+    run = setup(paths, rows)
+
+    best = float("inf")
+    processed = 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        processed = run()
+        best = min(best, time.perf_counter() - t0)
+
+    out: Dict[str, Any] = {
+        "rows": rows,
+        "processed": processed,
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best) if best > 0 else None,
+        "peak_rss_mb": round(_max_rss_mb(), 1),
+    }
+
+    if alloc:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        out["alloc_peak_mb"] = round(peak / (1024 * 1024), 1)
+        out["alloc_bytes_per_row"] = round(peak / rows) if rows else None
+
+    return out
+
+
+# -------------------------
+# Driver
+# -------------------------
+def _spawn(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker", name,
+        "--rows", str(args.rows),
+        "--repeat", str(args.repeat),
+        "--corpus-dir", str(args.corpus_dir),
+    ]
+    if args.no_alloc:
+        cmd.append("--no-alloc")
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark {name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _load_baselines() -> Dict[str, Any]:
+    try:
+        return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def _regressions(result: Dict[str, Any], base: Dict[str, Any], tolerance: float) -> List[str]:
+    out: List[str] = []
+    if base.get("rows_per_sec") and result.get("rows_per_sec"):
+        if result["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+            out.append(f"rows/sec {result['rows_per_sec']:,} vs baseline {base['rows_per_sec']:,}")
+    for key in ("alloc_peak_mb", "peak_rss_mb"):
+        if base.get(key) and result.get(key) is not None:
+            if result[key] > base[key] * (1 + tolerance):
+                out.append(f"{key} {result[key]} vs baseline {base[key]}")
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument(
+        "--bench", action="append", choices=sorted(BENCHMARKS), help="repeatable; default: all"
+    )
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    ap.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 on regressions vs baselines.json")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        result = _run_worker(
+            args.worker, args.rows, args.corpus_dir, args.repeat, not args.no_alloc
+        )
+        print(json.dumps(result))
+        return 0
+
+    # generate the corpus once up front so no benchmark times the generator
+    ensure_corpus(args.corpus_dir, args.rows, seed=DEFAULT_SEED)
+
+    baselines = _load_baselines()
+    failed = False
+    print(
+        f"{'benchmark':<20} {'rows/sec':>12} {'peak RSS MB':>12} {'alloc MB':>10} {'B/row':>8}"
+        "  vs baseline"
+    )
+
+    for name in args.bench or sorted(BENCHMARKS):
+        result = _spawn(name, args)
+        key = f"{name}@{args.rows}"
+        base = baselines.get(key, {})
+
+        delta = ""
+        if base.get("rows_per_sec"):
+            delta = f"{(result['rows_per_sec'] / base['rows_per_sec'] - 1) * 100:+.0f}%"
+        print(
+            f"{name:<20} {result['rows_per_sec']:>12,} {result['peak_rss_mb']:>12} "
+            f"{result.get('alloc_peak_mb', '-'):>10} "
+            f"{result.get('alloc_bytes_per_row', '-'):>8}  {delta}"
+        )
+
+        problems = _regressions(result, base, args.tolerance) if base else []
+        for p in problems:
+            print(f"  REGRESSION {name}: {p}")
+        failed = failed or bool(problems)
+
+        if args.save_baseline:
+            baselines[key] = {
+                **result,
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+            }
+
+    if args.save_baseline:
+        BASELINES_PATH.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+        print(f"baselines written to {BASELINES_PATH}")
+
+    return 1 if (args.check and failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
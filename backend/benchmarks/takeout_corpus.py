@@ -0,0 +1,321 @@
+# location: backend/benchmarks/takeout_corpus.py
+# purpose: Deterministic synthetic Google Takeout (YouTube history) corpus generator for benchmarks
+
+"""
+Writes realistic-looking watch-history.json / watch-history.html files of any
+size, streaming row by row (10M rows never sit in memory).
+
+Each corpus mixes the shapes real exports contain: YouTube Music plays,
+regular videos, ads, searches, removed videos, missing fields, title objects,
+ISO times with and without fractions, locale HTML times across zones, and
+messy unicode (emoji, CJK, RTL, combining marks, zero-width and narrow
+no-break spaces, HTML entities).
+
+Usage (from backend/):
+    python benchmarks/takeout_corpus.py --rows 100000 --out /tmp/corpus
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_SEED = 1234
+DEFAULT_MUSIC_RATIO = 0.35
+
+_ARTISTS = [
+    "Daft Punk", "Beyoncé", "Sigur Rós", "宇多田ヒカル", "BLACKPINK", "Motörhead",
+    "Ólafur Arnalds", "Fairuz فيروز", "Zoé", "Café Tacvba", "Mötley Crüe", "Björk",
+    "AC/DC", "Simon & Garfunkel", "Guns N' Roses", "Tame Impala", "방탄소년단", "Rosalía",
+]
+_WORDS = [
+    "love", "night", "Ünïcödé", "dreams", "fire", "夜", "heart", "🔥", "rain", "über",
+    "ça", "नमस्ते", "city", "lights", "mañana", "tokyo", "Ωmega", "blue", "été",
+    "zero\u200bwidth", "cafe\u0301", "\u200fעברית", "<3", "&", "\"quoted\"", "'single'",
+    "back\\slash",
+]
+_VIDEO_TOPICS = [
+    "How to fix a bike chain", "10 hours of rain sounds", "Minecraft speedrun",
+    "Cooking pasta carbonara", "iPhone unboxing", "Learn Python in 1 hour",
+    "Top 10 goals", "Lo-fi study session", "News update", "Reaction video",
+]
+_TITLE_SUFFIXES = [
+    "", "", "", " (Official Video)", " (Official Audio)", " [Lyric Video]", " (Live)",
+    " - Remastered 2011",
+]
+_LOCALE_ZONES = ["UTC", "PST", "PDT", "CET", "CEST", "GMT", "GMT+01:00", "JST", "EST", "BST"]
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+_SPAN_SEC = 10 * 365 * 24 * 3600
+
+# row kinds (weights are scaled so music takes music_ratio of the total)
+_OTHER_KINDS = (("video", 0.80), ("ad", 0.08), ("search", 0.06), ("removed", 0.06))
+
+
+def _title(rng: random.Random) -> str:
+    words = rng.sample(_WORDS, rng.randint(1, 4))
+    return " ".join(words).strip().title() + rng.choice(_TITLE_SUFFIXES)
+
+
+def _row_kind(rng: random.Random, music_ratio: float) -> str:
+    r = rng.random()
+    if r < music_ratio:
+        return "music"
+    r = (r - music_ratio) / (1.0 - music_ratio) if music_ratio < 1.0 else 0.0
+    acc = 0.0
+    for kind, weight in _OTHER_KINDS:
+        acc += weight
+        if r < acc:
+            return kind
+    return "video"
+
+
+def _iso_time(rng: random.Random, ts: datetime) -> str:
+    if rng.random() < 0.7:
+        return ts.strftime("%Y-%m-%dT%H:%M:%S.") + f"{rng.randint(0, 999):03d}Z"
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _locale_time(rng: random.Random, ts: datetime) -> str:
+    hour = ts.hour % 12 or 12
+    ampm = "PM" if ts.hour >= 12 else "AM"
+    # newer exports put a narrow no-break space before AM/PM
+    sep = "\u202f" if rng.random() < 0.5 else " "
+    zone = rng.choice(_LOCALE_ZONES)
+    clock = f"{hour}:{ts.minute:02d}:{ts.second:02d}{sep}{ampm}"
+    return f"{_MONTHS[ts.month - 1]} {ts.day}, {ts.year}, {clock} {zone}"
+
+
+def iter_rows(
+    rows: int, *, seed: int = DEFAULT_SEED, music_ratio: float = DEFAULT_MUSIC_RATIO
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields abstract rows (kind, title, artist, ts) newest first, like Takeout.
+    """
+    rng = random.Random(seed)
+    step = _SPAN_SEC / max(rows, 1)
+    for i in range(rows):
+        ts = _START + timedelta(seconds=int(_SPAN_SEC - i * step))
+        kind = _row_kind(rng, music_ratio)
+        if kind == "music":
+            artist = rng.choice(_ARTISTS)
+            yield {
+                "kind": kind,
+                "title": _title(rng),
+                "artist": artist + (" - Topic" if rng.random() < 0.6 else ""),
+                "video_id": f"m{i:010d}",
+                "ts": ts,
+                "music_app": rng.random() < 0.7,
+            }
+        elif kind == "video":
+            yield {
+                "kind": kind,
+                "title": f"{rng.choice(_VIDEO_TOPICS)} #{rng.randint(1, 999)}",
+                "artist": f"Channel {rng.randint(1, 5000)}",
+                "video_id": f"v{i:010d}",
+                "ts": ts,
+            }
+        else:
+            yield {
+                "kind": kind,
+                "title": _title(rng),
+                "artist": None,
+                "video_id": f"x{i:010d}",
+                "ts": ts,
+            }
+
+
+# -------------------------
+# JSON
+# -------------------------
+def _json_item(row: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    kind = row["kind"]
+    ts = _iso_time(rng, row["ts"])
+
+    if kind == "search":
+        return {
+            "header": "YouTube",
+            "title": f"Searched for {row['title']}",
+            "titleUrl": "https://www.youtube.com/results?search_query=x",
+            "time": ts,
+            "products": ["YouTube"],
+            "activityControls": ["YouTube search history"],
+        }
+    if kind == "removed":
+        return {
+            "header": "YouTube",
+            "title": "Watched a video that has been removed",
+            "time": ts,
+            "products": ["YouTube"],
+            "activityControls": ["YouTube watch history"],
+        }
+
+    music_app = kind == "music" and row.get("music_app")
+    host = "music.youtube.com" if music_app else "www.youtube.com"
+    item: Dict[str, Any] = {
+        "header": "YouTube Music" if music_app else "YouTube",
+        "title": f"Watched {row['title']}",
+        "titleUrl": f"https://{host}/watch?v={row['video_id']}",
+        "time": ts,
+        "products": ["YouTube"],
+        "activityControls": ["YouTube watch history"],
+    }
+    if row["artist"] and rng.random() < 0.97:
+        channel_url = "https://www.youtube.com/channel/UC" + row["video_id"]
+        item["subtitles"] = [{"name": row["artist"], "url": channel_url}]
+    if kind == "ad":
+        item["details"] = [{"name": "From Google Ads"}]
+    if rng.random() < 0.01:
+        # older exports occasionally nest the title
+        item["title"] = {"name": item["title"]}
+    return item
+
+
+def write_json(
+    path: Path,
+    rows: int,
+    *,
+    seed: int = DEFAULT_SEED,
+    music_ratio: float = DEFAULT_MUSIC_RATIO,
+    wrap_object: bool = False,
+) -> Path:
+    """
+    Writes a watch-history.json with `rows` items (top-level list, or {"items": [...]}).
+    """
+    rng = random.Random(seed + 1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        f.write('{"items": [' if wrap_object else "[")
+        for i, row in enumerate(iter_rows(rows, seed=seed, music_ratio=music_ratio)):
+            f.write(",\n  " if i else "\n  ")
+            # mixed escaping, like exports re-saved by different tools
+            f.write(json.dumps(_json_item(row, rng), ensure_ascii=rng.random() < 0.5))
+        f.write("\n]}" if wrap_object else "\n]")
+    return path
+
+
+# -------------------------
+# HTML
+# -------------------------
+_HTML_HEAD = (
+    "<html><head><meta charset=\"UTF-8\"><title>History</title></head><body>"
+    "<div class=\"mdl-grid\">"
+)
+_HTML_TAIL = "</div></body></html>"
+
+
+def _html_cell(row: Dict[str, Any], rng: random.Random) -> str:
+    kind = row["kind"]
+    when = _locale_time(rng, row["ts"])
+    title = html.escape(row["title"], quote=False)
+
+    if kind == "search":
+        body = f'Searched for <a href="https://www.youtube.com/results?search_query=x">{title}</a><br>{when}<br>'
+    elif kind == "removed":
+        body = f"Watched a video that has been removed<br>{when}<br>"
+    else:
+        music_app = kind == "music" and row.get("music_app")
+        host = "music.youtube.com" if music_app else "www.youtube.com"
+        body = f'Watched <a href="https://{host}/watch?v={row["video_id"]}">{title}</a><br>'
+        if row["artist"]:
+            channel = html.escape(row["artist"], quote=False)
+            body += f'<a href="https://www.youtube.com/channel/UC{row["video_id"]}">{channel}</a><br>'
+        body += f"{when}<br>"
+
+    header = "YouTube Music" if kind == "music" and row.get("music_app") else "YouTube"
+    caption = "<b>Products:</b><br>&emsp;YouTube<br>"
+    if kind == "ad":
+        caption += "<b>Details:</b><br>&emsp;From Google Ads<br>"
+
+    return (
+        '<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp">'
+        '<div class="mdl-grid">'
+        '<div class="header-cell mdl-cell mdl-cell--12-col">'
+        f'<p class="mdl-typography--title">{header}<br></p></div>'
+        f'<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1">{body}</div>'
+        '<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1'
+        ' mdl-typography--text-right"></div>'
+        '<div class="content-cell mdl-cell mdl-cell--12-col mdl-typography--caption">'
+        f'{caption}</div>'
+        "</div></div>"
+    )
+
+
+def write_html(
+    path: Path,
+    rows: int,
+    *,
+    seed: int = DEFAULT_SEED,
+    music_ratio: float = DEFAULT_MUSIC_RATIO,
+) -> Path:
+    """
+    Writes a watch-history.html with `rows` outer cells, laid out like a Takeout export.
+    """
+    rng = random.Random(seed + 2)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        f.write(_HTML_HEAD)
+        for row in iter_rows(rows, seed=seed, music_ratio=music_ratio):
+            f.write(_html_cell(row, rng))
+        f.write(_HTML_TAIL)
+    return path
+
+
+def corpus_paths(out_dir: Path, rows: int, seed: int = DEFAULT_SEED) -> Dict[str, Path]:
+    return {
+        "json": out_dir / f"watch-history-{rows}-{seed}.json",
+        "html": out_dir / f"watch-history-{rows}-{seed}.html",
+    }
+
+
+def ensure_corpus(
+    out_dir: Path,
+    rows: int,
+    *,
+    seed: int = DEFAULT_SEED,
+    music_ratio: float = DEFAULT_MUSIC_RATIO,
+    kinds: Optional[tuple] = None,
+) -> Dict[str, Path]:
+    """
+    Generates the corpus files once per (rows, seed); later calls reuse them.
+    """
+    paths = corpus_paths(out_dir, rows, seed)
+    writers = {"json": write_json, "html": write_html}
+    for kind, path in paths.items():
+        if kinds is not None and kind not in kinds:
+            continue
+        if not path.exists():
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            writers[kind](tmp, rows, seed=seed, music_ratio=music_ratio)
+            tmp.replace(path)
+    return paths
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--music-ratio", type=float, default=DEFAULT_MUSIC_RATIO)
+    ap.add_argument("--out", type=Path, default=Path(__file__).parent / ".corpus")
+    ap.add_argument("--kind", choices=("json", "html", "both"), default="both")
+    args = ap.parse_args()
+
+    kinds = ("json", "html") if args.kind == "both" else (args.kind,)
+    paths = ensure_corpus(
+        args.out, args.rows, seed=args.seed, music_ratio=args.music_ratio, kinds=kinds
+    )
+    for kind in kinds:
+        p = paths[kind]
+        print(f"{kind}: {p} ({p.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
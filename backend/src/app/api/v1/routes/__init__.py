@@ -1,6 +1,8 @@
 from app.api.v1.routes.exports import router as exports_router
 from app.api.v1.routes.health import router as health_router
 from app.api.v1.routes.imports import router as imports_router
+from app.api.v1.routes.jobs import router as jobs_router
+from app.api.v1.routes.metrics import router as metrics_router
 from app.api.v1.routes.privacy import router as privacy_router
 from app.api.v1.routes.rewind import router as rewind_router
 from app.api.v1.routes.timeline import router as timeline_router
@@ -9,6 +11,8 @@ __all__ = [
     "exports_router",
     "health_router",
     "imports_router",
+    "jobs_router",
+    "metrics_router",
     "privacy_router",
     "rewind_router",
     "timeline_router",
@@ -5,8 +5,7 @@ from typing import Any, Dict
 
 from fastapi import APIRouter, Body
 
-from app.jobs.queue import job_queue
-from app.jobs.dispatcher import dispatch_next
+from app.jobs.dispatcher import submit_job
 
 router = APIRouter(prefix="/imports", tags=["imports"])
 
@@ -14,15 +13,14 @@ router = APIRouter(prefix="/imports", tags=["imports"])
 @router.post("/start")
 def start_import(payload: Dict[str, Any] = Body(default_factory=dict)) -> Dict[str, Any]:
     """
-    V1: enqueue import job then dispatch immediately.
+    Enqueue an import job; the worker pool runs it. Returns the job id at once.
     """
     user_id = payload.get("user_id")
 
-    job_queue.enqueue(
+    job = submit_job(
         name="import",
         payload=payload,
         user_id=str(user_id) if user_id is not None else None,
     )
 
-    result = dispatch_next()
-    return {"ok": True, "job": {"name": "import"}, "result": result}
\ No newline at end of file
+    return {"ok": True, "job": {"name": "import", "job_id": job.job_id}}
\ No newline at end of file
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+import json
+from typing import Dict, Any, AsyncIterator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.jobs.queue import job_queue
-from app.jobs.dispatcher import dispatch_next
+from app.jobs.dispatcher import DEFAULT_BATCH_WORKERS, dispatch_batch, dispatch_next, submit_job
+from app.jobs.locks import lock_stats
+from app.jobs.results import RESULT_CONTENT_TYPE, load_result
+from app.jobs.retry import retry_budget
+from app.jobs.status import FINISHED_STATES, job_status
+
+# SSE: seconds between keep-alive comments while a job is quiet
+_SSE_KEEPALIVE_SEC = 15.0
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -19,7 +28,7 @@ def enqueue_enrich(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Enqueue an enrich job.
     """
-    job = job_queue.enqueue(
+    job = submit_job(
         name="enrich",
         payload=payload,
         user_id=payload.get("user_id"),
@@ -27,7 +36,7 @@ def enqueue_enrich(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     return {
         "ok": True,
-        "job_id": f"enrich-{int(job.enqueued_at)}",
+        "job_id": job.job_id,
     }
 
 
@@ -36,7 +45,7 @@ def enqueue_import(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Enqueue an import job.
     """
-    job = job_queue.enqueue(
+    job = submit_job(
         name="import",
         payload=payload,
         user_id=payload.get("user_id"),
@@ -44,7 +53,7 @@ def enqueue_import(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     return {
         "ok": True,
-        "job_id": f"import-{int(job.enqueued_at)}",
+        "job_id": job.job_id,
     }
 
 
@@ -53,7 +62,7 @@ def enqueue_export(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Enqueue an export job.
     """
-    job = job_queue.enqueue(
+    job = submit_job(
         name="export",
         payload=payload,
         user_id=payload.get("user_id"),
@@ -61,7 +70,7 @@ def enqueue_export(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     return {
         "ok": True,
-        "job_id": f"export-{int(job.enqueued_at)}",
+        "job_id": job.job_id,
     }
 
 
@@ -70,15 +79,44 @@ def enqueue_export(payload: Dict[str, Any]) -> Dict[str, Any]:
 # -------------------------
 
 @router.post("/dispatch")
-def dispatch_one() -> Dict[str, Any]:
+def dispatch_jobs(
+    batch: int = Query(1, ge=1, le=1000),
+    workers: int = Query(DEFAULT_BATCH_WORKERS, ge=1, le=64),
+) -> Dict[str, Any]:
     """
-    Dispatch exactly one job from the queue.
+    Dispatch jobs from the queue: one by default, or up to `batch` run on
+    `workers` threads (duplicate enrich jobs coalesced, see dispatch_batch).
     Intended for:
     - dev
     - cron
     - worker daemon
     """
-    return dispatch_next()
+    if batch == 1:
+        return dispatch_next()
+    return dispatch_batch(batch, max_workers=workers)
+
+
+# -------------------------
+# Results
+# -------------------------
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str) -> Response:
+    """
+    Full payload of a job whose result was too large to return inline
+    (the job result's data.result_ref points here).
+    """
+    # coalesced jobs share the result stored under the job that ran
+    st = job_status.get(job_id)
+    source = ((st or {}).get("result") or {}).get("coalesced_into") or job_id
+    try:
+        body = load_result(source)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid job_id")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="no stored result for this job")
+
+    return Response(content=body, media_type=RESULT_CONTENT_TYPE)
 
 
 # -------------------------
@@ -93,7 +131,58 @@ def jobs_health() -> Dict[str, Any]:
     return {
         "ok": True,
         "queue_depth": job_queue.size(),
+        "locks": lock_stats(),
+        "retry_budget": retry_budget.stats(),
     }
 
 
+# -------------------------
+# Status (declared last: /{job_id} would shadow the fixed paths above)
+# -------------------------
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Current state, progress and (once finished) result of a job.
+    Poll this (or stream /events) instead of re-triggering work.
+    """
+    status = job_status.get(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="unknown or expired job")
+    return {"ok": True, "job": status}
+
+
+@router.get("/{job_id}/events")
+async def stream_job_status(job_id: str) -> StreamingResponse:
+    """
+    Server-sent events: one "status" event per change until the job finishes.
+    """
+    if job_status.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="unknown or expired job")
+
+    async def _events() -> AsyncIterator[str]:
+        version = -1
+        while True:
+            status = await job_status.wait_for_change_async(
+                job_id, version, _SSE_KEEPALIVE_SEC
+            )
+            if status is None:
+                yield "event: gone\ndata: {}\n\n"
+                return
+            if status["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+
+            version = status["version"]
+            yield f"event: status\ndata: {json.dumps(status, default=str)}\n\n"
+            if status["state"] in FINISHED_STATES:
+                return
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 __all__ = ["router"]
\ No newline at end of file
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Response
+
+from app.jobs.locks import lock_stats
+from app.jobs.metrics import metrics_registry
+from app.jobs.queue import job_queue
+from app.jobs.retry import retry_budget
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics")
+def metrics() -> Response:
+    """
+    Prometheus scrape endpoint: job latency histograms and outcome
+    counters for this process, plus queue / lock / retry budget gauges.
+    """
+    budget = retry_budget.stats()
+    body = metrics_registry.render_prometheus(
+        gauges={
+            "job_queue_depth": job_queue.size(),
+            "job_lock_registry_size": lock_stats()["registry_size"],
+            "job_retry_budget_tokens": budget["tokens"],
+        }
+    )
+    return Response(content=body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,319 @@
+# location: backend/src/app/data/dedupe_index.py
+# purpose: Persistent per-user dedupe index for Takeout events (Bloom filter + sorted key segments)
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from app.data.parsers.takeout_common import TakeoutEvent
+from app.data.parsers.takeout_fingerprint import FingerprintSet, dedupe_key
+
+log = logging.getLogger(__name__)
+
+_BLOOM_HEADER = struct.Struct("<QQQ")  # bits, hashes, keys
+_SEGMENT_PREFIX = "seg-"
+_SEGMENT_SUFFIX = ".bin"
+
+
+class BloomFilter:
+    """
+    Plain bit-array Bloom filter over 64-bit keys.
+
+    Keys are already uniform hashes, so the k probe positions come from
+    double hashing the two 32-bit halves (no extra hashing per probe).
+    """
+
+    __slots__ = ("bits", "num_bits", "num_hashes", "count")
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytearray] = None) -> None:
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = 0.01) -> "BloomFilter":
+        n = max(1, capacity)
+        m = int(math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        k = int(round(m / n * math.log(2)))
+        return cls(m, k)
+
+    def add(self, key: int) -> None:
+        bits, m = self.bits, self.num_bits
+        p = key & 0xFFFFFFFF
+        step = (key >> 32) | 1
+        for _ in range(self.num_hashes):
+            p %= m
+            bits[p >> 3] |= 1 << (p & 7)
+            p += step
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        bits, m = self.bits, self.num_bits
+        p = key & 0xFFFFFFFF
+        step = (key >> 32) | 1
+        for _ in range(self.num_hashes):
+            p %= m
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+            p += step
+        return True
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BloomFilter":
+        data = path.read_bytes()
+        num_bits, num_hashes, count = _BLOOM_HEADER.unpack_from(data)
+        bits = bytearray(data[_BLOOM_HEADER.size:])
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"Corrupt bloom file: {path}")
+        bloom = cls(num_bits, num_hashes, bits)
+        bloom.count = count
+        return bloom
+
+
+class _Segment:
+    """
+    One immutable, sorted uint64 key file, memory-mapped for binary search.
+    """
+
+    __slots__ = ("path", "_file", "_mmap", "keys")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.keys = memoryview(self._mmap).cast("Q")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: int) -> bool:
+        keys = self.keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def close(self) -> None:
+        self.keys.release()
+        self._mmap.close()
+        self._file.close()
+
+
+class DedupeIndex:
+    """
+    Per-user set of every event key ever imported, persisted on disk.
+
+    Layout under <root>/<user hash>/:
+    - seg-NNNNNN.bin: sorted uint64 keys, one file per committed import
+    - bloom.bin: Bloom filter over all committed keys
+
+    Lookups hit the in-memory Bloom filter first; only probable hits binary
+    search the (mmap'd) segments. A re-import therefore costs time in the
+    number of events it streams plus one small segment write, not in the size
+    of the whole history. Segments are merged once there are more than
+    max_segments of them.
+
+    Not safe for concurrent writers on the same user; callers serialize
+    imports per user (JobLock).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        user_id: str,
+        *,
+        fp_rate: float = 0.01,
+        max_segments: int = 8,
+        key_fn: Callable[[TakeoutEvent], int] = dedupe_key,
+    ) -> None:
+        self.dir = root / hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:32]
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.fp_rate = fp_rate
+        self.max_segments = max_segments
+        self.key_fn = key_fn
+
+        self._segments: List[_Segment] = [_Segment(p) for p in self._segment_paths()]
+        self._pending = FingerprintSet()
+        self._bloom = self._load_bloom()
+
+    # -------------------------
+    # Files
+    # -------------------------
+    def _segment_paths(self) -> List[Path]:
+        paths = sorted(self.dir.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"))
+        # empty segments can't be mmap'd and carry no keys
+        return [p for p in paths if p.stat().st_size > 0]
+
+    def _next_segment_path(self) -> Path:
+        last = 0
+        for p in self.dir.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"):
+            try:
+                last = max(last, int(p.name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+        return self.dir / f"{_SEGMENT_PREFIX}{last + 1:06d}{_SEGMENT_SUFFIX}"
+
+    @property
+    def _bloom_path(self) -> Path:
+        return self.dir / "bloom.bin"
+
+    def _committed_count(self) -> int:
+        return sum(len(s) for s in self._segments)
+
+    def _load_bloom(self) -> BloomFilter:
+        committed = self._committed_count()
+        try:
+            bloom = BloomFilter.load(self._bloom_path)
+            if bloom.count == committed:
+                return bloom
+            log.warning("dedupe bloom out of date for %s, rebuilding", self.dir)
+        except FileNotFoundError:
+            pass
+        except (ValueError, struct.error) as e:
+            log.warning("dedupe bloom unreadable for %s, rebuilding: %s", self.dir, e)
+        return self._rebuild_bloom(extra_capacity=committed)
+
+    def _rebuild_bloom(self, *, extra_capacity: int = 0) -> BloomFilter:
+        # leave headroom so the next imports don't push the FP rate up right away
+        committed = self._committed_count()
+        bloom = BloomFilter.for_capacity(committed + max(extra_capacity, 100_000), self.fp_rate)
+        for seg in self._segments:
+            for key in seg.keys:
+                bloom.add(key)
+        return bloom
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def __len__(self) -> int:
+        return self._committed_count() + len(self._pending)
+
+    def __contains__(self, key: int) -> bool:
+        if key in self._pending:
+            return True
+        if key not in self._bloom:
+            return False
+        return any(key in seg for seg in self._segments)
+
+    def add(self, key: int) -> bool:
+        """
+        Records key; returns True if it had never been seen for this user.
+        """
+        if key in self:
+            return False
+        self._pending.add(key)
+        return True
+
+    def filter_new(self, events: Iterable[TakeoutEvent]) -> Iterator[TakeoutEvent]:
+        """
+        Streams through only events not seen in earlier imports (or earlier in this stream).
+        Keys are staged in memory until commit().
+        """
+        key_fn = self.key_fn
+        for ev in events:
+            if self.add(key_fn(ev)):
+                yield ev
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def commit(self) -> int:
+        """
+        Persists keys added since the last commit as a new sorted segment.
+        Returns the number of keys written.
+        """
+        if not len(self._pending):
+            return 0
+
+        keys = array("Q", sorted(self._pending))
+        path = self._next_segment_path()
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            keys.tofile(f)
+        os.replace(tmp, path)
+
+        self._segments.append(_Segment(path))
+        self._pending = FingerprintSet()
+
+        if self._bloom_overfull(extra=len(keys)):
+            # resize once instead of filling the old filter and rebuilding it
+            self._bloom = self._rebuild_bloom(extra_capacity=self._committed_count())
+        else:
+            for key in keys:
+                self._bloom.add(key)
+
+        if len(self._segments) > self.max_segments:
+            self.compact()
+
+        self._bloom.save(self._bloom_path)
+        return len(keys)
+
+    def _bloom_overfull(self, *, extra: int = 0) -> bool:
+        # past ~2x design capacity the false-positive rate climbs quickly
+        capacity = self._bloom.num_bits * (math.log(2) ** 2) / -math.log(self.fp_rate)
+        return self._bloom.count + extra > 2 * capacity
+
+    def compact(self) -> None:
+        """
+        Merges all segments into one (streaming k-way merge, duplicates dropped).
+        """
+        if len(self._segments) <= 1:
+            return
+
+        path = self._next_segment_path()
+        tmp = path.with_suffix(".tmp")
+        out = array("Q")
+        last: Optional[int] = None
+        with open(tmp, "wb") as f:
+            for key in merge(*(seg.keys for seg in self._segments)):
+                if key == last:
+                    continue
+                last = key
+                out.append(key)
+                if len(out) >= 1 << 16:
+                    out.tofile(f)
+                    out = array("Q")
+            out.tofile(f)
+        os.replace(tmp, path)
+
+        old = self._segments
+        self._segments = [_Segment(path)]
+        for seg in old:
+            seg.close()
+            seg.path.unlink()
+        # same key set as before, so the Bloom filter stays valid
+
+    def close(self) -> None:
+        for seg in self._segments:
+            seg.close()
+        self._segments = []
+
+    def __enter__(self) -> "DedupeIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def open_dedupe_index(user_id: str, **kwargs) -> DedupeIndex:
+    """
+    Opens the index for a user under DEDUPE_INDEX_PATH (default data/dedupe).
+    """
+    root = Path(os.getenv("DEDUPE_INDEX_PATH", "data/dedupe"))
+    return DedupeIndex(root, user_id, **kwargs)
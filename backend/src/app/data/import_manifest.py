@@ -0,0 +1,316 @@
+# location: backend/src/app/data/import_manifest.py
+# purpose: Per-user file manifest: re-imports skip unchanged Takeout files, tail-parse grown JSON
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.data.parsers.takeout_common import (
+    FP_SHA256,
+    RAW_OFF,
+    OpenHook,
+    ParseReport,
+    TakeoutEvent,
+    TakeoutParseError,
+    iter_takeout_files,
+    open_takeout_text,
+)
+from app.data.parsers.takeout_filter import MusicRowFilter
+from app.data.parsers.takeout_html import iter_takeout_html_stream
+from app.data.parsers.takeout_json import JsonCheckpoint, iter_takeout_json_stream
+
+log = logging.getLogger(__name__)
+
+# What to do with a file on this import
+PLAN_SKIP = "skip"  # content unchanged since the last import
+PLAN_TAIL = "tail"  # JSON that only grew past the last resume offset
+PLAN_FULL = "full"  # new or rewritten file
+
+_MANIFEST_VERSION = 1
+_HASH_BLOCK = 1 << 20
+
+
+@dataclass
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    sha256: str
+    count: int
+    errors: List[str] = field(default_factory=list)
+    # JSON only: byte offset past the last parsed item + hash of the bytes before it
+    resume_offset: int = 0
+    prefix_sha256: Optional[str] = None
+
+
+@dataclass
+class FilePlan:
+    path: Path
+    key: str
+    action: str
+    size: int
+    mtime_ns: int
+    sha256: str  # "" when skipped on the size/mtime fast path
+    start_offset: int = 0
+
+
+def _hash_file(path: Path, *, prefix_len: int = 0) -> Tuple[str, Optional[str]]:
+    """
+    sha256 of the whole file, plus of its first prefix_len bytes (one read pass).
+    """
+    h = hashlib.sha256()
+    prefix: Optional[str] = None
+    done = 0
+    with path.open("rb") as f:
+        while True:
+            block = f.read(_HASH_BLOCK)
+            if not block:
+                break
+            if prefix is None and prefix_len and done + len(block) >= prefix_len:
+                h.update(block[:prefix_len - done])
+                prefix = h.copy().hexdigest()
+                h.update(block[prefix_len - done:])
+            else:
+                h.update(block)
+            done += len(block)
+    return h.hexdigest(), prefix
+
+
+def _hash_prefix(path: Path, length: int) -> str:
+    h = hashlib.sha256()
+    left = length
+    with path.open("rb") as f:
+        while left > 0:
+            block = f.read(min(_HASH_BLOCK, left))
+            if not block:
+                break
+            h.update(block)
+            left -= len(block)
+    return h.hexdigest()
+
+
+class ImportManifest:
+    """
+    Remembers, per file key, what the last import saw: size, mtime, content
+    hash, parse report and (for JSON) where the item array ended.
+
+    - size + mtime unchanged: skipped without reading the file
+    - same content hash: skipped after one hashing pass (much cheaper than parsing)
+    - JSON whose bytes before the stored resume offset are unchanged: only
+      items past that offset are parsed (append-only exports)
+    - anything else: parsed in full
+
+    Entries are staged by record() and only hit disk on save(), so a failed
+    import leaves the previous manifest in place.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = self._load()
+
+    def _load(self) -> Dict[str, ManifestEntry]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning("import manifest unreadable, starting fresh: %s (%s)", self.path, e)
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != _MANIFEST_VERSION:
+            return {}
+
+        entries: Dict[str, ManifestEntry] = {}
+        for key, raw in (data.get("files") or {}).items():
+            try:
+                entries[key] = ManifestEntry(**raw)
+            except TypeError:
+                continue
+        return entries
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": _MANIFEST_VERSION,
+            "files": {k: asdict(v) for k, v in sorted(self.entries.items())},
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def plan_file(self, path: Path, key: str) -> FilePlan:
+        st = path.stat()
+        prev = self.entries.get(key)
+
+        if prev is None:
+            return FilePlan(path, key, PLAN_FULL, st.st_size, st.st_mtime_ns, "")
+
+        if prev.size == st.st_size and prev.mtime_ns == st.st_mtime_ns:
+            return FilePlan(path, key, PLAN_SKIP, st.st_size, st.st_mtime_ns, prev.sha256)
+
+        can_tail = (
+            path.suffix.lower() == ".json"
+            and prev.resume_offset > 0
+            and prev.prefix_sha256 is not None
+            and st.st_size > prev.size
+        )
+        digest, prefix = _hash_file(path, prefix_len=prev.resume_offset if can_tail else 0)
+
+        if digest == prev.sha256:
+            return FilePlan(path, key, PLAN_SKIP, st.st_size, st.st_mtime_ns, digest)
+        if can_tail and prefix == prev.prefix_sha256:
+            return FilePlan(
+                path, key, PLAN_TAIL, st.st_size, st.st_mtime_ns, digest,
+                start_offset=prev.resume_offset,
+            )
+        return FilePlan(path, key, PLAN_FULL, st.st_size, st.st_mtime_ns, digest)
+
+    def record(self, plan: FilePlan, report: ParseReport, *, resume_offset: int = 0) -> None:
+        """
+        Stages the outcome of parsing plan.path (call after the file was fully consumed).
+        """
+        prev = self.entries.get(plan.key)
+
+        if plan.action == PLAN_SKIP and prev is not None:
+            # refresh stat info so the next run takes the fast path again
+            prev.size, prev.mtime_ns = plan.size, plan.mtime_ns
+            return
+
+        digest = plan.sha256 or _hash_file(plan.path)[0]
+        count = report.count
+        if plan.action == PLAN_TAIL and prev is not None:
+            count += prev.count
+
+        self.entries[plan.key] = ManifestEntry(
+            size=plan.size,
+            mtime_ns=plan.mtime_ns,
+            sha256=digest,
+            count=count,
+            errors=list(report.errors),
+            resume_offset=resume_offset,
+            prefix_sha256=_hash_prefix(plan.path, resume_offset) if resume_offset else None,
+        )
+
+
+def _file_key(root: Path, path: Path) -> str:
+    if root.is_file():
+        return path.name
+    return path.relative_to(root).as_posix()
+
+
+def _iter_planned_file(
+    plan: FilePlan,
+    errors: List[str],
+    checkpoint: Optional[JsonCheckpoint],
+    raw_mode: str,
+    fingerprint_mode: str,
+    row_filter: Optional[MusicRowFilter],
+    on_open: Optional[OpenHook],
+) -> Iterator[TakeoutEvent]:
+    start_offset = plan.start_offset if checkpoint is not None else 0
+    with open_takeout_text(plan.path, byte_offset=start_offset) as fp:
+        if on_open is not None:
+            on_open(fp.buffer)
+        if checkpoint is not None:
+            yield from iter_takeout_json_stream(
+                fp,
+                plan.path,
+                errors=errors,
+                raw_mode=raw_mode,
+                fingerprint_mode=fingerprint_mode,
+                start_offset=start_offset,
+                checkpoint=checkpoint,
+                row_filter=row_filter,
+            )
+            return
+        yield from iter_takeout_html_stream(
+            fp,
+            plan.path,
+            errors=errors,
+            raw_mode=raw_mode,
+            fingerprint_mode=fingerprint_mode,
+            row_filter=row_filter,
+        )
+
+
+def iter_takeout_folder_incremental(
+    root: Path,
+    manifest: ImportManifest,
+    *,
+    suffixes: Tuple[str, ...] = (".json", ".html"),
+    reports: Optional[List[ParseReport]] = None,
+    plans: Optional[List[FilePlan]] = None,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    row_filter: Optional[MusicRowFilter] = None,
+    on_open: Optional[OpenHook] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams events from files under root that changed since the manifest last saw them.
+
+    Skipped files yield nothing (their events were imported before). Every
+    file's FilePlan is appended to `plans` and every parsed file's report to
+    `reports` (if given). A file that fails with TakeoutParseError gets an
+    error report and no manifest entry, so the next import parses it in full;
+    rows it yielded before failing are still delivered (dedupe catches them
+    on the retry). Call manifest.save() once the events are persisted.
+    on_open gets each parsed file's binary handle as it is opened.
+    """
+    for path in sorted(iter_takeout_files(root, suffixes)):
+        plan = manifest.plan_file(path, _file_key(root, path))
+        if plans is not None:
+            plans.append(plan)
+
+        if plan.action == PLAN_SKIP:
+            manifest.record(plan, ParseReport(source_file=str(path), count=0, errors=[]))
+            continue
+
+        failed: Optional[str] = None
+        while True:
+            errors: List[str] = []
+            count = 0
+            checkpoint = JsonCheckpoint() if path.suffix.lower() == ".json" else None
+            try:
+                for ev in _iter_planned_file(
+                    plan, errors, checkpoint, raw_mode, fingerprint_mode, row_filter, on_open
+                ):
+                    count += 1
+                    yield ev
+            except TakeoutParseError as e:
+                if plan.action == PLAN_TAIL and not count:
+                    # the bytes after the old resume point weren't a continuation
+                    log.info("tail parse failed for %s, parsing in full: %s", path, e)
+                    plan = replace(plan, action=PLAN_FULL, start_offset=0)
+                    continue
+                failed = str(e)
+            break
+
+        if failed is not None:
+            manifest.forget(plan.key)
+            if reports is not None:
+                reports.append(ParseReport(source_file=str(path), count=count, errors=[failed]))
+            continue
+
+        report = ParseReport(source_file=str(path), count=count, errors=errors)
+        if reports is not None:
+            reports.append(report)
+
+        resume = checkpoint.offset if checkpoint is not None and checkpoint.resumable else 0
+        manifest.record(plan, report, resume_offset=resume)
+
+
+def open_import_manifest(user_id: str) -> ImportManifest:
+    """
+    Opens the manifest for a user under IMPORT_MANIFEST_PATH (default data/manifests).
+    """
+    root = Path(os.getenv("IMPORT_MANIFEST_PATH", "data/manifests"))
+    name = hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:32]
+    return ImportManifest(root / f"{name}.json")
@@ -0,0 +1,409 @@
+# location: backend/src/app/data/import_pipeline.py
+# purpose: Streaming Takeout import: discover -> parse -> music filter -> dedupe -> NDJSON batches
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from app.data.dedupe_index import DedupeIndex, open_dedupe_index
+from app.data.import_manifest import (
+    PLAN_SKIP,
+    FilePlan,
+    ImportManifest,
+    iter_takeout_folder_incremental,
+    open_import_manifest,
+)
+from app.data.parsers.takeout_archive import is_takeout_archive, iter_takeout_archive
+from app.data.parsers.takeout_common import ParseReport, TakeoutEvent, iter_takeout_files
+from app.data.parsers.takeout_filter import MusicRowFilter
+from app.data.parsers.takeout_html import iter_takeout_html_stream
+from app.data.parsers.takeout_json import iter_takeout_json_stream
+
+if TYPE_CHECKING:
+    from app.integrations.storage.blob_store import BlobStore
+
+log = logging.getLogger(__name__)
+
+# Rows per persisted NDJSON blob
+DEFAULT_PERSIST_BATCH = 10_000
+# Errors kept per file report in the job result
+_MAX_REPORT_ERRORS = 5
+# Minimum seconds between progress callbacks while rows stream through
+_PROGRESS_INTERVAL_SEC = 1.0
+# Read size when spooling an uploaded blob to disk
+_SPOOL_CHUNK_BYTES = 1 << 20
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+@dataclass
+class ImportProgress:
+    files_total: int = 0
+    files_done: int = 0
+    files_skipped: int = 0
+    bytes_total: int = 0
+    bytes_done: int = 0
+    rows_parsed: int = 0      # rows the parsers looked at (kept + filtered out)
+    rows_kept: int = 0        # music rows that reached dedupe
+    rows_new: int = 0         # not seen in this or any earlier import
+    rows_persisted: int = 0
+    batches: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ImportSummary:
+    progress: ImportProgress
+    batch_keys: List[str] = field(default_factory=list)
+    reports: List[ParseReport] = field(default_factory=list)
+    filter_stats: Optional[Dict[str, Any]] = None
+    elapsed_sec: float = 0.0
+
+
+def event_to_record(ev: TakeoutEvent) -> Dict[str, Any]:
+    fp = ev.fingerprint
+    return {
+        "occurred_at": ev.occurred_epoch,
+        "title": ev.title,
+        "artist": ev.artist,
+        "album": ev.album,
+        "source_kind": ev.source_kind,
+        "source_file": ev.source_file,
+        "fingerprint": fp.hex() if isinstance(fp, bytes) else fp,
+    }
+
+
+class _BatchWriter:
+    """
+    Buffers records and writes each full batch as one NDJSON blob.
+    """
+
+    def __init__(self, store: "BlobStore", prefix: str, batch_size: int) -> None:
+        self.store = store
+        self.prefix = prefix
+        self.batch_size = max(1, batch_size)
+        self.keys: List[str] = []
+        self.rows = 0
+        self._buf: List[str] = []
+
+    def add(self, ev: TakeoutEvent) -> bool:
+        """
+        Returns True when the add flushed a batch.
+        """
+        self._buf.append(json.dumps(event_to_record(ev), ensure_ascii=False, separators=(",", ":")))
+        if len(self._buf) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        key = f"{self.prefix}/events-{len(self.keys):05d}.ndjson"
+        body = ("\n".join(self._buf) + "\n").encode("utf-8")
+        self.store.put(key=key, data=io.BytesIO(body), content_type="application/x-ndjson")
+        self.keys.append(key)
+        self.rows += len(self._buf)
+        self._buf = []
+
+    def discard(self) -> None:
+        # roll back a failed import so a retry doesn't persist rows twice
+        for key in self.keys:
+            try:
+                self.store.delete(key=key)
+            except Exception as e:
+                log.warning("could not delete partial import batch %s: %s", key, e)
+        self.keys = []
+        self._buf = []
+
+
+def _discover_archives(path: Path) -> List[Path]:
+    if path.is_file():
+        return [path] if is_takeout_archive(path) else []
+    return sorted(p for p in path.rglob("*") if is_takeout_archive(p))
+
+
+def _iter_raw_events(
+    raw: Union[Dict[str, Any], List[Any], str, bytes],
+    reports: List[ParseReport],
+    row_filter: Optional[MusicRowFilter],
+) -> Iterator[TakeoutEvent]:
+    """
+    Events from an inline payload: a JSON value, or JSON / HTML text.
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    if isinstance(raw, str):
+        text = raw
+        is_json = text.lstrip("﻿ \t\r\n")[:1] in ("[", "{")
+    else:
+        text = json.dumps(raw, ensure_ascii=False)
+        is_json = True
+
+    errors: List[str] = []
+    count = 0
+    fp = io.StringIO(text)
+    if is_json:
+        events = iter_takeout_json_stream(fp, "takeout_raw", errors=errors, row_filter=row_filter)
+    else:
+        events = iter_takeout_html_stream(fp, "takeout_raw", errors=errors, row_filter=row_filter)
+    for ev in events:
+        count += 1
+        yield ev
+    reports.append(ParseReport(source_file="takeout_raw", count=count, errors=errors))
+
+
+class TakeoutImport:
+    """
+    One streaming import for one user.
+
+    Nothing is materialized: events flow parser -> MusicRowFilter ->
+    DedupeIndex -> NDJSON batches in the blob store. Only once every batch
+    is written are the dedupe index and the file manifest committed, so a
+    failed import leaves both as they were and its partial batches are
+    deleted.
+    """
+
+    def __init__(
+        self,
+        *,
+        user_id: str,
+        job_id: str,
+        store: "BlobStore",
+        music_only: bool = True,
+        dedupe: bool = True,
+        incremental: bool = True,
+        batch_size: int = DEFAULT_PERSIST_BATCH,
+        on_progress: Optional[ProgressFn] = None,
+    ) -> None:
+        self.user_id = user_id
+        self.job_id = job_id
+        self.row_filter = MusicRowFilter() if music_only else None
+        self.dedupe = dedupe
+        # opened by run(), which always closes it
+        self.index: Optional[DedupeIndex] = None
+        # incremental=False forces a full re-parse but still refreshes the manifest
+        self.manifest: ImportManifest = open_import_manifest(user_id)
+        if not incremental:
+            self.manifest.entries.clear()
+        self.progress = ImportProgress()
+        self.reports: List[ParseReport] = []
+        self.on_progress = on_progress
+        # file being parsed; bytes_done = finished files + its read position
+        self._reading: Optional[IO[bytes]] = None
+        self._bytes_finished = 0
+        self._last_emit = 0.0
+
+        user_dir = hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:32]
+        self.writer = _BatchWriter(store, f"imports/{user_dir}/{job_id}", batch_size)
+
+    # -------------------------
+    # Progress
+    # -------------------------
+    def _emit(self) -> None:
+        self._last_emit = time.monotonic()
+        self.progress.bytes_done = self._bytes_finished + self._read_position()
+        if self.row_filter is not None:
+            self.progress.rows_parsed = self.row_filter.kept + sum(self.row_filter.dropped.values())
+        else:
+            self.progress.rows_parsed = self.progress.rows_kept
+        if self.on_progress is not None:
+            self.on_progress(self.progress.snapshot())
+
+    def _read_position(self) -> int:
+        f = self._reading
+        if f is None or f.closed:
+            return 0
+        try:
+            return f.tell()
+        except (OSError, ValueError):
+            return 0
+
+    def _opened(self, f: IO[bytes]) -> None:
+        self._reading = f
+
+    def _file_done(self, size: int, *, skipped: bool = False) -> None:
+        # _reading is left alone: in a folder walk the next file is already
+        # open by the time the previous one is settled; closed files read as 0
+        self._bytes_finished += size
+        self.progress.files_done += 1
+        if skipped:
+            self.progress.files_skipped += 1
+        self._emit()
+
+    # -------------------------
+    # Sources
+    # -------------------------
+    def _iter_path(self, root: Path) -> Iterator[TakeoutEvent]:
+        # raised from inside run() so the index is still closed
+        if not root.exists():
+            raise FileNotFoundError(f"takeout_path does not exist: {root}")
+        archives = _discover_archives(root)
+        loose = [] if is_takeout_archive(root) else [root]
+
+        sizes = {p: p.stat().st_size for p in archives}
+        self.progress.files_total += len(archives)
+        self.progress.bytes_total += sum(sizes.values())
+
+        for archive in archives:
+            plan = self.manifest.plan_file(archive, archive.name)
+            if plan.action == PLAN_SKIP:
+                skipped = ParseReport(source_file=str(archive), count=0, errors=[])
+                self.manifest.record(plan, skipped)
+                self._file_done(sizes[archive], skipped=True)
+                continue
+
+            start = len(self.reports)
+            yield from iter_takeout_archive(
+                archive, reports=self.reports, row_filter=self.row_filter, on_open=self._opened
+            )
+            member_reports = self.reports[start:]
+            self.manifest.record(
+                plan,
+                ParseReport(
+                    source_file=str(archive),
+                    count=sum(r.count for r in member_reports),
+                    errors=[e for r in member_reports for e in r.errors][:_MAX_REPORT_ERRORS],
+                ),
+            )
+            self._file_done(sizes[archive])
+
+        for folder in loose:
+            yield from self._iter_folder(folder)
+
+    def _iter_folder(self, root: Path) -> Iterator[TakeoutEvent]:
+        files = sorted(iter_takeout_files(root))
+        sizes = {p: p.stat().st_size for p in files}
+        self.progress.files_total += len(files)
+        self.progress.bytes_total += sum(sizes.values())
+
+        plans: List[FilePlan] = []
+        done = 0
+
+        def _settle(pending: int) -> None:
+            # a file is finished once the next one has been planned (or the walk ended)
+            nonlocal done
+            while done < len(plans) - pending:
+                plan = plans[done]
+                self._file_done(sizes.get(plan.path, 0), skipped=plan.action == PLAN_SKIP)
+                done += 1
+
+        for ev in iter_takeout_folder_incremental(
+            root,
+            self.manifest,
+            reports=self.reports,
+            plans=plans,
+            row_filter=self.row_filter,
+            on_open=self._opened,
+        ):
+            _settle(1)
+            yield ev
+        _settle(0)
+
+    # -------------------------
+    # Run
+    # -------------------------
+    def _count_kept(self, events: Iterable[TakeoutEvent]) -> Iterator[TakeoutEvent]:
+        for ev in events:
+            self.progress.rows_kept += 1
+            yield ev
+
+    def run(self, events: Iterable[TakeoutEvent]) -> ImportSummary:
+        t0 = time.time()
+        stream: Iterable[TakeoutEvent] = self._count_kept(events)
+        if self.dedupe:
+            self.index = open_dedupe_index(self.user_id)
+            stream = self.index.filter_new(stream)
+
+        try:
+            for ev in stream:
+                self.progress.rows_new += 1
+                if self.writer.add(ev):
+                    self.progress.batches = len(self.writer.keys)
+                    self.progress.rows_persisted = self.writer.rows
+                    self._emit()
+                elif time.monotonic() - self._last_emit >= _PROGRESS_INTERVAL_SEC:
+                    self._emit()
+            self.writer.flush()
+            self.progress.batches = len(self.writer.keys)
+            self.progress.rows_persisted = self.writer.rows
+
+            # commit only after every batch is durable
+            if self.index is not None:
+                self.index.commit()
+            self.manifest.save()
+        except BaseException:
+            self.writer.discard()
+            raise
+        finally:
+            if self.index is not None:
+                self.index.close()
+                self.index = None
+
+        self._emit()
+        return ImportSummary(
+            progress=self.progress,
+            batch_keys=list(self.writer.keys),
+            reports=self.reports,
+            filter_stats=self.row_filter.snapshot() if self.row_filter is not None else None,
+            elapsed_sec=round(time.time() - t0, 3),
+        )
+
+    def run_path(self, path: Path) -> ImportSummary:
+        return self.run(self._iter_path(path))
+
+    def run_blob(self, key: str, store: "BlobStore") -> ImportSummary:
+        """
+        Imports an uploaded export. The blob is stream-copied to a temp file in
+        chunks, so archives are read member by member and never held in memory.
+        """
+        suffix = "".join(Path(key).suffixes[-2:]) or ".zip"
+        with tempfile.TemporaryDirectory() as tmp:
+            local = Path(tmp) / f"takeout{suffix}"
+            with store.open(key=key) as src, local.open("wb") as dst:
+                shutil.copyfileobj(src, dst, _SPOOL_CHUNK_BYTES)
+            return self.run_path(local)
+
+    def run_raw(self, raw: Union[Dict[str, Any], List[Any], str, bytes]) -> ImportSummary:
+        self.progress.files_total += 1
+        events = _iter_raw_events(raw, self.reports, self.row_filter)
+
+        def _with_done() -> Iterator[TakeoutEvent]:
+            yield from events
+            self._file_done(0)
+
+        return self.run(_with_done())
+
+
+def summarize_reports(reports: List[ParseReport]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "source_file": r.source_file,
+            "count": r.count,
+            "errors": r.errors[:_MAX_REPORT_ERRORS],
+            "error_count": len(r.errors),
+        }
+        for r in reports
+    ]
@@ -0,0 +1,319 @@
+# location: backend/src/app/data/parsers/takeout_archive.py
+# purpose: Parse Takeout zip/tgz archives in place, streaming history members into the parsers
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from app.data.parsers.takeout_common import (
+    ARCHIVE_MEMBER_SEP,
+    DEFAULT_CHUNK_CHARS,
+    FP_SHA256,
+    RAW_OFF,
+    OpenHook,
+    ParseReport,
+    TakeoutEvent,
+    TakeoutParseError,
+    wrap_takeout_text,
+)
+from app.data.parsers.takeout_filter import MusicRowFilter
+from app.data.parsers.takeout_html import iter_takeout_html_stream
+from app.data.parsers.takeout_json import iter_takeout_json_stream
+from app.data.parsers.takeout_parallel import (
+    DEFAULT_SMALL_FILE_BYTES,
+    plan_sized_tasks,
+    run_parse_tasks,
+)
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = (".zip", ".tgz", ".tar.gz", ".tar")
+
+_STREAM_PARSERS: Dict[str, Callable[..., Iterator[TakeoutEvent]]] = {
+    ".json": iter_takeout_json_stream,
+    ".html": iter_takeout_html_stream,
+}
+
+_FileResult = Tuple[str, List[TakeoutEvent], ParseReport]
+
+
+def is_takeout_archive(path: Path) -> bool:
+    return path.is_file() and path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def is_youtube_history_member(name: str) -> bool:
+    """
+    Default member filter: JSON/HTML history files under a YouTube folder.
+
+    Takeout localizes folder names ("YouTube and YouTube Music",
+    "YouTube y YouTube Music", ...) but keeps "YouTube" in them, and the
+    activity files live in a history/ folder or are named *history*.
+    """
+    low = name.replace("\\", "/").lower()
+    if not low.endswith((".json", ".html")):
+        return False
+    parts = low.split("/")
+    if not any("youtube" in part for part in parts[:-1]):
+        return False
+    return "history" in parts[-1] or (len(parts) > 1 and parts[-2] == "history")
+
+
+def member_source(archive: Path, member: str) -> str:
+    return f"{archive}{ARCHIVE_MEMBER_SEP}{member}"
+
+
+def _split_source(source: str) -> Tuple[Path, str]:
+    # the archive path itself may contain the separator; split after the archive suffix
+    low = source.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        i = low.find(suffix + ARCHIVE_MEMBER_SEP)
+        if i >= 0:
+            cut = i + len(suffix)
+            return Path(source[:cut]), source[cut + len(ARCHIVE_MEMBER_SEP):]
+    raise ValueError(f"Not an archive member source: {source!r}")
+
+
+def _member_suffix(name: str) -> str:
+    return os.path.splitext(name)[1].lower()
+
+
+@contextmanager
+def open_archive_member(source: str) -> Iterator[IO[bytes]]:
+    """
+    Opens "<archive>!<member>" (as produced by member_source) as a binary stream.
+    """
+    archive, member = _split_source(source)
+    if archive.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as zf, zf.open(member) as f:
+            yield f
+        return
+
+    with tarfile.open(archive, "r:*") as tf:
+        extracted = tf.extractfile(member)
+        if extracted is None:
+            raise KeyError(f"{member} is not a regular file in {archive}")
+        with extracted:
+            yield extracted
+
+
+def _parse_member_stream(
+    fp: TextIO,
+    source: str,
+    suffix: str,
+    opts: Dict[str, Any],
+    errors: List[str],
+) -> Iterator[TakeoutEvent]:
+    parser = _STREAM_PARSERS.get(suffix)
+    if parser is None:
+        supported = ", ".join(sorted(_STREAM_PARSERS))
+        raise ValueError(f"Unsupported Takeout member {source!r} (expected {supported})")
+    return parser(fp, source, errors=errors, **opts)
+
+
+def _parseable(member_filter: Callable[[str], bool]) -> Callable[[str], bool]:
+    """
+    Narrows a caller's member filter to the suffixes a parser exists for.
+    """
+    def _accept(name: str) -> bool:
+        return _member_suffix(name) in _STREAM_PARSERS and member_filter(name)
+
+    return _accept
+
+
+def _iter_zip_members(
+    archive: Path,
+    member_filter: Callable[[str], bool],
+    on_open: Optional[OpenHook],
+) -> Iterator[Tuple[str, Callable[[], IO[bytes]]]]:
+    with archive.open("rb") as raw, zipfile.ZipFile(raw) as zf:
+        if on_open is not None:
+            on_open(raw)
+        for info in zf.infolist():
+            if not info.is_dir() and member_filter(info.filename):
+                yield info.filename, partial(zf.open, info)
+
+
+class _TarStreamMember(io.RawIOBase):
+    """
+    Read-only raw view of a member from a stream-mode tarfile.
+
+    Its ExtractedFile claims to support seekable() but raises on it in
+    stream mode, which TextIOWrapper probes; this wrapper answers False.
+    """
+
+    def __init__(self, f: IO[bytes]) -> None:
+        self._f = f
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readinto(self, b) -> int:
+        data = self._f.read(len(b))
+        n = len(data)
+        b[:n] = data
+        return n
+
+
+def _open_tar_stream_member(f: IO[bytes]) -> IO[bytes]:
+    return io.BufferedReader(_TarStreamMember(f))
+
+
+def _iter_tar_members(
+    archive: Path,
+    member_filter: Callable[[str], bool],
+    on_open: Optional[OpenHook],
+) -> Iterator[Tuple[str, Callable[[], IO[bytes]]]]:
+    # stream mode: one sequential pass over the (compressed) tarball, no seeking
+    with archive.open("rb") as raw, tarfile.open(fileobj=raw, mode="r|*") as tf:
+        if on_open is not None:
+            on_open(raw)
+        for info in tf:
+            if info.isfile() and member_filter(info.name):
+                f = tf.extractfile(info)
+                if f is not None:
+                    yield info.name, partial(_open_tar_stream_member, f)
+
+
+def iter_takeout_archive(
+    archive: Path,
+    *,
+    reports: Optional[List[ParseReport]] = None,
+    member_filter: Callable[[str], bool] = is_youtube_history_member,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    row_filter: Optional[MusicRowFilter] = None,
+    on_open: Optional[OpenHook] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams events from the history members of a Takeout zip/tar(.gz) archive.
+
+    Members are decompressed on the fly into the streaming parsers; nothing
+    is extracted to disk. Each event's source_file is "<archive>!<member>".
+    A member that fails with TakeoutParseError gets an error report (appended
+    to `reports`, if given) and the archive moves on to the next member.
+    Only .json / .html members are parsed, whatever member_filter accepts.
+    on_open gets the archive file itself; its position is how far into the
+    (compressed) archive the parse has read.
+    """
+    member_filter = _parseable(member_filter)
+    if archive.name.lower().endswith(".zip"):
+        members = _iter_zip_members(archive, member_filter, on_open)
+    else:
+        members = _iter_tar_members(archive, member_filter, on_open)
+
+    opts = {
+        "chunk_size": chunk_size,
+        "raw_mode": raw_mode,
+        "fingerprint_mode": fingerprint_mode,
+        "row_filter": row_filter,
+    }
+
+    for name, opener in members:
+        source = member_source(archive, name)
+        errors: List[str] = []
+        count = 0
+        try:
+            with opener() as binary, wrap_takeout_text(binary) as fp:
+                for ev in _parse_member_stream(fp, source, _member_suffix(name), opts, errors):
+                    count += 1
+                    yield ev
+        except TakeoutParseError as e:
+            errors = [str(e)]
+
+        if reports is not None:
+            reports.append(ParseReport(source_file=source, count=count, errors=errors))
+
+
+def _parse_zip_task(
+    members: Sequence[str],
+    archive: str,
+    opts: Dict[str, Any],
+) -> List[_FileResult]:
+    """
+    Worker entry point: parses a group of members from one zip (opened per task).
+    """
+    out: List[_FileResult] = []
+    with zipfile.ZipFile(archive) as zf:
+        for name in members:
+            source = member_source(Path(archive), name)
+            errors: List[str] = []
+            try:
+                with zf.open(name) as binary, wrap_takeout_text(binary) as fp:
+                    evs = list(_parse_member_stream(fp, source, _member_suffix(name), opts, errors))
+                rep = ParseReport(source_file=source, count=len(evs), errors=errors)
+            except TakeoutParseError as e:
+                evs, rep = [], ParseReport(source_file=source, count=0, errors=[str(e)])
+            except Exception as e:
+                rep = ParseReport(source_file=source, count=0, errors=[f"worker exception: {e}"])
+                evs = []
+            out.append((name, evs, rep))
+    return out
+
+
+def parse_takeout_archive(
+    archive: Path,
+    *,
+    max_workers: int = 1,
+    member_filter: Callable[[str], bool] = is_youtube_history_member,
+    small_file_bytes: int = DEFAULT_SMALL_FILE_BYTES,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
+    """
+    Parses a Takeout archive, returns aggregate events + per-member reports.
+
+    Zip members are independent (random access), so max_workers != 1 fans
+    them out to a process pool, largest first; each worker opens the zip
+    itself. Tarballs can only be read front to back and are always parsed
+    in one streaming pass. Results come back in archive member order either way.
+    """
+    if not archive.name.lower().endswith(".zip") or max_workers == 1:
+        reports: List[ParseReport] = []
+        events = list(
+            iter_takeout_archive(
+                archive,
+                reports=reports,
+                member_filter=member_filter,
+                raw_mode=raw_mode,
+                fingerprint_mode=fingerprint_mode,
+            )
+        )
+        return events, reports
+
+    accept = _parseable(member_filter)
+    with zipfile.ZipFile(archive) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir() and accept(i.filename)]
+    if not infos:
+        return [], []
+
+    opts = {"raw_mode": raw_mode, "fingerprint_mode": fingerprint_mode}
+    tasks = plan_sized_tasks(
+        [(i.file_size, i.filename) for i in infos],
+        small_file_bytes=small_file_bytes,
+    )
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+
+    task_fn = partial(_parse_zip_task, archive=str(archive), opts=opts)
+    results = run_parse_tasks(task_fn, tasks, workers)
+    by_name = {name: (evs, rep) for name, evs, rep in results}
+
+    all_events: List[TakeoutEvent] = []
+    all_reports: List[ParseReport] = []
+    for info in infos:
+        evs, rep = by_name[info.filename]
+        all_events.extend(evs)
+        all_reports.append(rep)
+
+    return all_events, all_reports
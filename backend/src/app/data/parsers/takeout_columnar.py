@@ -0,0 +1,207 @@
+# location: backend/src/app/data/parsers/takeout_columnar.py
+# purpose: Columnar (array-backed) batches of TakeoutEvent rows for vectorized downstream passes
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.data.parsers.takeout_common import NO_TIME, Fingerprint, TakeoutEvent
+
+# Rows per batch unless the caller says otherwise
+DEFAULT_BATCH_SIZE = 65_536
+
+
+def _fingerprint_bytes(fp: Optional[Fingerprint]) -> Tuple[str, bytes]:
+    if fp is None:
+        return "", b""
+    if isinstance(fp, int):
+        return "int", fp.to_bytes(8, "little")
+    if isinstance(fp, bytes):
+        return "bytes", fp
+    return "hex", bytes.fromhex(fp)
+
+
+def _fingerprint_value(kind: str, fp: Optional[bytes]) -> Optional[Fingerprint]:
+    if fp is None:
+        return None
+    if kind == "int":
+        return int.from_bytes(fp, "little")
+    if kind == "bytes":
+        return fp
+    return fp.hex()
+
+
+class DictColumn:
+    """
+    Dictionary-encoded string column: one int32 code per row + the distinct values.
+
+    Code 0 is always None, so missing values cost nothing extra.
+    """
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self) -> None:
+        self.codes = array("i")
+        self.values: List[Optional[str]] = [None]
+        self._index: Dict[Optional[str], int] = {None: 0}
+
+    def append(self, value: Optional[str]) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        return self.values[self.codes[i]]
+
+
+class EventBatch:
+    """
+    A batch of events stored column-wise.
+
+    - occurred_at: array('q') of epoch seconds (NO_TIME when missing)
+    - source_file / source_kind / title / artist / album: DictColumn
+    - fingerprints: fixed-width bytes, fingerprint_width per row (all-zero = missing);
+      fingerprint_kind remembers the event-side type ("hex" | "int" | "bytes")
+    - raw: only materialized if some row carries a raw payload
+    """
+
+    __slots__ = (
+        "occurred_at",
+        "source_file",
+        "source_kind",
+        "title",
+        "artist",
+        "album",
+        "fingerprints",
+        "fingerprint_width",
+        "fingerprint_kind",
+        "raw",
+    )
+
+    def __init__(self) -> None:
+        self.occurred_at = array("q")
+        self.source_file = DictColumn()
+        self.source_kind = DictColumn()
+        self.title = DictColumn()
+        self.artist = DictColumn()
+        self.album = DictColumn()
+        self.fingerprints = bytearray()
+        self.fingerprint_width = 0
+        self.fingerprint_kind = ""
+        self.raw: Optional[List[Optional[Dict[str, Any]]]] = None
+
+    def __len__(self) -> int:
+        return len(self.occurred_at)
+
+    # -------------------------
+    # Row <-> column
+    # -------------------------
+    def append(self, ev: TakeoutEvent) -> None:
+        n = len(self)
+        self.occurred_at.append(NO_TIME if ev.occurred_epoch is None else ev.occurred_epoch)
+        self.source_file.append(ev.source_file)
+        self.source_kind.append(ev.source_kind)
+        self.title.append(ev.title)
+        self.artist.append(ev.artist)
+        self.album.append(ev.album)
+
+        kind, fp = _fingerprint_bytes(ev.fingerprint)
+        if not self.fingerprint_width and fp:
+            # first fingerprint fixes the width; back-fill earlier missing rows
+            self.fingerprint_width = len(fp)
+            self.fingerprint_kind = kind
+            self.fingerprints = bytearray(self.fingerprint_width * n)
+        if self.fingerprint_width:
+            if fp and (len(fp) != self.fingerprint_width or kind != self.fingerprint_kind):
+                raise ValueError("EventBatch fingerprints must share one type and width")
+            self.fingerprints += fp or bytes(self.fingerprint_width)
+
+        if ev.raw is not None and self.raw is None:
+            self.raw = [None] * n
+        if self.raw is not None:
+            self.raw.append(ev.raw)
+
+    def fingerprint_at(self, i: int) -> Optional[bytes]:
+        w = self.fingerprint_width
+        if not w:
+            return None
+        fp = bytes(self.fingerprints[i * w:(i + 1) * w])
+        return fp if any(fp) else None
+
+    def event_at(self, i: int) -> TakeoutEvent:
+        ts = self.occurred_at[i]
+        fp = self.fingerprint_at(i)
+        return TakeoutEvent(
+            source_file=self.source_file[i] or "",
+            source_kind=self.source_kind[i] or "",
+            occurred_epoch=None if ts == NO_TIME else ts,
+            title=self.title[i],
+            artist=self.artist[i],
+            album=self.album[i],
+            raw=self.raw[i] if self.raw is not None else None,
+            fingerprint=_fingerprint_value(self.fingerprint_kind, fp),
+        )
+
+    def to_events(self) -> List[TakeoutEvent]:
+        return [self.event_at(i) for i in range(len(self))]
+
+    @classmethod
+    def from_events(cls, events: Iterable[TakeoutEvent]) -> "EventBatch":
+        batch = cls()
+        for ev in events:
+            batch.append(ev)
+        return batch
+
+    # -------------------------
+    # Optional NumPy view
+    # -------------------------
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Zero-copy NumPy views of the fixed-width columns (numpy is optional).
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise RuntimeError("numpy is required for EventBatch.to_numpy()") from e
+
+        out: Dict[str, Any] = {
+            "occurred_at": np.frombuffer(self.occurred_at, dtype=np.int64),
+            "source_file": np.frombuffer(self.source_file.codes, dtype=np.int32),
+            "title": np.frombuffer(self.title.codes, dtype=np.int32),
+            "artist": np.frombuffer(self.artist.codes, dtype=np.int32),
+            "album": np.frombuffer(self.album.codes, dtype=np.int32),
+        }
+        if self.fingerprint_width:
+            out["fingerprints"] = np.frombuffer(
+                bytes(self.fingerprints), dtype=f"S{self.fingerprint_width}"
+            )
+        return out
+
+
+def iter_event_batches(
+    events: Iterable[TakeoutEvent],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[EventBatch]:
+    """
+    Groups an event stream into EventBatch chunks of at most batch_size rows.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    batch = EventBatch()
+    for ev in events:
+        batch.append(ev)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = EventBatch()
+
+    if len(batch):
+        yield batch
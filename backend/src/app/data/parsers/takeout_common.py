@@ -3,14 +3,18 @@
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
 import hashlib
+import io
 import json
 import logging
 import re
+import sys
 
 log = logging.getLogger(__name__)
 
@@ -25,27 +29,53 @@ class TakeoutParseError(RuntimeError):
 # -------------------------
 # Core record shape
 # -------------------------
-@dataclass(frozen=True)
+
+# Raw-retention modes (what TakeoutEvent.raw holds)
+RAW_OFF = "off"              # nothing (default)
+RAW_TRUNCATED = "truncated"  # {"text": <source text, capped at RAW_TRUNCATE_CHARS>}
+RAW_OFFSETS = "offsets"      # {"offset": <byte offset>, "length": <bytes>} into source_file
+RAW_MODES = (RAW_OFF, RAW_TRUNCATED, RAW_OFFSETS)
+RAW_TRUNCATE_CHARS = 2000
+
+# Fingerprint modes (what TakeoutEvent.fingerprint holds)
+FP_SHA256 = "sha256"      # 64-char hex str (default, stable with earlier imports)
+FP_BLAKE64 = "blake64"    # int from an 8-byte blake2b digest
+FP_BLAKE128 = "blake128"  # 16-byte blake2b digest
+FP_MODES = (FP_SHA256, FP_BLAKE64, FP_BLAKE128)
+
+Fingerprint = Union[str, int, bytes]
+
+
+@dataclass(frozen=True, slots=True)
 class TakeoutEvent:
     """
     A single normalized activity row/event extracted from Takeout.
 
     Think of this as the "raw gold" we pull out before mapping to DB models.
+
+    Kept deliberately small (million-row imports): slotted, time stored as
+    epoch seconds, source strings interned, no raw payload unless asked for.
     """
     source_file: str
     source_kind: str  # "html" | "json"
-    occurred_at: Optional[datetime]
+    occurred_epoch: Optional[int]  # UTC seconds
 
     # Best-effort normalized fields
     title: Optional[str] = None
     artist: Optional[str] = None
     album: Optional[str] = None
 
-    # Free-form payload (original row, keep for debugging)
+    # Optional payload for debugging (see RAW_* modes)
     raw: Optional[Dict[str, Any]] = None
 
-    # A stable fingerprint so we can dedupe
-    fingerprint: Optional[str] = None
+    # A stable fingerprint so we can dedupe (type depends on FP_* mode)
+    fingerprint: Optional[Fingerprint] = None
+
+    @property
+    def occurred_at(self) -> Optional[datetime]:
+        if self.occurred_epoch is None:
+            return None
+        return datetime.fromtimestamp(self.occurred_epoch, tz=timezone.utc)
 
 
 @dataclass(frozen=True)
@@ -82,6 +112,184 @@ def safe_read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="replace")
 
 
+# Where a record came from: a file path, or "<archive>!<member>" for archive members
+SourceName = Union[Path, str]
+ARCHIVE_MEMBER_SEP = "!"
+
+
+def wrap_takeout_text(binary: IO[bytes]) -> TextIO:
+    # Same tolerance as safe_read_text, but as a stream. Any BOM is left in
+    # the text so byte offsets stay exact; parsers skip it.
+    return io.TextIOWrapper(binary, encoding="utf-8", errors="replace", newline="")
+
+
+# Called with each underlying binary file as a streaming parser opens it;
+# its tell() is the read position, for byte-level progress
+OpenHook = Callable[[IO[bytes]], None]
+
+
+def open_takeout_text(path: Path, *, byte_offset: int = 0) -> TextIO:
+    # byte_offset resumes mid-file and must sit on a character boundary
+    raw = path.open("rb")
+    if byte_offset:
+        raw.seek(byte_offset)
+    return wrap_takeout_text(raw)
+
+
+# Chars per read for streaming parsers (~1 MiB of mostly-ASCII text)
+DEFAULT_CHUNK_CHARS = 1 << 20
+
+
+class ChunkedTextReader:
+    """
+    Sliding text window over a stream, refilled in fixed-size chunks.
+
+    Parsers consume from `buf` starting at `pos` and call `fill()` when they
+    need more input. Consumed text is dropped on refill, so memory stays
+    bounded by the chunk size plus the largest single record in flight.
+    """
+
+    def __init__(
+        self,
+        fp: TextIO,
+        chunk_size: int = DEFAULT_CHUNK_CHARS,
+        *,
+        track_bytes: bool = False,
+        byte_base: int = 0,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self._fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+        # UTF-8 byte offset bookkeeping (only paid for when asked);
+        # byte_base is where the stream starts in the file when resuming
+        self._track_bytes = track_bytes
+        self._mark = 0
+        self._mark_bytes = byte_base
+
+    def byte_offset(self, i: int) -> int:
+        """
+        Absolute UTF-8 byte offset of buf[i] in the stream.
+
+        Requires track_bytes=True. Calls must be non-decreasing in stream
+        position, which keeps the total encoding work linear in file size.
+        """
+        if not self._track_bytes:
+            raise RuntimeError("ChunkedTextReader was created without track_bytes")
+        if i < self._mark:
+            raise ValueError("byte_offset positions must be non-decreasing")
+        self._mark_bytes += len(self.buf[self._mark:i].encode("utf-8", errors="replace"))
+        self._mark = i
+        return self._mark_bytes
+
+    def fill(self) -> bool:
+        """
+        Appends more text to the window. Returns False once the stream is exhausted.
+
+        The read size grows with the unconsumed tail, so re-scanning a record
+        that spans many chunks stays amortized linear.
+        """
+        if self.eof:
+            return False
+
+        if self.pos:
+            if self._track_bytes:
+                self.byte_offset(max(self._mark, self.pos))
+                self._mark -= self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        chunk = self._fp.read(max(self.chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buf += chunk
+        return True
+
+
+RawCapture = Callable[[int, int], Optional[Dict[str, Any]]]
+
+
+def raw_from_text(text: str, raw_mode: str, *, byte_offset: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Raw payload for a record whose full source text is at hand.
+    """
+    if raw_mode == RAW_OFF:
+        return None
+    if raw_mode == RAW_TRUNCATED:
+        return {"text": text[:RAW_TRUNCATE_CHARS]}
+    if raw_mode == RAW_OFFSETS:
+        return {"offset": byte_offset, "length": len(text.encode("utf-8", errors="replace"))}
+    raise ValueError(f"Unknown raw_mode: {raw_mode!r} (expected one of {RAW_MODES})")
+
+
+def make_raw_capture(reader: ChunkedTextReader, raw_mode: str) -> Optional[RawCapture]:
+    """
+    Returns fn(start, end) -> raw payload for the record at reader.buf[start:end],
+    or None when raw_mode is RAW_OFF. Must be called before the reader refills.
+    """
+    if raw_mode == RAW_OFF:
+        return None
+
+    if raw_mode == RAW_TRUNCATED:
+        def _truncated(start: int, end: int) -> Optional[Dict[str, Any]]:
+            return {"text": reader.buf[start:min(end, start + RAW_TRUNCATE_CHARS)]}
+
+        return _truncated
+
+    if raw_mode == RAW_OFFSETS:
+        def _offsets(start: int, end: int) -> Optional[Dict[str, Any]]:
+            b_start = reader.byte_offset(start)
+            return {"offset": b_start, "length": reader.byte_offset(end) - b_start}
+
+        return _offsets
+
+    raise ValueError(f"Unknown raw_mode: {raw_mode!r} (expected one of {RAW_MODES})")
+
+
+# Bytes per read when skipping through a member stream that can't seek
+_SKIP_CHUNK_BYTES = 1 << 20
+
+
+def _skip_to(f: IO[bytes], offset: int) -> None:
+    # zip members seek (by decompressing forward internally); stream-mode
+    # members don't, so read up to the record in bounded chunks
+    if f.seekable():
+        f.seek(offset)
+        return
+    left = offset
+    while left > 0:
+        chunk = f.read(min(left, _SKIP_CHUNK_BYTES))
+        if not chunk:
+            return
+        left -= len(chunk)
+
+
+def read_raw_slice(event: TakeoutEvent) -> Optional[str]:
+    """
+    Re-reads the source text of an event captured with RAW_OFFSETS.
+    """
+    raw = event.raw or {}
+    if "offset" not in raw:
+        return None
+
+    if ARCHIVE_MEMBER_SEP in event.source_file and not Path(event.source_file).exists():
+        from app.data.parsers.takeout_archive import open_archive_member
+
+        with open_archive_member(event.source_file) as f:
+            _skip_to(f, raw["offset"])
+            return f.read(raw["length"]).decode("utf-8", errors="replace")
+
+    with open(event.source_file, "rb") as f:
+        f.seek(raw["offset"])
+        return f.read(raw["length"]).decode("utf-8", errors="replace")
+
+
 def safe_load_json(path: Path) -> Any:
     txt = safe_read_text(path)
     try:
@@ -90,6 +298,140 @@ def safe_load_json(path: Path) -> Any:
         raise TakeoutParseError(f"Invalid JSON in {path}: {e}") from e
 
 
+# -------------------------
+# Timestamps
+# -------------------------
+
+# occurred_at value for "no timestamp" in epoch columns
+NO_TIME = -(2**63)
+
+_MONTHS = {
+    name: i
+    for i, names in enumerate(
+        (
+            ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+            ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+            ("sep", "sept", "september"), ("oct", "october"),
+            ("nov", "november"), ("dec", "december"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+
+# Zone abbreviations seen in English-locale Takeout HTML (offset minutes).
+# Ambiguous ones (IST, CST-as-China, ...) are deliberately left out.
+_TZ_ABBR_MINUTES = {
+    "UTC": 0, "GMT": 0, "Z": 0, "WET": 0,
+    "WEST": 60, "BST": 60, "CET": 60, "CEST": 120, "EET": 120, "EEST": 180,
+    "EST": -300, "EDT": -240, "CST": -360, "CDT": -300, "MST": -420, "MDT": -360,
+    "PST": -480, "PDT": -420, "AKST": -540, "AKDT": -480, "HST": -600,
+    "JST": 540, "KST": 540, "AEST": 600, "AEDT": 660,
+}
+
+# "Jan 1, 2023, 1:23:45 PM UTC" (newer exports use U+202F before AM/PM)
+_LOCALE_TIME_RE = re.compile(
+    r"([A-Za-z]{3,9})\.? (\d{1,2}), (\d{4}),? (\d{1,2}):(\d{2}):(\d{2})[\s\u202f]*([AaPp][Mm])"
+    r"\s+([A-Z]{1,5}(?:[+-]\d{1,2}(?::?\d{2})?)?)"
+)
+_TZ_OFFSET_RE = re.compile(r"(?:GMT|UTC)([+-])(\d{1,2}):?(\d{2})?")
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_SECOND = timedelta(seconds=1)
+_fromisoformat = datetime.fromisoformat
+
+
+def decode_takeout_time(value: str) -> Optional[datetime]:
+    """
+    Fast path for the fixed Takeout shape YYYY-MM-DDTHH:MM:SS(.fff)Z.
+
+    The shape is checked by direct indexing, then handed straight to the C
+    fromisoformat (3.11+ accepts "Z") without strip/rewrite. On CPython this
+    beats slicing + int() in Python. Returns None for any other shape.
+    """
+    if len(value) < 20 or value[-1] != "Z":
+        return None
+    if value[10] != "T" or value[4] != "-" or value[13] != ":":
+        return None
+    try:
+        return _fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def to_epoch(dt: datetime) -> int:
+    """
+    UTC epoch seconds (floor). Naive datetimes are taken as UTC, like parse_iso_datetime.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _ONE_SECOND
+
+
+@lru_cache(maxsize=256)
+def _zone_for(tz_s: str) -> Optional[timezone]:
+    """
+    Resolves a locale-format zone token (abbreviation or GMT+hh:mm); cached,
+    since a single export only ever uses a handful.
+    """
+    offset = _TZ_ABBR_MINUTES.get(tz_s)
+    if offset is None:
+        # GMT+2 / UTC-05:00 / GMT+0530
+        om = _TZ_OFFSET_RE.fullmatch(tz_s)
+        if not om:
+            return None
+        hours, minutes = int(om.group(2)), int(om.group(3) or 0)
+        if hours >= 24 or minutes >= 60:
+            return None  # not a real offset (timezone() rejects +-24h)
+        offset = hours * 60 + minutes
+        if om.group(1) == "-":
+            offset = -offset
+    return timezone(timedelta(minutes=offset)) if offset else timezone.utc
+
+
+def parse_locale_datetime(value: str) -> Optional[datetime]:
+    """
+    Parses the English-locale HTML Takeout format, e.g.:
+    - Jan 1, 2023, 1:23:45 PM UTC
+    - Sep 30, 2024, 11:02:07\u202fPM CEST
+    - Mar 3, 2022, 9:00:00 AM GMT+01:00
+
+    Searches within `value`, so a whole text line can be passed.
+    """
+    m = _LOCALE_TIME_RE.search(value)
+    if not m:
+        return None
+
+    mon_s, day_s, year_s, hh_s, mm_s, ss_s, ampm, tz_s = m.groups()
+    month = _MONTHS.get(mon_s.lower())
+    if month is None:
+        return None
+
+    tz = _zone_for(tz_s.upper())
+    if tz is None:
+        return None
+
+    hour = int(hh_s) % 12
+    if ampm.upper() == "PM":
+        hour += 12
+
+    try:
+        dt = datetime(int(year_s), month, int(day_s), hour, int(mm_s), int(ss_s))
+    except ValueError:
+        return None
+
+    return dt.replace(tzinfo=tz).astimezone(timezone.utc)
+
+
+def find_locale_datetime(text: str) -> Optional[str]:
+    """
+    Returns the first locale-format timestamp substring in text, if any.
+    """
+    m = _LOCALE_TIME_RE.search(text)
+    return m.group(0) if m else None
+
+
 def parse_iso_datetime(value: str) -> Optional[datetime]:
     """
     Accepts:
@@ -97,6 +439,10 @@ def parse_iso_datetime(value: str) -> Optional[datetime]:
     - 2023-01-15T03:20:11Z
     - 2023-01-15T03:20:11+00:00
     """
+    fast = decode_takeout_time(value)
+    if fast is not None:
+        return fast
+
     v = value.strip()
     if not v:
         return None
@@ -114,11 +460,53 @@ def parse_iso_datetime(value: str) -> Optional[datetime]:
         return None
 
 
+def parse_takeout_time(value: str, *, as_epoch: bool = False) -> Union[datetime, int, None]:
+    """
+    Any Takeout timestamp (ISO from JSON, locale text from HTML).
+
+    as_epoch=True returns UTC epoch seconds instead of a datetime.
+    """
+    dt = parse_iso_datetime(value) or parse_locale_datetime(value)
+    if dt is None:
+        return None
+    return to_epoch(dt) if as_epoch else dt
+
+
+def parse_takeout_times(values: Iterable[Optional[str]]) -> array:
+    """
+    Column-at-a-time parse: returns array('q') of epoch seconds (NO_TIME where unparseable).
+    """
+    out = array("q")
+    append = out.append
+    decode = decode_takeout_time
+    epoch, one = _EPOCH, _ONE_SECOND
+
+    for v in values:
+        if not v:
+            append(NO_TIME)
+            continue
+        fast = decode(v)
+        if fast is not None:
+            append((fast - epoch) // one)
+            continue
+        slow = parse_takeout_time(v, as_epoch=True)
+        append(slow if isinstance(slow, int) else NO_TIME)
+
+    return out
+
+
 def best_effort_datetime(obj: Dict[str, Any]) -> Optional[datetime]:
     """
     Attempts to locate a datetime field inside a Takeout JSON item.
     """
-    for k in _YT_TIME_KEYS:
+    # nearly every watch/listen row has "time" in the fast-path shape
+    val = obj.get("time")
+    if isinstance(val, str):
+        dt = parse_iso_datetime(val)
+        if dt:
+            return dt
+
+    for k in _YT_TIME_KEYS[1:]:
         val = obj.get(k)
         if isinstance(val, str):
             dt = parse_iso_datetime(val)
@@ -127,7 +515,10 @@ def best_effort_datetime(obj: Dict[str, Any]) -> Optional[datetime]:
     return None
 
 
-def normalize_title_artist(title: Optional[str], artist: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+def normalize_title_artist(
+    title: Optional[str],
+    artist: Optional[str],
+) -> Tuple[Optional[str], Optional[str]]:
     t = compact_ws(title) if title else None
     a = compact_ws(artist) if artist else None
 
@@ -156,6 +547,71 @@ def make_fingerprint(
     return sha256_hex(base)
 
 
+FP_FIELD_SEP = b"\x1f"
+# Time field: a flag byte, then the epoch (8 bytes LE) only if there is one,
+# so "no time" can't collide with any real timestamp
+FP_TIME_FLAG = b"\x00"
+FP_NO_TIME_BYTES = b"\x01"
+
+
+def make_fingerprint_key(
+    occurred_epoch: Optional[int],
+    title: Optional[str],
+    artist: Optional[str],
+    source_file: Optional[str] = None,
+    *,
+    digest_size: int = 8,
+) -> Union[int, bytes]:
+    """
+    Compact, non-cryptographic dedupe key over the raw fields (blake2b).
+
+    No ISO formatting or f-string: fields are encoded and fed to the hash as
+    bytes. digest_size=8 returns an int (fits a uint64 column / FingerprintSet),
+    digest_size=16 returns bytes. source_file=None gives a source-independent key.
+    """
+    if occurred_epoch is None:
+        ts = FP_NO_TIME_BYTES
+    else:
+        ts = FP_TIME_FLAG + occurred_epoch.to_bytes(8, "little", signed=True)
+    parts = [ts, title.encode("utf-8", errors="ignore") if title else b"", FP_FIELD_SEP]
+    if artist:
+        parts.append(artist.encode("utf-8", errors="ignore"))
+    if source_file is not None:
+        parts.append(FP_FIELD_SEP)
+        parts.append(source_file.encode("utf-8", errors="ignore"))
+
+    digest = hashlib.blake2b(b"".join(parts), digest_size=digest_size).digest()
+    return int.from_bytes(digest, "little") if digest_size == 8 else digest
+
+
+def _as_epoch(occurred_at: Union[datetime, int, None]) -> Optional[int]:
+    if occurred_at is None or isinstance(occurred_at, int):
+        return occurred_at
+    return to_epoch(occurred_at)
+
+
+def fingerprint_for_mode(
+    mode: str,
+    occurred_at: Union[datetime, int, None],
+    title: Optional[str],
+    artist: Optional[str],
+    source_file: str,
+) -> Fingerprint:
+    """
+    occurred_at may be a datetime or UTC epoch seconds.
+    """
+    if mode == FP_SHA256:
+        if isinstance(occurred_at, int):
+            occurred_at = _EPOCH + timedelta(seconds=occurred_at)
+        return make_fingerprint(occurred_at, title, artist, source_file)
+    epoch = _as_epoch(occurred_at)
+    if mode == FP_BLAKE64:
+        return make_fingerprint_key(epoch, title, artist, source_file, digest_size=8)
+    if mode == FP_BLAKE128:
+        return make_fingerprint_key(epoch, title, artist, source_file, digest_size=16)
+    raise ValueError(f"Unknown fingerprint mode: {mode!r} (expected one of {FP_MODES})")
+
+
 def iter_takeout_files(root: Path, suffixes: Tuple[str, ...] = (".json", ".html")) -> Iterable[Path]:
     if root.is_file():
         if root.suffix.lower() in suffixes:
@@ -180,20 +636,25 @@ def looks_like_takeout_music_title(s: str) -> bool:
 
 def build_event(
     *,
-    source_file: Path,
+    source_file: SourceName,
     source_kind: str,
-    occurred_at: Optional[datetime],
+    occurred_at: Union[datetime, int, None],
     title: Optional[str],
     artist: Optional[str],
     album: Optional[str] = None,
     raw: Optional[Dict[str, Any]] = None,
+    fingerprint_mode: str = FP_SHA256,
 ) -> TakeoutEvent:
     title, artist = normalize_title_artist(title, artist)
-    fp = make_fingerprint(occurred_at, title, artist, str(source_file))
+    # one shared str per file/kind (and per artist) instead of one per row
+    src = sys.intern(str(source_file))
+    if artist:
+        artist = sys.intern(artist)
+    fp = fingerprint_for_mode(fingerprint_mode, occurred_at, title, artist, src)
     return TakeoutEvent(
-        source_file=str(source_file),
-        source_kind=source_kind,
-        occurred_at=occurred_at,
+        source_file=src,
+        source_kind=sys.intern(source_kind),
+        occurred_epoch=_as_epoch(occurred_at),
         title=title,
         artist=artist,
         album=album,
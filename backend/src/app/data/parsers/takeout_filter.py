@@ -0,0 +1,136 @@
+# location: backend/src/app/data/parsers/takeout_filter.py
+# purpose: Cheap music-only row classifier, run before normalization / hashing / event allocation
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# Drop reasons (keys of MusicRowFilter.dropped)
+DROP_AD = "ad"                # "From Google Ads" rows
+DROP_NOT_A_PLAY = "not_a_play"  # searches, visits, removed videos, ...
+DROP_METADATA = "metadata"    # HTML "Products:" / caption cells
+DROP_NON_MUSIC = "non_music"  # regular video with no music signal
+
+_MUSIC_HEADER = "YouTube Music"
+_MUSIC_HOST = "music.youtube.com"
+# auto-generated artist channels and label channels
+_TOPIC_SUFFIX = " - Topic"
+_VEVO_SUFFIX = "VEVO"
+# official uploads on regular YouTube ("Official Video", "Official Audio", "Lyric Video", ...)
+_MUSIC_TITLE_MARKERS = (
+    "official video", "official music video", "official audio", "lyric video", "(audio)",
+)
+# activity rows that aren't plays, by how Takeout words them
+_NOT_A_PLAY_PREFIXES = ("Searched for ", "Visited ", "Viewed ")
+
+
+def _is_not_a_play(title: str) -> bool:
+    return title.startswith(_NOT_A_PLAY_PREFIXES)
+
+
+def _title_has_music_marker(title: str) -> bool:
+    low = title.lower()
+    return any(m in low for m in _MUSIC_TITLE_MARKERS)
+
+
+def _channel_is_music(name: Any) -> bool:
+    return isinstance(name, str) and (name.endswith(_TOPIC_SUFFIX) or name.endswith(_VEVO_SUFFIX))
+
+
+class MusicRowFilter:
+    """
+    Decides, from the raw Takeout row alone, whether it is a music play.
+
+    Runs on the decoded JSON item / raw HTML block before build_event, so
+    rejected rows never pay for title normalization, fingerprinting or an
+    event object. Signals, in order:
+    - "From Google Ads" detail -> dropped
+    - header "YouTube Music" (HTML: the entry's header-cell), a
+      music.youtube.com URL or a "- Topic"/VEVO channel -> kept
+    - title starting "Searched for " / "Visited " / ... -> dropped as not a play
+    - "Official Video/Audio"-style title -> kept
+    - everything else -> dropped as non-music
+
+    Counts are kept per instance (kept + dropped by reason); use one filter
+    per import to report what was skipped.
+    """
+
+    __slots__ = ("kept", "dropped")
+
+    def __init__(self) -> None:
+        self.kept = 0
+        self.dropped: Counter = Counter()
+
+    def _drop(self, reason: str) -> bool:
+        self.dropped[reason] += 1
+        return False
+
+    def _keep(self) -> bool:
+        self.kept += 1
+        return True
+
+    def accept_json(self, item: Dict[str, Any]) -> bool:
+        details = item.get("details")
+        if details and any(
+            isinstance(d, dict) and d.get("name") == "From Google Ads" for d in details
+        ):
+            return self._drop(DROP_AD)
+
+        title = item.get("title")
+        if not isinstance(title, str) or not title:
+            return self._drop(DROP_NOT_A_PLAY)
+
+        if item.get("header") == _MUSIC_HEADER:
+            return self._keep()
+
+        url = item.get("titleUrl")
+        if isinstance(url, str) and _MUSIC_HOST in url:
+            return self._keep()
+
+        subs = item.get("subtitles")
+        if subs and isinstance(subs, list) and isinstance(subs[0], dict):
+            if _channel_is_music(subs[0].get("name")):
+                return self._keep()
+
+        if _is_not_a_play(title):
+            return self._drop(DROP_NOT_A_PLAY)
+        if _title_has_music_marker(title):
+            return self._keep()
+
+        return self._drop(DROP_NON_MUSIC)
+
+    def accept_html(self, block: str, header: Optional[str] = None) -> bool:
+        """
+        header is the text of the entry's header-cell ("YouTube Music",
+        "YouTube"), which sits outside the content-cell block.
+        """
+        if "Products:" in block:
+            return self._drop(DROP_METADATA)
+        if "From Google Ads" in block:
+            return self._drop(DROP_AD)
+
+        if header == _MUSIC_HEADER:
+            return self._keep()
+        if _MUSIC_HOST in block:
+            return self._keep()
+        if _TOPIC_SUFFIX + "</a>" in block or _VEVO_SUFFIX + "</a>" in block:
+            return self._keep()
+
+        if "<a" not in block:
+            # watch rows always link the video; removed videos / notices don't
+            return self._drop(DROP_NOT_A_PLAY)
+        if _is_not_a_play(block[block.find(">") + 1:].lstrip()):
+            return self._drop(DROP_NOT_A_PLAY)
+        if _title_has_music_marker(block):
+            return self._keep()
+
+        return self._drop(DROP_NON_MUSIC)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "kept": self.kept,
+            "dropped": sum(self.dropped.values()),
+            "dropped_by_reason": dict(self.dropped),
+        }
+
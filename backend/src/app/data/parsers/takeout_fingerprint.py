@@ -0,0 +1,176 @@
+# location: backend/src/app/data/parsers/takeout_fingerprint.py
+# purpose: Bulk fingerprinting over columnar batches + a compact 64-bit dedupe set
+
+from __future__ import annotations
+
+import hashlib
+from array import array
+from typing import Iterable, Iterator, List, Optional, Union, cast
+
+from app.data.parsers.takeout_columnar import EventBatch
+from app.data.parsers.takeout_common import (
+    FP_FIELD_SEP,
+    FP_NO_TIME_BYTES,
+    FP_TIME_FLAG,
+    NO_TIME,
+    TakeoutEvent,
+    make_fingerprint_key,
+)
+
+
+def _encode_values(values: List[Optional[str]]) -> List[bytes]:
+    return [v.encode("utf-8", errors="ignore") if v else b"" for v in values]
+
+
+def dedupe_key(ev: TakeoutEvent) -> int:
+    """
+    Source-independent 64-bit key for cross-file / cross-import dedupe.
+
+    Unlike TakeoutEvent.fingerprint it is not salted with source_file, and
+    title/artist are casefolded, so the same play from the JSON and HTML
+    exports (or from a second Takeout) maps to the same key.
+    """
+    title = ev.title.casefold() if ev.title else None
+    artist = ev.artist.casefold() if ev.artist else None
+    return cast(int, make_fingerprint_key(ev.occurred_epoch, title, artist, None, digest_size=8))
+
+
+def fingerprint_batch(
+    batch: EventBatch,
+    *,
+    digest_size: int = 8,
+    include_source: bool = True,
+) -> Union[array, List[bytes]]:
+    """
+    Computes make_fingerprint_key for every row of a batch in one pass.
+
+    Dictionary values are encoded once per batch, not once per row, so a row
+    costs one join + one blake2b call. Returns array('Q') for digest_size=8,
+    a list of digests otherwise. include_source=False gives the
+    source-independent key (same as passing source_file=None).
+    """
+    titles = _encode_values(batch.title.values)
+    artists = _encode_values(batch.artist.values)
+    sources = [FP_FIELD_SEP + b for b in _encode_values(batch.source_file.values)]
+
+    t_codes = batch.title.codes
+    a_codes = batch.artist.codes
+    s_codes = batch.source_file.codes
+    blake2b = hashlib.blake2b
+    join = b"".join
+
+    as_int = digest_size == 8
+    ints = array("Q")
+    keys: List[bytes] = []
+
+    for i, ts in enumerate(batch.occurred_at):
+        if ts == NO_TIME:
+            ts_b = FP_NO_TIME_BYTES
+        else:
+            ts_b = FP_TIME_FLAG + ts.to_bytes(8, "little", signed=True)
+        parts = [ts_b, titles[t_codes[i]], FP_FIELD_SEP, artists[a_codes[i]]]
+        if include_source:
+            parts.append(sources[s_codes[i]])
+        digest = blake2b(join(parts), digest_size=digest_size).digest()
+        if as_int:
+            ints.append(int.from_bytes(digest, "little"))
+        else:
+            keys.append(digest)
+
+    return ints if as_int else keys
+
+
+class FingerprintSet:
+    """
+    Open-addressing hash set of 64-bit fingerprints backed by one array('Q').
+
+    11-22 bytes per key depending on load (vs ~70 for a set of Python ints),
+    so 10M+ keys fit comfortably in memory. Keys are already uniform hashes,
+    so the low bits index directly; 0 marks an empty slot and is tracked aside.
+    """
+
+    __slots__ = ("_slots", "_mask", "_size", "_has_zero")
+
+    _MAX_LOAD = 0.75
+
+    def __init__(self, capacity: int = 1024) -> None:
+        n = 8
+        while n * self._MAX_LOAD < capacity:
+            n <<= 1
+        self._slots = array("Q", bytes(8 * n))
+        self._mask = n - 1
+        self._size = 0
+        self._has_zero = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: int) -> bool:
+        if key == 0:
+            return self._has_zero
+        slots, mask = self._slots, self._mask
+        i = key & mask
+        while True:
+            v = slots[i]
+            if v == key:
+                return True
+            if v == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, key: int) -> bool:
+        """
+        Inserts key; returns True if it was not present (i.e. the row is new).
+        """
+        if key == 0:
+            if self._has_zero:
+                return False
+            self._has_zero = True
+            self._size += 1
+            return True
+
+        if (self._size + 1) > (self._mask + 1) * self._MAX_LOAD:
+            self._grow()
+
+        slots, mask = self._slots, self._mask
+        i = key & mask
+        while True:
+            v = slots[i]
+            if v == key:
+                return False
+            if v == 0:
+                slots[i] = key
+                self._size += 1
+                return True
+            i = (i + 1) & mask
+
+    def update(self, keys: Iterable[int]) -> int:
+        """
+        Adds many keys; returns how many were new.
+        """
+        added = 0
+        for k in keys:
+            if self.add(k):
+                added += 1
+        return added
+
+    def _grow(self) -> None:
+        old = self._slots
+        n = len(old) * 2
+        slots = array("Q", bytes(8 * n))
+        mask = n - 1
+        for key in old:
+            if key:
+                i = key & mask
+                while slots[i]:
+                    i = (i + 1) & mask
+                slots[i] = key
+        self._slots = slots
+        self._mask = mask
+
+    def __iter__(self) -> Iterator[int]:
+        if self._has_zero:
+            yield 0
+        for key in self._slots:
+            if key:
+                yield key
@@ -3,102 +3,312 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import List, Optional, Tuple
+import html
 import logging
 import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
+from app.data.parsers.takeout_columnar import DEFAULT_BATCH_SIZE, EventBatch, iter_event_batches
 from app.data.parsers.takeout_common import (
+    DEFAULT_CHUNK_CHARS,
+    FP_SHA256,
+    RAW_OFF,
+    RAW_OFFSETS,
+    ChunkedTextReader,
     ParseReport,
+    SourceName,
     TakeoutEvent,
     build_event,
     compact_ws,
-    parse_iso_datetime,
-    safe_read_text,
+    find_locale_datetime,
+    make_raw_capture,
+    open_takeout_text,
+    parse_takeout_time,
+    raw_from_text,
     strip_html_tags,
 )
+from app.data.parsers.takeout_filter import MusicRowFilter
 
 log = logging.getLogger(__name__)
 
 # Google Takeout HTML often contains repeated "content-cell" blocks.
-_BLOCK_RE = re.compile(r'(<div[^>]+class="content-cell[^"]*"[^>]*>.*?</div>)', re.DOTALL | re.IGNORECASE)
+# A block runs from the opening tag to the first closing </div> after it.
+_BLOCK_OPEN_RE = re.compile(r'<div[^>]+class="content-cell[^"]*"[^>]*>', re.IGNORECASE)
+_BLOCK_CLOSE_RE = re.compile(r"</div>", re.IGNORECASE)
+# Each entry's product name ("YouTube Music") is in a header-cell just
+# before its content-cell
+_HEADER_RE = re.compile(r'class="header-cell[^"]*"[^>]*>\s*<p[^>]*>([^<]*)<', re.IGNORECASE)
+# Unmatched text kept when a buffer has no block opener, so a header-cell
+# cut by the buffer edge is still found in front of the next block
+_HEADER_LOOKBACK_CHARS = 1024
 # Often timestamps appear as: <div class="content-cell ..."><a ...>Title</a><br>Jan 1, 2023, 1:23:45 PM UTC</div>
-# But formats vary. We'll attempt ISO first, then fallback to "UTC" style text.
+# But formats vary. We'll attempt ISO first, then fallback to the locale text format.
 _ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z")
 
 
-def _extract_title_artist_from_block(text_block: str) -> Tuple[Optional[str], Optional[str]]:
+# Fallback "Song – Artist" split for blocks without anchors
+_DASH_SPLIT_RE = re.compile(r"^(.*?)[–—-]\s+(.*)$")
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_ANCHOR_RE = re.compile(r"<a\b[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+
+
+def _anchor_text(s: str) -> Optional[str]:
+    if "<" in s:
+        s = strip_html_tags(s)
+    else:
+        s = compact_ws(s)
+    if "&" in s:
+        s = html.unescape(s)
+    return s or None
+
+
+def _extract_block_fields(block: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
-    Very conservative: strip tags, then infer title/artist if possible.
+    One pass over a content-cell block: (title, artist, timestamp string).
+
+    Takeout lays a cell out as <br>-separated lines:
+        Watched <a href="…/watch?v=…">Title</a><br>
+        <a href="…/channel/…">Channel</a><br>
+        Jan 1, 2023, 1:23:45 PM UTC
+    so the first anchor is the title, the anchor on a later line is the
+    channel (artist) and a plain line holds the time. Blocks without anchors
+    fall back to the plain text, split on " - " if present.
     """
-    plain = strip_html_tags(text_block)
-    if not plain:
-        return None, None
+    m = _ISO_RE.search(block)
+    dt_raw = m.group(0) if m else None
+
+    start = block.find(">") + 1
+    end = block.rfind("<")
+    inner = block[start:end] if end >= start else block[start:]
+
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    plain: List[str] = []
+
+    for line in _BR_RE.split(inner):
+        a = _ANCHOR_RE.search(line)
+        if a is not None:
+            if title is None:
+                title = _anchor_text(a.group(1))
+            elif artist is None:
+                artist = _anchor_text(a.group(1))
+            continue
 
-    # many blocks become: "Watched Song Title Artist Name Jan 1, 2023..."
-    # We try to keep first chunk as title.
-    parts = [p for p in re.split(r"\s{2,}|\n", plain) if p.strip()]
-    joined = compact_ws(" ".join(parts))
+        text = strip_html_tags(line) if "<" in line else compact_ws(line)
+        if not text:
+            continue
+        if dt_raw is None:
+            dt_raw = find_locale_datetime(text)
+            if dt_raw is not None:
+                continue
+        plain.append(text)
 
-    # If there's a " - " pattern, use it.
-    m = re.match(r"^(.*?)[–—-]\s+(.*)$", joined)
-    if m:
-        return m.group(1).strip() or None, m.group(2).strip() or None
+    if title is None and plain:
+        joined = " ".join(plain)
+        if m is not None:
+            joined = compact_ws(joined.replace(m.group(0), " "))
+        if "&" in joined:
+            joined = html.unescape(joined)
+        dm = _DASH_SPLIT_RE.match(joined)
+        if dm:
+            return dm.group(1).strip() or None, dm.group(2).strip() or None, dt_raw
+        title = joined
 
-    # Else: first phrase as title, no artist
-    # (routes later can improve via matching/search)
-    return joined or None, None
+    return title, artist, dt_raw
 
 
-def _extract_datetime_from_block(text_block: str) -> Optional[str]:
+def _header_in(text: str) -> Optional[str]:
+    header = None
+    for hm in _HEADER_RE.finditer(text):
+        header = compact_ws(html.unescape(hm.group(1))) or None
+    return header
+
+
+def _iter_html_blocks(reader: ChunkedTextReader) -> Iterator[Tuple[str, int, Optional[str]]]:
     """
-    Returns an ISO-ish string if found (best effort).
+    Incremental content-cell tokenizer, yielding (block, start index in
+    reader.buf, header-cell text of the block's entry or None).
+
+    Each position in the document is scanned a bounded number of times and
+    only the current (possibly partial) block is kept across buffer edges.
     """
-    m = _ISO_RE.search(text_block)
-    if m:
-        return m.group(0)
+    # header of a block deferred to the next fill (its lookback is dropped then)
+    deferred = False
+    deferred_header: Optional[str] = None
+    while True:
+        buf = reader.buf
+        m = _BLOCK_OPEN_RE.search(buf, reader.pos)
+        if m is None:
+            # keep a trailing, unterminated tag: it may be a block opener split
+            # by the edge; keep a short lookback for its entry's header-cell
+            cut = buf.rfind("<", reader.pos)
+            end = cut if cut != -1 and buf.find(">", cut) == -1 else len(buf)
+            reader.pos = max(reader.pos, min(end, len(buf) - _HEADER_LOOKBACK_CHARS))
+            if not reader.fill():
+                return
+            continue
 
-    # fallback: look for "UTC" / "GMT" lines after stripping
-    plain = strip_html_tags(text_block)
-    if "UTC" in plain or "GMT" in plain:
-        return plain  # we will fail parsing, but keep raw; occurred_at None
+        if deferred:
+            header = deferred_header
+        else:
+            header = _header_in(buf[reader.pos:m.start()])
+        close = _BLOCK_CLOSE_RE.search(buf, m.end())
+        if close is None:
+            deferred, deferred_header = True, header
+            reader.pos = m.start()
+            if not reader.fill():
+                return  # unterminated block at EOF
+            continue
 
-    return None
+        deferred = False
+        reader.pos = close.end()
+        yield buf[m.start():close.end()], m.start(), header
 
 
-def parse_takeout_html_file(path: Path) -> Tuple[List[TakeoutEvent], ParseReport]:
-    errors: List[str] = []
-    events: List[TakeoutEvent] = []
+def _block_to_event(
+    path: SourceName,
+    block: str,
+    raw: Optional[Dict[str, Any]],
+    fingerprint_mode: str,
+) -> TakeoutEvent:
+    title, artist, dt_raw = _extract_block_fields(block)
+    occurred_at = parse_takeout_time(dt_raw) if dt_raw else None
+
+    return build_event(
+        source_file=path,
+        source_kind="html",
+        occurred_at=occurred_at,
+        title=title,
+        artist=artist,
+        album=None,
+        raw=raw,
+        fingerprint_mode=fingerprint_mode,
+    )
+
+
+def iter_takeout_html_stream(
+    fp: TextIO,
+    source: SourceName,
+    *,
+    errors: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    row_filter: Optional[MusicRowFilter] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams Takeout HTML from an open text stream (a file, or an archive
+    member); `source` becomes each event's source_file.
+    """
+    errors = errors if errors is not None else []
+    found_blocks = False
 
-    html = safe_read_text(path)
-    blocks = _BLOCK_RE.findall(html)
-    if not blocks:
-        # fallback: treat entire file as 1 block list (some takeouts don't use content-cell)
-        blocks = [html]
+    reader = ChunkedTextReader(fp, chunk_size=chunk_size, track_bytes=raw_mode == RAW_OFFSETS)
+    capture = make_raw_capture(reader, raw_mode)
+    reader.fill()
+    # first buffer doubles as the no-content-cell fallback below
+    head = reader.buf[:chunk_size]
 
-    for idx, block in enumerate(blocks):
+    for idx, (block, start, header) in enumerate(_iter_html_blocks(reader)):
+        found_blocks = True
+        if row_filter is not None and not row_filter.accept_html(block, header):
+            continue
         try:
-            dt_raw = _extract_datetime_from_block(block)
-            occurred_at = parse_iso_datetime(dt_raw) if isinstance(dt_raw, str) else None
-
-            title, artist = _extract_title_artist_from_block(block)
-            ev = build_event(
-                source_file=path,
-                source_kind="html",
-                occurred_at=occurred_at,
-                title=title,
-                artist=artist,
-                album=None,
-                raw={"block": block[:2000]},  # cap for safety
-            )
-            events.append(ev)
+            raw = capture(start, start + len(block)) if capture else None
+            ev = _block_to_event(source, block, raw, fingerprint_mode)
         except Exception as e:
             errors.append(f"block {idx}: {e}")
+            continue
+        yield ev
 
+    if not found_blocks:
+        # fallback: some takeouts don't use content-cell; treat the document
+        # (its first buffer, for very large files) as a single block
+        if row_filter is not None and not row_filter.accept_html(head, _header_in(head)):
+            return
+        try:
+            yield _block_to_event(source, head, raw_from_text(head, raw_mode), fingerprint_mode)
+        except Exception as e:
+            errors.append(f"block 0: {e}")
+
+
+def iter_takeout_html_file(
+    path: Path,
+    *,
+    errors: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    row_filter: Optional[MusicRowFilter] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams a single Takeout HTML file in fixed-size buffers, yielding one
+    event per content-cell block. Memory stays flat regardless of file size.
+    raw_mode / fingerprint_mode pick the raw payload and fingerprint type
+    (see RAW_* / FP_* in takeout_common). row_filter (a MusicRowFilter)
+    drops non-music blocks before any field extraction.
+    """
+    with open_takeout_text(path) as fp:
+        yield from iter_takeout_html_stream(
+            fp,
+            path,
+            errors=errors,
+            chunk_size=chunk_size,
+            raw_mode=raw_mode,
+            fingerprint_mode=fingerprint_mode,
+            row_filter=row_filter,
+        )
+
+
+def iter_takeout_html_batches(
+    path: Path,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    errors: Optional[List[str]] = None,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Iterator[EventBatch]:
+    """
+    Columnar variant of iter_takeout_html_file: yields EventBatch chunks of up to batch_size rows.
+    """
+    events = iter_takeout_html_file(
+        path, errors=errors, raw_mode=raw_mode, fingerprint_mode=fingerprint_mode
+    )
+    return iter_event_batches(events, batch_size=batch_size)
+
+
+def parse_takeout_html_file(
+    path: Path,
+    *,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Tuple[List[TakeoutEvent], ParseReport]:
+    """
+    List-returning wrapper over iter_takeout_html_file.
+    """
+    errors: List[str] = []
+    events = list(
+        iter_takeout_html_file(
+            path, errors=errors, raw_mode=raw_mode, fingerprint_mode=fingerprint_mode
+        )
+    )
     return events, ParseReport(source_file=str(path), count=len(events), errors=errors)
 
 
-def parse_takeout_html_folder(root: Path) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
+def parse_takeout_html_folder(
+    root: Path,
+    *,
+    max_workers: int = 1,
+) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
+    """
+    max_workers != 1 fans files out to a process pool (see takeout_parallel).
+    """
+    if max_workers != 1:
+        from app.data.parsers.takeout_parallel import parse_takeout_folder_parallel
+
+        return parse_takeout_folder_parallel(root, suffixes=(".html",), max_workers=max_workers)
+
     reports: List[ParseReport] = []
     all_events: List[TakeoutEvent] = []
 
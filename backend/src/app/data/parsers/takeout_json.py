@@ -3,20 +3,32 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+import json
 import logging
 import re
 
+from app.data.parsers.takeout_columnar import DEFAULT_BATCH_SIZE, EventBatch, iter_event_batches
 from app.data.parsers.takeout_common import (
+    DEFAULT_CHUNK_CHARS,
+    FP_SHA256,
+    RAW_OFF,
+    RAW_OFFSETS,
+    ChunkedTextReader,
     ParseReport,
+    RawCapture,
+    SourceName,
     TakeoutEvent,
     TakeoutParseError,
     best_effort_datetime,
     build_event,
     compact_ws,
-    safe_load_json,
+    make_raw_capture,
+    open_takeout_text,
 )
+from app.data.parsers.takeout_filter import MusicRowFilter
 
 log = logging.getLogger(__name__)
 
@@ -61,64 +73,368 @@ def _extract_title_artist_from_takeout_item(item: Dict[str, Any]) -> Tuple[Optio
     return title or None, artist or None
 
 
-def parse_takeout_json_file(path: Path) -> Tuple[List[TakeoutEvent], ParseReport]:
+# Top-level keys that may hold the item list when the payload is an object
+_ITEM_KEYS = ("items", "events", "activity")
+_WS_RUN_RE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+# A decode error this close to the window edge may just be a value cut off
+# mid-token (e.g. "tru", "\u00"); further in, it is a real syntax error
+_TRUNCATION_TAIL_CHARS = 16
+
+
+@dataclass
+class JsonCheckpoint:
     """
-    Parses a single Takeout JSON file.
-    Returns: (events, report)
+    Where an append-only JSON history can be resumed from.
+
+    offset is the file byte offset just past the last item read from the
+    item array; resumable is False when items didn't come from an array
+    (the object-values fallback), in which case offset is meaningless.
     """
-    errors: List[str] = []
-    events: List[TakeoutEvent] = []
 
-    try:
-        payload = safe_load_json(path)
-    except TakeoutParseError as e:
-        return [], ParseReport(source_file=str(path), count=0, errors=[str(e)])
+    offset: int = 0
+    resumable: bool = False
+
+
+def _skip_ws(reader: ChunkedTextReader) -> Optional[str]:
+    """
+    Advances past whitespace and returns the next char (not consumed), or None at EOF.
+    """
+    while True:
+        m = _WS_RUN_RE.match(reader.buf, reader.pos)
+        if m is not None:  # always matches (may be empty)
+            reader.pos = m.end()
+        if reader.pos < len(reader.buf):
+            return reader.buf[reader.pos]
+        if not reader.fill():
+            return None
+
+
+def _expect(reader: ChunkedTextReader, chars: str, path: SourceName) -> str:
+    ch = _skip_ws(reader)
+    if ch is None or ch not in chars:
+        got = "EOF" if ch is None else repr(ch)
+        raise TakeoutParseError(f"Invalid JSON in {path}: expected one of {chars!r}, got {got}")
+    reader.pos += 1
+    return ch
+
+
+def _decode_value(reader: ChunkedTextReader, path: SourceName) -> Any:
+    """
+    Decodes one complete JSON value at reader.pos, pulling more input as needed.
+    """
+    return _decode_span(reader, path)[0]
+
+
+def _is_truncated(e: json.JSONDecodeError, buf: str) -> bool:
+    # an unterminated string ran to the end of the window
+    return e.msg.startswith("Unterminated string") or e.pos >= len(buf) - _TRUNCATION_TAIL_CHARS
+
+
+def _decode_span(reader: ChunkedTextReader, path: SourceName) -> Tuple[Any, int]:
+    """
+    Like _decode_value, but also returns the value's start index in reader.buf
+    (its end is the updated reader.pos).
+    """
+    while True:
+        start = reader.pos
+        try:
+            value, end = _DECODER.raw_decode(reader.buf, start)
+        except json.JSONDecodeError as e:
+            # only a value cut off by the window is worth more input; a
+            # malformed item must not pull the rest of the file in
+            if _is_truncated(e, reader.buf) and reader.fill():
+                continue
+            raise TakeoutParseError(f"Invalid JSON in {path}: {e}") from e
+
+        # A number/literal ending exactly at the window edge may continue in the next chunk
+        if end >= len(reader.buf) and reader.fill():
+            continue
+
+        reader.pos = end
+        return value, start
+
+
+def _decode_item(
+    reader: ChunkedTextReader,
+    path: SourceName,
+    capture: Optional[RawCapture],
+) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    value, start = _decode_span(reader, path)
+    return value, (capture(start, reader.pos) if capture else None)
+
+
+def _iter_array_values(
+    reader: ChunkedTextReader,
+    path: SourceName,
+    capture: Optional[RawCapture],
+) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+    """
+    Yields (value, raw) for the array whose '[' has just been consumed.
+    """
+    if _skip_ws(reader) == "]":
+        reader.pos += 1
+        return
+
+    yield from _iter_array_rest(reader, path, capture)
+
+
+def _iter_array_rest(
+    reader: ChunkedTextReader,
+    path: SourceName,
+    capture: Optional[RawCapture],
+) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+    """
+    Yields (value, raw) for array elements from reader.pos through the closing ']'.
+    """
+    while True:
+        _skip_ws(reader)
+        yield _decode_item(reader, path, capture)
+        if _expect(reader, ",]", path) == "]":
+            return
+
+
+def _iter_resumed_items(
+    reader: ChunkedTextReader,
+    path: SourceName,
+    capture: Optional[RawCapture],
+) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+    """
+    Yields (item, raw) for a stream opened at a JsonCheckpoint offset, i.e.
+    just past an item of the item array: only ',' (more items) or ']' can follow.
+    """
+    if _expect(reader, ",]", path) == ",":
+        yield from _iter_array_rest(reader, path, capture)
+
+
+def _iter_json_items(
+    reader: ChunkedTextReader,
+    path: SourceName,
+    capture: Optional[RawCapture] = None,
+    checkpoint: Optional[JsonCheckpoint] = None,
+) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+    """
+    Walks the Takeout payload shape without materializing it, yielding (item, raw).
 
-    # Takeout may be a list, or a dict with items
-    items: List[Any] = []
-    if isinstance(payload, list):
-        items = payload
-    elif isinstance(payload, dict):
-        # common: {"items": [...]}
-        for k in ("items", "events", "activity"):
-            if isinstance(payload.get(k), list):
-                items = payload[k]
-                break
-        if not items:
-            # last resort: treat values as items if they look like dicts
-            maybe = [v for v in payload.values() if isinstance(v, dict)]
-            items = maybe
-
-    if not items:
-        return [], ParseReport(source_file=str(path), count=0, errors=["No parsable items found in JSON"])
-
-    for idx, it in enumerate(items):
+    - top-level list: each element
+    - object: the first list under items/events/activity (document order);
+      otherwise, as a last resort, the object's dict values
+    """
+    first = _skip_ws(reader)
+    if first == "\ufeff":
+        reader.pos += 1
+        first = _skip_ws(reader)
+
+    if first == "[":
+        reader.pos += 1
+        if checkpoint is not None:
+            checkpoint.resumable = True
+        yield from _iter_array_values(reader, path, capture)
+        return
+
+    if first != "{":
+        # scalar payload (or empty file): nothing to walk
+        if first is not None:
+            _decode_value(reader, path)
+        return
+
+    reader.pos += 1
+    found_list = False
+    fallback: List[Tuple[Any, Optional[Dict[str, Any]]]] = []
+
+    if _skip_ws(reader) == "}":
+        reader.pos += 1
+        return
+
+    while True:
+        _skip_ws(reader)
+        key = _decode_value(reader, path)
+        _expect(reader, ":", path)
+
+        if not found_list and key in _ITEM_KEYS and _skip_ws(reader) == "[":
+            reader.pos += 1
+            found_list = True
+            if checkpoint is not None:
+                checkpoint.resumable = True
+            yield from _iter_array_values(reader, path, capture)
+        else:
+            _skip_ws(reader)
+            value, raw = _decode_item(reader, path, capture)
+            if not found_list and isinstance(value, dict):
+                fallback.append((value, raw))
+
+        if _expect(reader, ",}", path) == "}":
+            break
+
+    if not found_list:
+        yield from fallback
+
+
+def iter_takeout_json_stream(
+    fp: TextIO,
+    source: SourceName,
+    *,
+    errors: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    start_offset: int = 0,
+    checkpoint: Optional[JsonCheckpoint] = None,
+    row_filter: Optional[MusicRowFilter] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams Takeout JSON from an open text stream (a file, or an archive
+    member); `source` becomes each event's source_file. fp must already be
+    positioned at start_offset. See iter_takeout_json_file for the options.
+    """
+    errors = errors if errors is not None else []
+    seen_items = False
+    track_bytes = raw_mode == RAW_OFFSETS or checkpoint is not None
+
+    reader = ChunkedTextReader(
+        fp, chunk_size=chunk_size, track_bytes=track_bytes, byte_base=start_offset
+    )
+    capture = make_raw_capture(reader, raw_mode)
+
+    if start_offset:
+        if checkpoint is not None:
+            checkpoint.offset, checkpoint.resumable = start_offset, True
+        items = _iter_resumed_items(reader, source, capture)
+    else:
+        items = _iter_json_items(reader, source, capture, checkpoint)
+
+    for idx, (it, raw) in enumerate(items):
+        seen_items = True
+        if checkpoint is not None and checkpoint.resumable:
+            # the generator is parked right after this item's closing char
+            checkpoint.offset = reader.byte_offset(reader.pos)
         if not isinstance(it, dict):
             continue
+        if row_filter is not None and not row_filter.accept_json(it):
+            continue
 
         try:
             occurred_at = best_effort_datetime(it)
             title, artist = _extract_title_artist_from_takeout_item(it)
             ev = build_event(
-                source_file=path,
+                source_file=source,
                 source_kind="json",
                 occurred_at=occurred_at,
                 title=title,
                 artist=artist,
                 album=None,
-                raw=it,
+                raw=raw,
+                fingerprint_mode=fingerprint_mode,
             )
-            events.append(ev)
         except Exception as e:
             errors.append(f"row {idx}: {e}")
+            continue
+
+        yield ev
+
+    if not seen_items and not start_offset:
+        errors.append("No parsable items found in JSON")
+
+
+def iter_takeout_json_file(
+    path: Path,
+    *,
+    errors: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+    start_offset: int = 0,
+    checkpoint: Optional[JsonCheckpoint] = None,
+    row_filter: Optional[MusicRowFilter] = None,
+) -> Iterator[TakeoutEvent]:
+    """
+    Streams a single Takeout JSON file, yielding events one item at a time.
+
+    Peak memory is bounded by the read chunk plus the largest single item.
+    Row-level problems are appended to `errors` (if given); a malformed
+    document raises TakeoutParseError once the parser reaches the bad bytes.
+    raw_mode / fingerprint_mode pick the raw payload and fingerprint type
+    (see RAW_* / FP_* in takeout_common).
+
+    Incremental re-import: pass a JsonCheckpoint to have it track the resume
+    offset as items are consumed, and start_offset (a checkpoint offset from
+    an earlier run over the same, since-appended file) to parse only the tail.
+
+    row_filter (a MusicRowFilter) drops non-music items before any
+    normalization or hashing and counts what it dropped.
+    """
+    with open_takeout_text(path, byte_offset=start_offset) as fp:
+        yield from iter_takeout_json_stream(
+            fp,
+            path,
+            errors=errors,
+            chunk_size=chunk_size,
+            raw_mode=raw_mode,
+            fingerprint_mode=fingerprint_mode,
+            start_offset=start_offset,
+            checkpoint=checkpoint,
+            row_filter=row_filter,
+        )
+
+
+def iter_takeout_json_batches(
+    path: Path,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    errors: Optional[List[str]] = None,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Iterator[EventBatch]:
+    """
+    Columnar variant of iter_takeout_json_file: yields EventBatch chunks of up to batch_size rows.
+    """
+    events = iter_takeout_json_file(
+        path, errors=errors, raw_mode=raw_mode, fingerprint_mode=fingerprint_mode
+    )
+    return iter_event_batches(events, batch_size=batch_size)
+
+
+def parse_takeout_json_file(
+    path: Path,
+    *,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Tuple[List[TakeoutEvent], ParseReport]:
+    """
+    Parses a single Takeout JSON file.
+    Returns: (events, report)
+
+    List-returning wrapper over iter_takeout_json_file.
+    """
+    errors: List[str] = []
+
+    try:
+        events = list(
+            iter_takeout_json_file(
+                path, errors=errors, raw_mode=raw_mode, fingerprint_mode=fingerprint_mode
+            )
+        )
+    except TakeoutParseError as e:
+        return [], ParseReport(source_file=str(path), count=0, errors=[str(e)])
 
     return events, ParseReport(source_file=str(path), count=len(events), errors=errors)
 
 
-def parse_takeout_json_folder(root: Path) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
+def parse_takeout_json_folder(
+    root: Path,
+    *,
+    max_workers: int = 1,
+) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
     """
     Parses all *.json under root, returns aggregate events + per-file reports.
+
+    max_workers != 1 fans files out to a process pool (see takeout_parallel).
     """
+    if max_workers != 1:
+        from app.data.parsers.takeout_parallel import parse_takeout_folder_parallel
+
+        return parse_takeout_folder_parallel(root, suffixes=(".json",), max_workers=max_workers)
+
     reports: List[ParseReport] = []
     all_events: List[TakeoutEvent] = []
 
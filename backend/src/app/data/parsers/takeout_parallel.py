@@ -0,0 +1,182 @@
+# location: backend/src/app/data/parsers/takeout_parallel.py
+# purpose: Parse Takeout folders across a process pool (files are independent CPU-bound work)
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.data.parsers.takeout_common import (
+    FP_SHA256,
+    RAW_OFF,
+    ParseReport,
+    TakeoutEvent,
+    iter_takeout_files,
+)
+from app.data.parsers.takeout_html import parse_takeout_html_file
+from app.data.parsers.takeout_json import parse_takeout_json_file
+
+log = logging.getLogger(__name__)
+
+_FILE_PARSERS: Dict[str, Callable[..., Tuple[List[TakeoutEvent], ParseReport]]] = {
+    ".json": parse_takeout_json_file,
+    ".html": parse_takeout_html_file,
+}
+
+# Files below this size are grouped into one task so IPC overhead doesn't dominate
+DEFAULT_SMALL_FILE_BYTES = 4 * 1024 * 1024
+
+_FileResult = Tuple[str, List[TakeoutEvent], ParseReport]
+
+
+def _parse_one(path: Path, opts: Dict[str, Any]) -> Tuple[List[TakeoutEvent], ParseReport]:
+    parser = _FILE_PARSERS.get(path.suffix.lower())
+    if parser is None:
+        return [], ParseReport(source_file=str(path), count=0, errors=["Unsupported file type"])
+    return parser(path, **opts)
+
+
+def _parse_task(paths: Sequence[str], opts: Optional[Dict[str, Any]] = None) -> List[_FileResult]:
+    """
+    Worker entry point (module-level so it pickles). Parses a group of files;
+    opts are keyword options for the per-file parser (raw_mode, fingerprint_mode).
+    """
+    opts = opts or {}
+    out: List[_FileResult] = []
+    for p in paths:
+        try:
+            evs, rep = _parse_one(Path(p), opts)
+        except Exception as e:
+            evs, rep = [], ParseReport(source_file=p, count=0, errors=[f"worker exception: {e}"])
+        out.append((p, evs, rep))
+    return out
+
+
+def plan_file_tasks(
+    paths: Sequence[Path],
+    *,
+    small_file_bytes: int = DEFAULT_SMALL_FILE_BYTES,
+) -> List[List[str]]:
+    """
+    Splits files into pool tasks by size, largest first.
+
+    - every file >= small_file_bytes is its own task
+    - smaller files are packed together until a task reaches small_file_bytes
+
+    Scheduling the biggest work first (LPT) keeps one huge watch-history file
+    from being picked up last and stretching the tail of the import.
+    """
+    sized: List[Tuple[int, str]] = []
+    for p in paths:
+        try:
+            size = p.stat().st_size
+        except OSError:
+            size = 0
+        sized.append((size, str(p)))
+
+    return plan_sized_tasks(sized, small_file_bytes=small_file_bytes)
+
+
+def plan_sized_tasks(
+    sized: Sequence[Tuple[int, str]],
+    *,
+    small_file_bytes: int = DEFAULT_SMALL_FILE_BYTES,
+) -> List[List[str]]:
+    """
+    plan_file_tasks over pre-sized (size, name) pairs, e.g. archive members.
+    """
+    # size desc, then name for a stable plan
+    ordered = sorted(sized, key=lambda t: (-t[0], t[1]))
+
+    tasks: List[List[str]] = []
+    pending: List[str] = []
+    pending_bytes = 0
+
+    for size, name in ordered:
+        if size >= small_file_bytes:
+            tasks.append([name])
+            continue
+
+        pending.append(name)
+        pending_bytes += size
+        if pending_bytes >= small_file_bytes:
+            tasks.append(pending)
+            pending, pending_bytes = [], 0
+
+    if pending:
+        tasks.append(pending)
+
+    return tasks
+
+
+def run_parse_tasks(
+    fn: Callable[[List[str]], List[_FileResult]],
+    tasks: List[List[str]],
+    workers: int,
+) -> List[_FileResult]:
+    """
+    Runs fn over every task on a process pool of `workers` (serially if <= 1).
+
+    fn must pickle (module-level function or functools.partial of one).
+    Falls back to serial execution if a pool cannot be started or breaks.
+    """
+    if workers > 1:
+        try:
+            out: List[_FileResult] = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in pool.map(fn, tasks):
+                    out.extend(chunk)
+            return out
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            # e.g. sandboxed runtimes without working multiprocessing primitives
+            log.warning("takeout process pool unavailable, parsing serially: %s", e)
+
+    out = []
+    for task in tasks:
+        out.extend(fn(task))
+    return out
+
+
+def parse_takeout_folder_parallel(
+    root: Path,
+    *,
+    suffixes: Tuple[str, ...] = (".json", ".html"),
+    max_workers: Optional[int] = None,
+    small_file_bytes: int = DEFAULT_SMALL_FILE_BYTES,
+    raw_mode: str = RAW_OFF,
+    fingerprint_mode: str = FP_SHA256,
+) -> Tuple[List[TakeoutEvent], List[ParseReport]]:
+    """
+    Parses every matching file under root on a process pool.
+
+    - max_workers: pool size (None -> os.cpu_count()); <= 1 runs serially
+    - falls back to serial parsing if a pool cannot be started or breaks
+
+    Results are merged in sorted path order, so output is identical to a
+    serial run regardless of worker count or completion order.
+    """
+    files = sorted(iter_takeout_files(root, suffixes))
+    if not files:
+        return [], []
+
+    opts = {"raw_mode": raw_mode, "fingerprint_mode": fingerprint_mode}
+    tasks = plan_file_tasks(files, small_file_bytes=small_file_bytes)
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+
+    results = run_parse_tasks(partial(_parse_task, opts=opts), tasks, workers)
+    by_path = {p: (evs, rep) for p, evs, rep in results}
+
+    all_events: List[TakeoutEvent] = []
+    reports: List[ParseReport] = []
+    for p in files:
+        evs, rep = by_path[str(p)]
+        all_events.extend(evs)
+        reports.append(rep)
+
+    return all_events, reports
+
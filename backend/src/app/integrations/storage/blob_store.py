@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import io
 import os
 import shutil
 from abc import ABC, abstractmethod
@@ -37,6 +38,13 @@ class BlobStore(ABC):
     def get(self, *, key: str) -> bytes:
         pass
 
+    def open(self, *, key: str) -> BinaryIO:
+        """
+        Readable binary stream over a blob. Backends that can stream
+        override this; the default buffers get().
+        """
+        return io.BytesIO(self.get(key=key))
+
     @abstractmethod
     def delete(self, *, key: str) -> None:
         pass
@@ -77,6 +85,12 @@ class LocalBlobStore(BlobStore):
             raise FileNotFoundError(key)
         return path.read_bytes()
 
+    def open(self, *, key: str) -> BinaryIO:
+        path = self._path(key)
+        if not path.exists():
+            raise FileNotFoundError(key)
+        return open(path, "rb")
+
     def delete(self, *, key: str) -> None:
         path = self._path(key)
         if path.exists():
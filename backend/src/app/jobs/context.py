@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 
 @dataclass
@@ -23,6 +23,8 @@ class JobContext:
     started_at: float = field(default_factory=time.time)
     result: Optional[Dict[str, Any]] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # called with every set_progress (e.g. to update the job status store)
+    progress_hook: Optional[Callable[[Dict[str, Any]], None]] = None
 
     def set_result(self, data: Dict[str, Any]) -> None:
         """
@@ -38,6 +40,14 @@ class JobContext:
         """
         self.metadata[key] = value
 
+    def set_progress(self, progress: Dict[str, Any]) -> None:
+        """
+        Publish live progress counters under metadata["progress"].
+        """
+        self.metadata["progress"] = {**progress, "updated_at": time.time()}
+        if self.progress_hook is not None:
+            self.progress_hook(self.metadata["progress"])
+
     def snapshot(self) -> Dict[str, Any]:
         """
         Serializable snapshot for logs / inspection.
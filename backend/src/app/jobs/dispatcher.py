@@ -1,13 +1,25 @@
 # LOCATION: backend/src/app/jobs/dispatcher.py
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.jobs.queue import job_queue
-from app.jobs.runner import run_job
+from app.jobs.queue import Job, job_queue
+from app.jobs.retry import RetryPolicy
+from app.jobs.runner import run_job, run_job_async
+from app.jobs.status import job_status
 from app.jobs.workers.enrich_worker import run_enrich
-from app.jobs.workers.import_worker import run_import
 from app.jobs.workers.export_worker import run_export
+from app.jobs.workers.import_worker import run_import
+
+log = logging.getLogger(__name__)
 
 
 WORKERS = {
@@ -16,23 +28,273 @@ WORKERS = {
     "export": run_export,
 }
 
+# Retries go back on the queue (run_job requeue mode) with jittered
+# backoff, so a failing job frees its worker and a YouTube outage doesn't
+# produce synchronized retry waves.
+RETRY_POLICIES = {
+    "enrich": RetryPolicy(max_attempts=5, base_delay_sec=2.0, max_delay_sec=300.0, jitter=True),
+    "import": RetryPolicy(max_attempts=3, base_delay_sec=5.0, max_delay_sec=120.0, jitter=True),
+    "export": RetryPolicy(max_attempts=3, base_delay_sec=1.0, max_delay_sec=30.0, jitter=True),
+}
 
-def dispatch_next() -> Dict[str, Any]:
-    job = job_queue.dequeue()
 
-    if not job:
-        return {"ok": True, "message": "no jobs"}
+# Job types whose identical pending copies (same user and payload) run once
+# per batch, the result going to every copy. Enrich is a pure fetch, so a
+# user re-clicking "refresh" shouldn't cost extra API quota.
+COALESCE_JOBS = frozenset({"enrich"})
+
+# Threads dispatch_batch runs a batch on
+DEFAULT_BATCH_WORKERS = 4
+
+_BATCH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_BATCH_EXECUTOR_GUARD = threading.Lock()
+
+
+def _batch_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool batches run on, sized by JOB_BATCH_THREADS. Shared so
+    a dispatch loop doesn't start and join threads on every call.
+    """
+    global _BATCH_EXECUTOR
+    with _BATCH_EXECUTOR_GUARD:
+        if _BATCH_EXECUTOR is None:
+            threads = int(os.getenv("JOB_BATCH_THREADS", str(DEFAULT_BATCH_WORKERS)))
+            _BATCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, threads), thread_name_prefix="job-batch"
+            )
+        return _BATCH_EXECUTOR
 
-    worker = WORKERS.get(job.name)
-    if not worker:
-        return {"ok": False, "errors": [f"Unknown job type: {job.name}"]}
 
-    return run_job(
-        job_id=f"{job.name}-{int(job.enqueued_at)}",
+def _lock_key(job: Job) -> str:
+    # imports share the user's dedupe index and manifest: one at a time per user
+    if job.name == "import" and job.user_id:
+        return f"import-user-{job.user_id}"
+    return job.job_id
+
+
+def submit_job(*, name: str, payload: Dict[str, Any], user_id: Optional[str] = None) -> Job:
+    """
+    Enqueues a job and records it as queued in the status store.
+    """
+    job = job_queue.enqueue(name=name, payload=payload, user_id=user_id)
+    job_status.queued(job)
+    return job
+
+
+def _settle(job: Job, result: Dict[str, Any], queue: Any) -> None:
+    """
+    Queues the job's next attempt if run_job planned one, else records the
+    outcome and acks. A crash before this leaves the lease to expire.
+    """
+    retry = result.get("retry")
+    if retry and queue.reschedule(job, delay_sec=retry["delay_sec"]) is not None:
+        job_status.retrying(job, result, retry["not_before"])
+        return
+    result.pop("retry", None)
+    job_status.finished(job, result)
+    queue.ack(job)
+
+
+def _run_kwargs(job: Job, worker: Any) -> Dict[str, Any]:
+    return dict(
+        job_id=job.job_id,
         worker=worker,
         payload=job.payload,
         user_id=job.user_id,
+        retry_policy=RETRY_POLICIES.get(job.name),
+        on_progress=partial(job_status.progress, job.job_id),
+        lock_key=_lock_key(job),
+        requeue=True,
+        attempt=job.attempt,
+        retry_delay_sec=job.retry_delay_sec,
+        job_name=job.name,
+        queued_at=job.not_before or job.enqueued_at,
     )
 
 
-__all__ = ["dispatch_next"]
\ No newline at end of file
+def dispatch_job(job: Job, queue: Any = None) -> Dict[str, Any]:
+    """
+    Runs one attempt of a dequeued job on `queue` (default job_queue): acks
+    it when done, or reschedules it when the attempt failed and may be
+    retried. Retries wait on the queue, not in this thread.
+    """
+    queue = queue if queue is not None else job_queue
+    worker = WORKERS.get(job.name)
+    if not worker:
+        queue.ack(job)
+        result = {"ok": False, "errors": [f"Unknown job type: {job.name}"]}
+        job_status.finished(job, result)
+        return result
+
+    job_status.running(job)
+    result = run_job(**_run_kwargs(job, worker))
+    _settle(job, result, queue)
+    return result
+
+
+async def dispatch_job_async(job: Job, queue: Any = None) -> Dict[str, Any]:
+    """
+    dispatch_job on an event loop (see run_job_async).
+    """
+    queue = queue if queue is not None else job_queue
+    worker = WORKERS.get(job.name)
+    if not worker:
+        await asyncio.to_thread(queue.ack, job)
+        result = {"ok": False, "errors": [f"Unknown job type: {job.name}"]}
+        job_status.finished(job, result)
+        return result
+
+    job_status.running(job)
+    result = await run_job_async(**_run_kwargs(job, worker))
+    await asyncio.to_thread(_settle, job, result, queue)
+    return result
+
+
+def _coalesce_key(job: Job) -> Tuple[str, ...]:
+    if job.name not in COALESCE_JOBS:
+        return ("job", job.job_id)
+    body = json.dumps(job.payload, sort_keys=True, separators=(",", ":"), default=str)
+    return (job.name, job.user_id or "", body)
+
+
+def _outcome(result: Dict[str, Any]) -> str:
+    if result.get("ok"):
+        return "succeeded"
+    return "retrying" if result.get("retry") else "failed"
+
+
+def _requeue_crashed(job: Job, queue: Any) -> Tuple[Job, Dict[str, Any], str]:
+    policy = RETRY_POLICIES.get(job.name)
+    delay = policy.base_delay_sec if policy else 0.0
+    result = {"ok": False, "job_id": job.job_id, "errors": ["dispatch crashed"]}
+    try:
+        requeued = queue.nack(job, delay_sec=delay)
+    except Exception:
+        log.exception("could not return job %s to the queue", job.job_id)
+        requeued = False
+    if requeued:
+        # redelivered as the same attempt; durable queues dead-letter it
+        # after max_deliveries
+        job_status.retrying(job, result, time.time() + delay)
+        return job, result, "retrying"
+    job_status.finished(job, result)
+    return job, result, "failed"
+
+
+def _dispatch_group(jobs: List[Job], queue: Any) -> List[Tuple[Job, Dict[str, Any], str]]:
+    """
+    Runs the first job of a coalesced group and settles the others with
+    its result (each keeps its own job_id; see "coalesced_into"). If the
+    leader's attempt failed and was rescheduled, the copies are requeued
+    with the same delay so they coalesce with it again on a later batch.
+    Returns (job, result, outcome) per job.
+    """
+    leader, followers = jobs[0], jobs[1:]
+    for job in followers:
+        job_status.running(job)
+    try:
+        result = dispatch_job(leader, queue)
+    except Exception:
+        # dispatch_job/run_job return errors as dicts; this is a bug. Put
+        # every copy back rather than leaving them running.
+        log.exception("job %s crashed its dispatcher", leader.job_id)
+        return [_requeue_crashed(job, queue) for job in jobs]
+
+    # the retry plan is the leader's own attempt; copies don't inherit it
+    retry = result.get("retry")
+    base = {k: v for k, v in result.items() if k != "retry"}
+    out = [(leader, result, _outcome(result))]
+    for job in followers:
+        shared = {**base, "job_id": job.job_id, "coalesced_into": leader.job_id}
+        if retry and queue.reschedule(job, delay_sec=retry["delay_sec"]) is not None:
+            job_status.retrying(job, shared, retry["not_before"])
+            out.append((job, shared, "retrying"))
+            continue
+        job_status.finished(job, shared)
+        queue.ack(job)
+        out.append((job, shared, _outcome(shared)))
+    return out
+
+
+def dispatch_batch(
+    max_jobs: int,
+    *,
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    queue: Any = None,
+) -> Dict[str, Any]:
+    """
+    Dequeues up to max_jobs jobs in one call and runs them on up to
+    max_workers threads of the shared batch pool, returning when all are
+    settled.
+
+    Identical pending jobs (COALESCE_JOBS, same user_id and payload) in the
+    batch run once; every copy gets the result. Keep
+    max_jobs / max_workers * job duration under the queue's visibility
+    timeout, or leased jobs still waiting in the batch get redelivered.
+    """
+    queue = queue if queue is not None else job_queue
+    jobs = queue.dequeue_batch(max_jobs)
+    if not jobs:
+        return {"ok": True, "message": "no jobs", "dequeued": 0}
+
+    groups: Dict[Tuple[str, ...], List[Job]] = {}
+    for job in jobs:
+        groups.setdefault(_coalesce_key(job), []).append(job)
+
+    # the shared pool is sized by JOB_BATCH_THREADS; this caps how much of
+    # it one batch takes
+    slots = threading.BoundedSemaphore(max(1, max_workers))
+
+    def run(group: List[Job]) -> List[Tuple[Job, Dict[str, Any], str]]:
+        try:
+            return _dispatch_group(group, queue)
+        finally:
+            slots.release()
+
+    pool = _batch_executor()
+    futures = []
+    for group in groups.values():
+        slots.acquire()
+        futures.append(pool.submit(run, group))
+    settled = [triple for fut in futures for triple in fut.result()]
+
+    succeeded = sum(1 for _, _, outcome in settled if outcome == "succeeded")
+    retrying = sum(1 for _, _, outcome in settled if outcome == "retrying")
+    return {
+        "ok": True,
+        "dequeued": len(jobs),
+        "executions": len(groups),
+        "coalesced": len(jobs) - len(groups),
+        "succeeded": succeeded,
+        "retrying": retrying,
+        "failed": len(settled) - succeeded - retrying,
+        "jobs": [
+            {
+                "job_id": job.job_id,
+                "ok": outcome == "succeeded",
+                "coalesced_into": r.get("coalesced_into"),
+            }
+            for job, r, outcome in settled
+        ],
+    }
+
+
+def dispatch_next() -> Dict[str, Any]:
+    job = job_queue.dequeue()
+
+    if not job:
+        return {"ok": True, "message": "no jobs"}
+
+    return dispatch_job(job)
+
+
+__all__ = [
+    "COALESCE_JOBS",
+    "RETRY_POLICIES",
+    "WORKERS",
+    "dispatch_batch",
+    "dispatch_job",
+    "dispatch_job_async",
+    "dispatch_next",
+    "submit_job",
+]
\ No newline at end of file
@@ -0,0 +1,428 @@
+# LOCATION: backend/src/app/jobs/lease_locks.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Optional, Set
+
+from app.jobs.locks import AsyncJobLock, JobLock
+from app.jobs.retry import NonRetryableError
+
+try:  # POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TTL_SEC = 60.0
+
+# Cross-process waits can't be woken by the holder; poll with backoff
+_POLL_MIN_SEC = 0.005
+_POLL_MAX_SEC = 0.25
+
+# Threads that run single acquire attempts / releases for AsyncLeaseLock.
+# Each call is short (no waiting happens there), so a few are plenty.
+DEFAULT_ASYNC_LOCK_THREADS = 4
+
+_ASYNC_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_ASYNC_EXECUTOR_GUARD = threading.Lock()
+
+
+def _async_executor() -> ThreadPoolExecutor:
+    global _ASYNC_EXECUTOR
+    with _ASYNC_EXECUTOR_GUARD:
+        if _ASYNC_EXECUTOR is None:
+            threads = int(os.getenv("JOB_LOCK_ASYNC_THREADS", str(DEFAULT_ASYNC_LOCK_THREADS)))
+            _ASYNC_EXECUTOR = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="lease")
+        return _ASYNC_EXECUTOR
+
+
+class LeaseLostError(NonRetryableError):
+    """
+    The lease was taken over while held; another process may now be running the job.
+    """
+
+
+def _backoff_wait(delay: float, deadline: Optional[float]) -> Optional[float]:
+    """
+    Seconds to wait before the next attempt: delay, clamped to the deadline.
+    None once the deadline passed; without a deadline, always delay.
+    """
+    if deadline is None:
+        return delay
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    return min(delay, remaining)
+
+
+class _LeaseLockBase(ABC):
+    """
+    Shared JobLock-compatible surface. The in-process JobLock is taken
+    first, so threads of one process queue on a real lock and only one of
+    them polls the cross-process lock.
+    """
+
+    def __init__(self, job_id: str, timeout_sec: Optional[float] = None) -> None:
+        self.job_id = job_id
+        self.timeout_sec = timeout_sec
+        # monotonically increasing per backend; pass it to writes that must
+        # reject a holder whose lease was lost (see fencing tokens)
+        self.fencing_token: Optional[int] = None
+        # set if the lease lapsed to another holder while we held it
+        self.lost = False
+        self._local = JobLock(job_id, timeout_sec)
+
+    def _deadline(self) -> Optional[float]:
+        return None if self.timeout_sec is None else time.monotonic() + self.timeout_sec
+
+    def acquire(self) -> bool:
+        deadline = self._deadline()
+        if not self._local.acquire():
+            return False
+        try:
+            ok = self._acquire_shared(deadline)
+        except BaseException:
+            self._local.release()
+            raise
+        if not ok:
+            self._local.release()
+        return ok
+
+    def release(self) -> None:
+        try:
+            self._release_shared()
+        finally:
+            self.fencing_token = None
+            self._local.release()
+
+    def ensure_held(self) -> None:
+        """
+        Raises LeaseLostError if the lease was lost; run_job calls it before
+        reporting success so a job that overran its lease fails instead.
+        """
+        if self.lost:
+            raise LeaseLostError(
+                f"lease for job_id='{self.job_id}' was lost (token {self.fencing_token})"
+            )
+
+    def _acquire_shared(self, deadline: Optional[float]) -> bool:
+        delay = _POLL_MIN_SEC
+        while not self._try_acquire_shared():
+            wait = _backoff_wait(delay, deadline)
+            if wait is None:
+                return False
+            time.sleep(wait)
+            delay = min(delay * 2, _POLL_MAX_SEC)
+        return True
+
+    @abstractmethod
+    def _try_acquire_shared(self) -> bool:
+        """
+        One non-blocking attempt at the cross-process lock.
+        """
+
+    @abstractmethod
+    def _release_shared(self) -> None:
+        pass
+
+    def __enter__(self) -> "_LeaseLockBase":
+        ok = self.acquire()
+        if not ok:
+            raise TimeoutError(f"Could not acquire JobLock for job_id='{self.job_id}'")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class FileLeaseLock(_LeaseLockBase):
+    """
+    flock()-based lock, one file per key under `root`.
+
+    The kernel drops the lock when the holder's process dies, so a crashed
+    worker never leaves it held. The file is unlinked on release; an
+    acquirer that locked a file someone else already unlinked notices
+    (inode mismatch) and retries. Fencing tokens come from a counter file
+    updated under its own flock.
+    """
+
+    def __init__(self, job_id: str, timeout_sec: Optional[float] = None, *, root: Path) -> None:
+        if fcntl is None:
+            raise RuntimeError("FileLeaseLock needs fcntl (POSIX)")
+        super().__init__(job_id, timeout_sec)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha256(job_id.encode("utf-8")).hexdigest()[:32]
+        self.path = self.root / f"{name}.lock"
+        self._fd: Optional[int] = None
+
+    def _next_token(self) -> int:
+        fd = os.open(self.root / "fence", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.pread(fd, 32, 0).strip()
+            token = int(raw or 0) + 1
+            os.pwrite(fd, f"{token:020d}".encode("ascii"), 0)
+            return token
+        finally:
+            os.close(fd)
+
+    def _try_acquire_shared(self) -> bool:
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+
+            try:
+                same_file = os.fstat(fd).st_ino == os.stat(self.path).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if not same_file:
+                # the previous holder unlinked it between our open and flock
+                os.close(fd)
+                continue
+
+            self._fd = fd
+            self.fencing_token = self._next_token()
+            return True
+
+    def _release_shared(self) -> None:
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key        TEXT PRIMARY KEY,
+    owner      TEXT    NOT NULL,
+    token      INTEGER NOT NULL,
+    expires_at REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_expiry ON leases (expires_at);
+CREATE TABLE IF NOT EXISTS fence (
+    id    INTEGER PRIMARY KEY CHECK (id = 1),
+    token INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO fence (id, token) VALUES (1, 0);
+"""
+_SQLITE_READY: Set[Path] = set()
+_SQLITE_READY_GUARD = threading.Lock()
+
+
+class SqliteLeaseLock(_LeaseLockBase):
+    """
+    Lease row in a SQLite table shared by every process on the host.
+
+    A lease expires ttl_sec after its last renewal; while held, a daemon
+    thread renews it every ttl_sec / 3. A crashed holder stops renewing
+    and its lease lapses. Each grant takes the next value of a global
+    fence counter as its fencing token. If a renewal finds the lease taken
+    over (e.g. the process was paused past the TTL) `lost` is set and
+    ensure_held() raises, so run_job fails the job instead of reporting
+    success for work another holder may have redone.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        timeout_sec: Optional[float] = None,
+        *,
+        path: Path,
+        ttl_sec: float = DEFAULT_LEASE_TTL_SEC,
+    ) -> None:
+        super().__init__(job_id, timeout_sec)
+        self.path = Path(path)
+        self.ttl_sec = ttl_sec
+        self.owner = f"{os.getpid()}-{secrets.token_hex(8)}"
+        self._stop_renew = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+        with _SQLITE_READY_GUARD:
+            if self.path not in _SQLITE_READY:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn:
+                    conn.executescript(_SQLITE_SCHEMA)
+                _SQLITE_READY.add(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _try_grant(self, conn: sqlite3.Connection) -> Optional[int]:
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            if conn.execute("SELECT 1 FROM leases WHERE key = ?", (self.job_id,)).fetchone():
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute("UPDATE fence SET token = token + 1 WHERE id = 1")
+            token = int(conn.execute("SELECT token FROM fence WHERE id = 1").fetchone()[0])
+            conn.execute(
+                "INSERT INTO leases (key, owner, token, expires_at) VALUES (?, ?, ?, ?)",
+                (self.job_id, self.owner, token, now + self.ttl_sec),
+            )
+            conn.execute("COMMIT")
+            return token
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _try_acquire_shared(self) -> bool:
+        with closing(self._connect()) as conn:
+            token = self._try_grant(conn)
+        if token is None:
+            return False
+
+        self.fencing_token = token
+        self.lost = False
+        self._stop_renew.clear()
+        self._renewer = threading.Thread(
+            target=self._renew_loop, name=f"lease-{self.job_id}", daemon=True
+        )
+        self._renewer.start()
+        return True
+
+    def _renew_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while not self._stop_renew.wait(self.ttl_sec / 3):
+                cur = conn.execute(
+                    "UPDATE leases SET expires_at = ? WHERE key = ? AND owner = ?",
+                    (time.time() + self.ttl_sec, self.job_id, self.owner),
+                )
+                if cur.rowcount != 1:
+                    self.lost = True
+                    log.error("lease for %s was lost (token %s)", self.job_id, self.fencing_token)
+                    return
+        except sqlite3.Error as e:
+            log.warning("lease renewal for %s failed: %s", self.job_id, e)
+        finally:
+            conn.close()
+
+    def _release_shared(self) -> None:
+        if self._renewer is None:
+            return
+        self._stop_renew.set()
+        self._renewer.join()
+        self._renewer = None
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (self.job_id, self.owner)
+            )
+
+
+class AsyncLeaseLock:
+    """
+    async-with adapter for the lease locks. The in-process half is an
+    AsyncJobLock and the cross-process poll sleeps with asyncio.sleep, so
+    waiting holds no thread; only the single non-blocking attempts and the
+    release run in a small dedicated pool (JOB_LOCK_ASYNC_THREADS).
+    """
+
+    def __init__(self, lock: _LeaseLockBase) -> None:
+        self._lock = lock
+        self._local = AsyncJobLock(lock.job_id, lock.timeout_sec)
+
+    @property
+    def fencing_token(self) -> Optional[int]:
+        return self._lock.fencing_token
+
+    @property
+    def lost(self) -> bool:
+        return self._lock.lost
+
+    def ensure_held(self) -> None:
+        self._lock.ensure_held()
+
+    async def _attempt(self) -> bool:
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(_async_executor(), self._lock._try_acquire_shared)
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            # the attempt may still succeed; hand the lease straight back
+            def _abandon(f: "asyncio.Future[bool]") -> None:
+                if not f.cancelled() and f.exception() is None and f.result():
+                    _async_executor().submit(self._lock._release_shared)
+
+            fut.add_done_callback(_abandon)
+            raise
+
+    async def _acquire_shared(self, deadline: Optional[float]) -> bool:
+        delay = _POLL_MIN_SEC
+        while not await self._attempt():
+            wait = _backoff_wait(delay, deadline)
+            if wait is None:
+                return False
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, _POLL_MAX_SEC)
+        return True
+
+    async def __aenter__(self) -> "AsyncLeaseLock":
+        deadline = self._lock._deadline()
+        if not await self._local.acquire():
+            raise TimeoutError(f"Could not acquire JobLock for job_id='{self._lock.job_id}'")
+        try:
+            ok = await self._acquire_shared(deadline)
+        except BaseException:
+            self._local.release()
+            raise
+        if not ok:
+            self._local.release()
+            raise TimeoutError(f"Could not acquire JobLock for job_id='{self._lock.job_id}'")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(_async_executor(), self._lock._release_shared)
+        finally:
+            self._lock.fencing_token = None
+            self._local.release()
+
+
+def open_lease_lock(backend: str, job_id: str, timeout_sec: Optional[float] = None) -> Any:
+    """
+    Lease lock for JOB_LOCK_BACKEND "file" / "sqlite", rooted at JOB_LOCK_PATH
+    (default data/locks). SQLite leases last JOB_LOCK_TTL_SEC (default 60).
+    """
+    root = Path(os.getenv("JOB_LOCK_PATH", "data/locks"))
+    if backend == "file":
+        return FileLeaseLock(job_id, timeout_sec, root=root)
+    if backend == "sqlite":
+        ttl = float(os.getenv("JOB_LOCK_TTL_SEC", str(DEFAULT_LEASE_TTL_SEC)))
+        return SqliteLeaseLock(job_id, timeout_sec, path=root / "leases.sqlite3", ttl_sec=ttl)
+    raise ValueError(f"Unknown JOB_LOCK_BACKEND: {backend}")
+
+
+__all__ = [
+    "AsyncLeaseLock",
+    "FileLeaseLock",
+    "LeaseLostError",
+    "SqliteLeaseLock",
+    "open_lease_lock",
+]
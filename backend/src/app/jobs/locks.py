@@ -1,18 +1,113 @@
 # LOCATION: backend/src/app/jobs/locks.py
 from __future__ import annotations
 
+import asyncio
+import os
 import threading
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _LockEntry:
+    """
+    Registry slot: the lock, how many holders/waiters reference it, and the
+    futures of event-loop waiters to wake when it is released.
+    """
+
+    __slots__ = ("lock", "refs", "waiters")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refs = 0
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
 
 
 # Global in-process lock registry
-# Keyed by job_id (or any string identifier)
-_LOCKS: Dict[str, threading.Lock] = {}
+# Keyed by job_id (or any string identifier). An entry lives only while
+# someone holds or waits on it, so the table stays as small as the number
+# of jobs currently running.
+_LOCKS: Dict[str, _LockEntry] = {}
 _LOCKS_GUARD = threading.Lock()
 
 
+@dataclass
+class _LockStats:
+    acquired: int = 0
+    contended: int = 0      # acquires that had to wait
+    timeouts: int = 0
+    wait_total_sec: float = 0.0
+    wait_max_sec: float = 0.0
+
+
+_STATS = _LockStats()
+
+
+def _checkout(job_id: str) -> _LockEntry:
+    with _LOCKS_GUARD:
+        entry = _LOCKS.get(job_id)
+        if entry is None:
+            entry = _LOCKS[job_id] = _LockEntry()
+        entry.refs += 1
+        return entry
+
+
+def _checkin(job_id: str, entry: _LockEntry) -> None:
+    with _LOCKS_GUARD:
+        entry.refs -= 1
+        if entry.refs == 0 and _LOCKS.get(job_id) is entry:
+            del _LOCKS[job_id]
+
+
+def _wake(fut: "asyncio.Future[None]") -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _unlock(entry: _LockEntry) -> None:
+    # every async waiter retries on its own loop; sync waiters are woken by the lock
+    entry.lock.release()
+    with _LOCKS_GUARD:
+        waiters, entry.waiters = entry.waiters, []
+    for loop, fut in waiters:
+        try:
+            loop.call_soon_threadsafe(_wake, fut)
+        except RuntimeError:
+            pass  # loop already closed
+
+
+def _forget_waiter(entry: _LockEntry, fut: "asyncio.Future[None]") -> None:
+    with _LOCKS_GUARD:
+        entry.waiters = [w for w in entry.waiters if w[1] is not fut]
+
+
+def _record(*, waited: Optional[float], acquired: bool) -> None:
+    with _LOCKS_GUARD:
+        if acquired:
+            _STATS.acquired += 1
+        else:
+            _STATS.timeouts += 1
+        if waited is not None:
+            _STATS.contended += 1
+            _STATS.wait_total_sec += waited
+            _STATS.wait_max_sec = max(_STATS.wait_max_sec, waited)
+
+
+def lock_stats() -> Dict[str, Any]:
+    """
+    Process-wide lock counters plus the current registry size.
+    """
+    with _LOCKS_GUARD:
+        return {
+            "acquired": _STATS.acquired,
+            "contended": _STATS.contended,
+            "timeouts": _STATS.timeouts,
+            "wait_total_sec": round(_STATS.wait_total_sec, 6),
+            "wait_max_sec": round(_STATS.wait_max_sec, 6),
+            "registry_size": len(_LOCKS),
+        }
+
+
 @dataclass
 class JobLock:
     """
@@ -23,44 +118,45 @@ class JobLock:
     - No circular imports
     - Safe to import from anywhere in jobs/
     - Context-manager compatible
+    - Waiting blocks on the lock itself (no polling); timeout_sec bounds it
+    - Registry entries are dropped once the last holder/waiter leaves
 
     NOTE:
     This is intentionally in-memory only.
-    (Future: Redis / DB / file-based locks if needed)
+    Use job_lock() to honour JOB_LOCK_BACKEND (cross-process lease locks).
     """
 
     job_id: str
     timeout_sec: Optional[float] = None
 
-    _lock: Optional[threading.Lock] = None
+    _entry: Optional[_LockEntry] = None
     _acquired: bool = False
 
     def acquire(self) -> bool:
-        start = time.time()
+        entry = self._entry = _checkout(self.job_id)
 
-        # Ensure lock object exists atomically
-        with _LOCKS_GUARD:
-            if self.job_id not in _LOCKS:
-                _LOCKS[self.job_id] = threading.Lock()
-            self._lock = _LOCKS[self.job_id]
+        if entry.lock.acquire(blocking=False):
+            _record(waited=None, acquired=True)
+            self._acquired = True
+            return True
 
-        # Attempt acquisition
-        while True:
-            acquired = self._lock.acquire(blocking=False)
-            if acquired:
-                self._acquired = True
-                return True
-
-            if self.timeout_sec is not None:
-                if (time.time() - start) >= self.timeout_sec:
-                    return False
+        start = time.monotonic()
+        acquired = entry.lock.acquire(timeout=-1 if self.timeout_sec is None else self.timeout_sec)
+        _record(waited=time.monotonic() - start, acquired=acquired)
 
-            time.sleep(0.01)  # small backoff
+        if not acquired:
+            self._entry = None
+            _checkin(self.job_id, entry)
+            return False
+        self._acquired = True
+        return True
 
     def release(self) -> None:
-        if self._lock and self._acquired:
-            self._lock.release()
+        if self._entry and self._acquired:
+            entry, self._entry = self._entry, None
             self._acquired = False
+            _unlock(entry)
+            _checkin(self.job_id, entry)
 
     # Context manager support
     def __enter__(self) -> "JobLock":
@@ -73,6 +169,123 @@ class JobLock:
         self.release()
 
 
+@dataclass
+class AsyncJobLock:
+    """
+    JobLock for coroutines, sharing JobLock's registry: a job_id held by a
+    sync worker thread also blocks async holders, and vice versa.
+
+    Acquire never blocks or leaves the event loop: a contended one parks a
+    future on the registry entry, which every release (sync or async)
+    resolves, and then retries the lock. No thread is held while waiting.
+    """
+
+    job_id: str
+    timeout_sec: Optional[float] = None
+
+    _entry: Optional[_LockEntry] = None
+    _acquired: bool = False
+
+    async def acquire(self) -> bool:
+        entry = self._entry = _checkout(self.job_id)
+
+        if entry.lock.acquire(blocking=False):
+            _record(waited=None, acquired=True)
+            self._acquired = True
+            return True
+
+        start = time.monotonic()
+        try:
+            acquired = await self._wait(entry, start)
+        except asyncio.CancelledError:
+            self._entry = None
+            _checkin(self.job_id, entry)
+            raise
+
+        _record(waited=time.monotonic() - start, acquired=acquired)
+        if not acquired:
+            self._entry = None
+            _checkin(self.job_id, entry)
+            return False
+        self._acquired = True
+        return True
+
+    async def _wait(self, entry: _LockEntry, start: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout_sec is None else start + self.timeout_sec
+        while True:
+            fut: "asyncio.Future[None]" = loop.create_future()
+            with _LOCKS_GUARD:
+                entry.waiters.append((loop, fut))
+            try:
+                # registered first, so a release from here on wakes us
+                if entry.lock.acquire(blocking=False):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(fut, remaining)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                _forget_waiter(entry, fut)
+
+    def release(self) -> None:
+        if self._entry and self._acquired:
+            entry, self._entry = self._entry, None
+            self._acquired = False
+            _unlock(entry)
+            _checkin(self.job_id, entry)
+
+    async def __aenter__(self) -> "AsyncJobLock":
+        ok = await self.acquire()
+        if not ok:
+            raise TimeoutError(f"Could not acquire JobLock for job_id='{self.job_id}'")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+def _lock_backend() -> str:
+    return os.getenv("JOB_LOCK_BACKEND", "memory").lower()
+
+
+def job_lock(job_id: str, timeout_sec: Optional[float] = None) -> Any:
+    """
+    Lock for JOB_LOCK_BACKEND:
+    - "memory" (default): JobLock, this process only
+    - "file" / "sqlite": cross-process lease locks (see lease_locks) for
+      several API / worker processes on one host
+    All are context managers; lease locks also carry a fencing_token.
+    """
+    backend = _lock_backend()
+    if backend == "memory":
+        return JobLock(job_id, timeout_sec)
+
+    from app.jobs.lease_locks import open_lease_lock
+
+    return open_lease_lock(backend, job_id, timeout_sec)
+
+
+def async_job_lock(job_id: str, timeout_sec: Optional[float] = None) -> Any:
+    """
+    job_lock for coroutines (async with).
+    """
+    backend = _lock_backend()
+    if backend == "memory":
+        return AsyncJobLock(job_id, timeout_sec)
+
+    from app.jobs.lease_locks import AsyncLeaseLock, open_lease_lock
+
+    return AsyncLeaseLock(open_lease_lock(backend, job_id, timeout_sec))
+
+
 __all__ = [
+    "AsyncJobLock",
     "JobLock",
-]
\ No newline at end of file
+    "async_job_lock",
+    "job_lock",
+    "lock_stats",
+]
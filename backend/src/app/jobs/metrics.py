@@ -1,9 +1,12 @@
 # LOCATION: backend/src/app/jobs/metrics.py
 from __future__ import annotations
 
+import threading
 import time
+import weakref
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
 @dataclass
@@ -80,7 +83,228 @@ class JobMetrics:
         }
 
 
+# Histogram upper bounds (seconds): 5 ms .. 1 h, covering API calls to large imports
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0,
+)
+
+# How a run_job call ended
+OUTCOMES = ("succeeded", "failed", "retrying")
+_OUTCOME_INDEX = {o: i for i, o in enumerate(OUTCOMES)}
+
+
+class _JobSeries:
+    """
+    One thread's counters for one job name. Bucket counts are per bucket
+    (not cumulative); the last slot is +Inf.
+    """
+
+    __slots__ = ("wait_buckets", "wait_sum", "run_buckets", "run_sum", "attempts", "outcomes")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.wait_buckets = [0] * (n_buckets + 1)
+        self.wait_sum = 0.0
+        self.run_buckets = [0] * (n_buckets + 1)
+        self.run_sum = 0.0
+        self.attempts = 0
+        self.outcomes = [0] * len(OUTCOMES)
+
+
+def _fold(into: Dict[str, _JobSeries], name: str, s: _JobSeries, n_buckets: int) -> None:
+    total = into.get(name)
+    if total is None:
+        total = into[name] = _JobSeries(n_buckets)
+    for i, n in enumerate(s.wait_buckets):
+        total.wait_buckets[i] += n
+    for i, n in enumerate(s.run_buckets):
+        total.run_buckets[i] += n
+    total.wait_sum += s.wait_sum
+    total.run_sum += s.run_sum
+    total.attempts += s.attempts
+    for i, n in enumerate(s.outcomes):
+        total.outcomes[i] += n
+
+
+class _Shard:
+    """
+    Thread-local holder of one thread's series. When the thread exits its
+    thread-local (and so this holder) is dropped, which retires the series.
+    """
+
+    __slots__ = ("series", "__weakref__")
+
+    def __init__(self) -> None:
+        self.series: Dict[str, _JobSeries] = {}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsRegistry:
+    """
+    Process-wide job metrics: per job name, histograms of queue wait and
+    run time plus attempt and outcome counters.
+
+    Recording takes no lock: each thread writes to its own shard, so
+    workers never contend, and a scrape sums the shards. Reads may be a
+    few observations behind the writers, which is fine for monitoring.
+    Buckets are fixed at construction, so an observation is two bisects
+    and a handful of increments. A shard whose thread has exited is folded
+    into a retired total, so short-lived threads don't grow the registry.
+    """
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._local = threading.local()
+        # live threads' shards by id; also guards adding series (scrapes iterate them)
+        self._shards: Dict[int, Dict[str, _JobSeries]] = {}
+        # totals of shards whose thread has exited
+        self._retired: Dict[str, _JobSeries] = {}
+        # reentrant: a shard may be retired by GC while this thread holds it
+        self._guard = threading.RLock()
+
+    def _series(self, name: str) -> _JobSeries:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._guard:
+                self._shards[id(shard.series)] = shard.series
+            weakref.finalize(shard, self._retire, shard.series)
+        series = shard.series.get(name)
+        if series is None:
+            with self._guard:
+                series = shard.series[name] = _JobSeries(len(self.buckets))
+        return series
+
+    def _retire(self, shard: Dict[str, _JobSeries]) -> None:
+        with self._guard:
+            self._shards.pop(id(shard), None)
+            for name, s in shard.items():
+                _fold(self._retired, name, s, len(self.buckets))
+
+    def observe_job(
+        self,
+        name: str,
+        *,
+        run_sec: float,
+        attempts: int,
+        outcome: str,
+        queue_wait_sec: Optional[float] = None,
+    ) -> None:
+        """
+        Records one run_job call. queue_wait_sec is None when the caller
+        didn't come from a queue.
+        """
+        series = self._series(name)
+        if queue_wait_sec is not None:
+            queue_wait_sec = max(0.0, queue_wait_sec)
+            series.wait_buckets[bisect_left(self.buckets, queue_wait_sec)] += 1
+            series.wait_sum += queue_wait_sec
+        series.run_buckets[bisect_left(self.buckets, run_sec)] += 1
+        series.run_sum += run_sec
+        series.attempts += attempts
+        series.outcomes[_OUTCOME_INDEX[outcome]] += 1
+
+    # -------------------------
+    # Readers
+    # -------------------------
+    def _merged(self) -> Dict[str, _JobSeries]:
+        out: Dict[str, _JobSeries] = {}
+        with self._guard:
+            for name, s in list(self._retired.items()):
+                _fold(out, name, s, len(self.buckets))
+            for shard in list(self._shards.values()):
+                for name, s in list(shard.items()):
+                    _fold(out, name, s, len(self.buckets))
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Per job name: counts by outcome, attempts and latency sums / counts.
+        """
+        return {
+            name: {
+                "outcomes": dict(zip(OUTCOMES, s.outcomes)),
+                "attempts": s.attempts,
+                "queue_wait": {"count": sum(s.wait_buckets), "sum_sec": s.wait_sum},
+                "run": {"count": sum(s.run_buckets), "sum_sec": s.run_sum},
+            }
+            for name, s in sorted(self._merged().items())
+        }
+
+    def _histogram(
+        self, lines: List[str], metric: str, job: str, counts: List[int], total: float
+    ) -> None:
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{job="{job}",le="{_fmt(bound)}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{metric}_bucket{{job="{job}",le="+Inf"}} {cumulative}')
+        lines.append(f'{metric}_sum{{job="{job}"}} {_fmt(total)}')
+        lines.append(f'{metric}_count{{job="{job}"}} {cumulative}')
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Prometheus text exposition (format 0.0.4). `gauges` adds unlabelled
+        point-in-time values (queue depth, ...).
+        """
+        series = sorted(self._merged().items())
+        lines: List[str] = []
+
+        lines.append(
+            "# HELP job_queue_wait_seconds"
+            " Time from a job becoming runnable to a worker starting it."
+        )
+        lines.append("# TYPE job_queue_wait_seconds histogram")
+        for name, s in series:
+            if sum(s.wait_buckets):
+                self._histogram(
+                    lines, "job_queue_wait_seconds", _label(name), s.wait_buckets, s.wait_sum
+                )
+
+        lines.append(
+            "# HELP job_run_seconds Time spent running a job (all attempts of one delivery)."
+        )
+        lines.append("# TYPE job_run_seconds histogram")
+        for name, s in series:
+            self._histogram(lines, "job_run_seconds", _label(name), s.run_buckets, s.run_sum)
+
+        lines.append("# HELP job_attempts_total Worker invocations, including retries.")
+        lines.append("# TYPE job_attempts_total counter")
+        for name, s in series:
+            lines.append(f'job_attempts_total{{job="{_label(name)}"}} {s.attempts}')
+
+        lines.append(
+            "# HELP job_runs_total Job runs by outcome (retrying: failed, next attempt queued)."
+        )
+        lines.append("# TYPE job_runs_total counter")
+        for name, s in series:
+            for outcome, n in zip(OUTCOMES, s.outcomes):
+                lines.append(f'job_runs_total{{job="{_label(name)}",outcome="{outcome}"}} {n}')
+
+        for metric, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_fmt(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Global singleton registry, fed by jobs.runner
+metrics_registry = MetricsRegistry()
+
 __all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
     "JobMetrics",
+    "MetricsRegistry",
+    "OUTCOMES",
     "RetryRecord",
+    "metrics_registry",
 ]
\ No newline at end of file
@@ -1,10 +1,27 @@
 # LOCATION: backend/src/app/jobs/queue.py
 from __future__ import annotations
 
+import heapq
+import itertools
+import os
 import threading
 import time
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Priority classes (lower runs first)
+PRIORITY_INTERACTIVE = 0  # user is waiting on the result (export)
+PRIORITY_IMPORT = 1
+PRIORITY_BACKFILL = 2     # background enrichment
+
+JOB_PRIORITIES: Dict[str, int] = {
+    "export": PRIORITY_INTERACTIVE,
+    "import": PRIORITY_IMPORT,
+    "enrich": PRIORITY_BACKFILL,
+}
+_PRIORITY_LEVELS = (PRIORITY_INTERACTIVE, PRIORITY_IMPORT, PRIORITY_BACKFILL)
 
 
 @dataclass(frozen=True)
@@ -16,16 +33,46 @@ class Job:
     payload: Dict[str, Any]
     user_id: Optional[str] = None
     enqueued_at: float = field(default_factory=time.time)
+    priority: int = PRIORITY_IMPORT
+    # set by queues that lease jobs (SqliteJobQueue); pass the job back to ack/nack
+    receipt: Optional[str] = field(default=None, compare=False)
+    uid: str = field(default_factory=lambda: uuid.uuid4().hex)
+    # retry bookkeeping, carried across reschedule(): 1-based attempt number,
+    # the previous backoff (for jittered policies) and when it became eligible
+    attempt: int = 1
+    retry_delay_sec: float = 0.0
+    not_before: Optional[float] = None
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.name}-{self.uid}"
 
 
 class InMemoryJobQueue:
     """
-    Thread-safe FIFO in-memory job queue.
+    Thread-safe in-memory job queue with priority classes and per-user fairness.
+
+    - Strict priority between classes (see JOB_PRIORITIES).
+    - Within a class, users are served round-robin, one job per turn, so
+      one user's 500 imports don't block everyone else; each user's own
+      jobs stay FIFO.
+    - enqueue / dequeue / size are O(1).
+    - Delayed jobs (nack with delay_sec, reschedule) wait in a heap keyed by
+      not-before time and join their user's line once due; blocked
+      dequeues wake up for them.
     """
 
     def __init__(self) -> None:
-        self._queue: List[Job] = []
+        # priority -> user -> that user's pending jobs (ring order = OrderedDict order)
+        self._levels: Dict[int, "OrderedDict[str, Deque[Job]]"] = {
+            p: OrderedDict() for p in _PRIORITY_LEVELS
+        }
+        self._size = 0
+        # (not_before, seq, job); seq keeps equal times FIFO
+        self._delayed: List[Tuple[float, int, Job]] = []
+        self._seq = itertools.count()
         self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
 
     def enqueue(
         self,
@@ -33,43 +80,198 @@ class InMemoryJobQueue:
         name: str,
         payload: Dict[str, Any],
         user_id: Optional[str] = None,
+        priority: Optional[int] = None,
     ) -> Job:
+        if priority is None:
+            priority = JOB_PRIORITIES.get(name, PRIORITY_IMPORT)
+        if priority not in self._levels:
+            raise ValueError(f"Unknown job priority: {priority}")
+
         job = Job(
             name=name,
             payload=payload,
             user_id=user_id,
+            priority=priority,
         )
-        with self._lock:
-            self._queue.append(job)
+        with self._not_empty:
+            self._push_locked(job)
         return job
 
-    def dequeue(self) -> Optional[Job]:
+    def _push_locked(self, job: Job) -> None:
+        ring = self._levels[job.priority]
+        user_jobs = ring.get(job.user_id or "")
+        if user_jobs is None:
+            # new users join at the back of the ring
+            user_jobs = ring[job.user_id or ""] = deque()
+        user_jobs.append(job)
+        self._size += 1
+        self._not_empty.notify()
+
+    def _delay_locked(self, job: Job, delay_sec: float) -> None:
+        if delay_sec <= 0:
+            self._push_locked(job)
+            return
+        heapq.heappush(self._delayed, (time.time() + delay_sec, next(self._seq), job))
+        # a blocked dequeue may need to wake earlier than it planned
+        self._not_empty.notify()
+
+    def _promote_due_locked(self) -> Optional[float]:
+        """
+        Moves due delayed jobs to their lines; returns seconds until the next one.
+        """
+        if not self._delayed:
+            return None
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            self._push_locked(heapq.heappop(self._delayed)[2])
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def _pop_locked(self) -> Optional[Job]:
+        self._promote_due_locked()
+        for priority in _PRIORITY_LEVELS:
+            ring = self._levels[priority]
+            if not ring:
+                continue
+            user, user_jobs = next(iter(ring.items()))
+            job = user_jobs.popleft()
+            if user_jobs:
+                ring.move_to_end(user)
+            else:
+                del ring[user]
+            self._size -= 1
+            return job
+        return None
+
+    def dequeue(self, timeout: Optional[float] = 0.0) -> Optional[Job]:
+        """
+        Next job, or None.
+
+        timeout=0 (default) returns immediately; None waits until a job
+        arrives; a positive value waits at most that many seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while True:
+                job = self._pop_locked()
+                if job is not None:
+                    return job
+                wait = self._promote_due_locked()
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._not_empty.wait(wait)
+
+    def dequeue_batch(self, max_jobs: int) -> List[Job]:
         with self._lock:
-            if not self._queue:
-                return None
-            return self._queue.pop(0)
+            out: List[Job] = []
+            while len(out) < max_jobs:
+                job = self._pop_locked()
+                if job is None:
+                    break
+                out.append(job)
+            return out
+
+    def ack(self, job: Job) -> bool:
+        # dequeue already removed it; nothing is leased in memory
+        return True
+
+    def nack(self, job: Job, *, delay_sec: float = 0.0) -> bool:
+        """
+        Puts a dequeued job back (at the back of its user's line), after
+        delay_sec if given.
+        """
+        with self._not_empty:
+            self._delay_locked(job, delay_sec)
+        return True
+
+    def reschedule(self, job: Job, *, delay_sec: float) -> Optional[Job]:
+        """
+        Queues the next attempt of a failed job, not before delay_sec from now.
+        Waiting retries hold no worker. Returns the job as it was requeued.
+        """
+        retry = replace(
+            job,
+            attempt=job.attempt + 1,
+            retry_delay_sec=delay_sec,
+            not_before=time.time() + delay_sec,
+            receipt=None,
+        )
+        with self._not_empty:
+            self._delay_locked(retry, delay_sec)
+        return retry
 
     def size(self) -> int:
         with self._lock:
-            return len(self._queue)
+            self._promote_due_locked()
+            return self._size
 
-    def snapshot(self) -> List[Dict[str, Any]]:
+    def stats(self) -> Dict[str, Any]:
+        """
+        O(users) depth breakdown, cheaper than snapshot() for health checks.
+        """
         with self._lock:
-            return [
-                {
-                    "name": job.name,
-                    "user_id": job.user_id,
-                    "enqueued_at": job.enqueued_at,
-                }
-                for job in self._queue
-            ]
+            self._promote_due_locked()
+            return {
+                "size": self._size,
+                "delayed": len(self._delayed),
+                "by_priority": {
+                    p: sum(len(q) for q in ring.values()) for p, ring in self._levels.items()
+                },
+                "users_waiting": len({u for ring in self._levels.values() for u in ring}),
+            }
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Pending jobs grouped by priority then user (not exact dispatch order).
+        """
+        out: List[Dict[str, Any]] = []
+        with self._lock:
+            for priority in _PRIORITY_LEVELS:
+                for user_jobs in self._levels[priority].values():
+                    for job in user_jobs:
+                        if limit is not None and len(out) >= limit:
+                            return out
+                        out.append(
+                            {
+                                "name": job.name,
+                                "user_id": job.user_id,
+                                "priority": job.priority,
+                                "enqueued_at": job.enqueued_at,
+                            }
+                        )
+        return out
+
+
+def create_job_queue() -> Any:
+    """
+    Queue backend from JOB_QUEUE_BACKEND: "memory" (default, process-local)
+    or "sqlite" (durable, shared across processes; see sqlite_queue).
+    """
+    backend = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+
+    if backend == "memory":
+        return InMemoryJobQueue()
+
+    if backend == "sqlite":
+        from app.jobs.sqlite_queue import open_sqlite_job_queue
+
+        return open_sqlite_job_queue()
+
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {backend}")
 
 
 # Global singleton queue
-job_queue = InMemoryJobQueue()
+job_queue = create_job_queue()
 
 __all__ = [
+    "JOB_PRIORITIES",
+    "PRIORITY_BACKFILL",
+    "PRIORITY_IMPORT",
+    "PRIORITY_INTERACTIVE",
     "Job",
     "InMemoryJobQueue",
+    "create_job_queue",
     "job_queue",
-]
\ No newline at end of file
+]
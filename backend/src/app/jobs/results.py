@@ -0,0 +1,120 @@
+# LOCATION: backend/src/app/jobs/results.py
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import re
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.integrations.storage.blob_store import BlobStore
+
+log = logging.getLogger(__name__)
+
+# Worker "data" larger than this (serialized JSON) is spilled to the blob store
+JOB_RESULT_INLINE_MAX_BYTES = int(os.getenv("JOB_RESULT_INLINE_MAX_BYTES", str(64 * 1024)))
+
+RESULT_KEY_PREFIX = "job-results"
+RESULT_CONTENT_TYPE = "application/json"
+
+_JOB_ID_RE = re.compile(r"^[A-Za-z0-9_.:-]{1,200}$")
+
+
+def result_key(job_id: str) -> str:
+    """
+    Blob key holding the spilled payload of a job.
+    """
+    if not _JOB_ID_RE.match(job_id) or ".." in job_id:
+        raise ValueError(f"invalid job_id: {job_id!r}")
+    return f"{RESULT_KEY_PREFIX}/{job_id}.json"
+
+
+def _default_store() -> "BlobStore":
+    # lazy: blob_store pulls in settings
+    from app.integrations.storage.blob_store import get_blob_store
+
+    return get_blob_store()
+
+
+def summarize_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape of a payload without its contents: sizes for containers, scalars as-is.
+    """
+    out: Dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, (list, tuple)):
+            out[key] = {"type": "list", "len": len(value)}
+        elif isinstance(value, dict):
+            out[key] = {"type": "dict", "len": len(value)}
+        elif isinstance(value, str) and len(value) > 200:
+            out[key] = {"type": "str", "len": len(value)}
+        else:
+            out[key] = value
+    return out
+
+
+def spill_result(
+    job_id: str,
+    result: Dict[str, Any],
+    *,
+    store: Optional["BlobStore"] = None,
+    max_inline_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Moves a worker result's "data" to the blob store when it is too big to inline.
+
+    Everything else in the result (ok, counts, errors, ...) stays inline.
+    A spilled result carries instead:
+      data = {"result_ref": {"key", "bytes", "content_type"}, "summary": {...}}
+    and the payload is fetched separately (GET /jobs/{job_id}/result).
+    If the store is unavailable the result is returned unchanged.
+    """
+    data = result.get("data")
+    if not isinstance(data, dict) or not data:
+        return result
+
+    limit = JOB_RESULT_INLINE_MAX_BYTES if max_inline_bytes is None else max_inline_bytes
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(body) <= limit:
+        return result
+
+    key = result_key(job_id)
+    try:
+        (store or _default_store()).put(
+            key=key,
+            data=io.BytesIO(body),
+            content_type=RESULT_CONTENT_TYPE,
+        )
+    except Exception as exc:
+        log.warning("could not spill result of job %s (%d bytes): %s", job_id, len(body), exc)
+        return result
+
+    return {
+        **result,
+        "data": {
+            "result_ref": {
+                "key": key,
+                "bytes": len(body),
+                "content_type": RESULT_CONTENT_TYPE,
+            },
+            "summary": summarize_data(data),
+        },
+    }
+
+
+def load_result(job_id: str, *, store: Optional["BlobStore"] = None) -> bytes:
+    """
+    Raw JSON of a spilled payload. Raises FileNotFoundError when there is none.
+    """
+    return (store or _default_store()).get(key=result_key(job_id))
+
+
+__all__ = [
+    "JOB_RESULT_INLINE_MAX_BYTES",
+    "load_result",
+    "result_key",
+    "spill_result",
+    "summarize_data",
+]
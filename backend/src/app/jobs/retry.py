@@ -1,9 +1,41 @@
 # LOCATION: backend/src/app/jobs/retry.py
 from __future__ import annotations
 
+import asyncio
+import os
+import random
+import threading
 import time
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class NonRetryableError(RuntimeError):
+    """
+    Raise from a worker when another attempt cannot succeed (bad input, revoked token).
+    """
+
+
+# 4xx responses that are worth another try: timeout, too early, rate limited
+_RETRYABLE_CLIENT_STATUSES = frozenset({408, 425, 429})
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Default error classification.
+
+    - NonRetryableError: never
+    - errors carrying an HTTP `status` (e.g. YouTubeAPIError): 4xx only
+      for 408 / 425 / 429; quota exhaustion and auth errors (403 / 401)
+      won't fix themselves within a retry window
+    - anything else: yes
+    """
+    if isinstance(exc, NonRetryableError):
+        return False
+    status = getattr(exc, "status", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in _RETRYABLE_CLIENT_STATUSES
+    return True
 
 
 @dataclass(frozen=True)
@@ -12,13 +44,21 @@ class RetryPolicy:
     Defines retry behavior for a job/worker.
 
     Notes:
-    - Deterministic backoff (no jitter) for reproducible debugging.
+    - Deterministic backoff by default, for reproducible debugging.
+      jitter=True switches to decorrelated jitter, so jobs that failed
+      together (e.g. on one API outage) don't all retry together.
     - max_attempts includes the first attempt.
+    - retry_on decides which errors are retried (default is_retryable).
     """
     max_attempts: int = 3
     base_delay_sec: float = 1.0
     max_delay_sec: float = 30.0
     backoff_factor: float = 2.0
+    jitter: bool = False
+    retry_on: Optional[Callable[[BaseException], bool]] = None
+
+    def should_retry(self, exc: BaseException) -> bool:
+        return (self.retry_on or is_retryable)(exc)
 
     def validate(self) -> None:
         if self.max_attempts < 1:
@@ -38,16 +78,96 @@ class RetryState:
     """
     attempt: int = 0
     last_error: Optional[str] = None
+    # previous backoff; decorrelated jitter grows from it
+    last_delay: float = 0.0
 
     def can_retry(self, policy: RetryPolicy) -> bool:
         # attempt is 1-based once we start
         return self.attempt < policy.max_attempts
 
     def next_delay(self, policy: RetryPolicy) -> float:
-        # attempt 1 -> delay base*backoff^(0)
-        exp = max(0, self.attempt - 1)
-        delay = policy.base_delay_sec * (policy.backoff_factor ** exp)
-        return min(delay, policy.max_delay_sec)
+        if policy.jitter:
+            # decorrelated jitter: uniform in [base, 3 * previous delay]
+            prev = self.last_delay or policy.base_delay_sec
+            delay = random.uniform(policy.base_delay_sec, max(policy.base_delay_sec, prev * 3))
+        else:
+            # attempt 1 -> delay base*backoff^(0)
+            exp = max(0, self.attempt - 1)
+            delay = policy.base_delay_sec * (policy.backoff_factor ** exp)
+        self.last_delay = min(delay, policy.max_delay_sec)
+        return self.last_delay
+
+
+class RetryBudget:
+    """
+    Process-wide token bucket that caps the retry rate.
+
+    Each retry spends one token; tokens refill at rate_per_sec up to burst.
+    When a dependency is down every job fails at once: the budget turns
+    that into a bounded trickle of retries instead of a retry storm, and
+    jobs that find it empty fail instead of retrying.
+    """
+
+    def __init__(self, *, rate_per_sec: float, burst: float) -> None:
+        if rate_per_sec < 0 or burst < 0:
+            raise ValueError("RetryBudget rate_per_sec and burst must be >= 0")
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._spent = 0
+        self._denied = 0
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+        self._updated = now
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill_locked()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._spent += 1
+                return True
+            self._denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill_locked()
+            return {
+                "tokens": round(self._tokens, 3),
+                "rate_per_sec": self.rate_per_sec,
+                "burst": self.burst,
+                "spent": self._spent,
+                "denied": self._denied,
+            }
+
+
+def plan_retry(
+    exc: BaseException,
+    state: RetryState,
+    policy: RetryPolicy,
+    budget: Optional[RetryBudget] = None,
+) -> Optional[float]:
+    """
+    Delay before the next attempt, or None to give up: attempts exhausted,
+    error not retryable, or no retry budget left.
+    """
+    if not state.can_retry(policy) or not policy.should_retry(exc):
+        return None
+    if budget is not None and not budget.try_spend():
+        return None
+    return state.next_delay(policy)
+
+
+# Global retry budget (JOB_RETRY_BUDGET_PER_SEC / JOB_RETRY_BUDGET_BURST)
+retry_budget = RetryBudget(
+    rate_per_sec=float(os.getenv("JOB_RETRY_BUDGET_PER_SEC", "5")),
+    burst=float(os.getenv("JOB_RETRY_BUDGET_BURST", "50")),
+)
 
 
 def run_with_retry(
@@ -55,12 +175,14 @@ def run_with_retry(
     fn: Callable[[], None],
     policy: RetryPolicy,
     on_error: Optional[Callable[[Exception, RetryState], None]] = None,
+    budget: Optional[RetryBudget] = None,
 ) -> RetryState:
     """
     Executes fn with retry semantics.
 
     - fn: callable with no args (wrap externally as needed)
     - on_error: optional hook (metrics/logging) invoked after failure, before sleep
+    - budget: optional RetryBudget each retry must spend from
     - returns RetryState on success, raises the final exception on exhaustion
     """
     policy.validate()
@@ -78,16 +200,56 @@ def run_with_retry(
             if on_error is not None:
                 on_error(exc, state)
 
-            if not state.can_retry(policy):
+            delay = plan_retry(exc, state, policy, budget)
+            if delay is None:
                 raise
 
-            delay = state.next_delay(policy)
             if delay > 0:
                 time.sleep(delay)
 
 
+async def run_with_retry_async(
+    *,
+    fn: Callable[[], Awaitable[None]],
+    policy: RetryPolicy,
+    on_error: Optional[Callable[[Exception, RetryState], None]] = None,
+    budget: Optional[RetryBudget] = None,
+) -> RetryState:
+    """
+    run_with_retry for coroutines: backoff waits with asyncio.sleep, so the
+    event loop keeps running other jobs meanwhile.
+    """
+    policy.validate()
+    state = RetryState()
+
+    while True:
+        try:
+            state.attempt += 1
+            await fn()
+            return state
+
+        except Exception as exc:
+            state.last_error = str(exc)
+
+            if on_error is not None:
+                on_error(exc, state)
+
+            delay = plan_retry(exc, state, policy, budget)
+            if delay is None:
+                raise
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
 __all__ = [
+    "NonRetryableError",
+    "RetryBudget",
     "RetryPolicy",
     "RetryState",
+    "is_retryable",
+    "plan_retry",
+    "retry_budget",
     "run_with_retry",
+    "run_with_retry_async",
 ]
\ No newline at end of file
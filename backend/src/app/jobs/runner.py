@@ -1,15 +1,125 @@
 # LOCATION: backend/src/app/jobs/runner.py
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional
+import asyncio
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
 
 from app.jobs.context import JobContext
-from app.jobs.retry import RetryPolicy, run_with_retry
-from app.jobs.metrics import JobMetrics
-from app.jobs.locks import JobLock
-
+from app.jobs.locks import async_job_lock, job_lock
+from app.jobs.metrics import JobMetrics, metrics_registry
+from app.jobs.results import spill_result
+from app.jobs.retry import (
+    RetryPolicy,
+    RetryState,
+    plan_retry,
+    retry_budget,
+    run_with_retry,
+    run_with_retry_async,
+)
 
 WorkerFn = Callable[[JobContext, Dict[str, Any]], Dict[str, Any]]
+AsyncWorkerFn = Callable[[JobContext, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Threads that run sync workers for run_job_async. Workers mostly wait on
+# HTTP, so this is sized for I/O concurrency, not CPU count.
+DEFAULT_ASYNC_SYNC_THREADS = 64
+
+_SYNC_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_SYNC_EXECUTOR_GUARD = threading.Lock()
+
+
+def _sync_executor() -> ThreadPoolExecutor:
+    global _SYNC_EXECUTOR
+    with _SYNC_EXECUTOR_GUARD:
+        if _SYNC_EXECUTOR is None:
+            threads = int(os.getenv("JOB_ASYNC_SYNC_THREADS", str(DEFAULT_ASYNC_SYNC_THREADS)))
+            _SYNC_EXECUTOR = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="job-sync")
+        return _SYNC_EXECUTOR
+
+
+def _note_fencing_token(ctx: JobContext, lock: Any) -> None:
+    # lease locks hand out fencing tokens; workers can pass them to guarded writes
+    token = getattr(lock, "fencing_token", None)
+    if token is not None:
+        ctx.add_meta("fencing_token", token)
+
+
+def _ensure_lease(lock: Any) -> None:
+    # a lease lock whose lease lapsed mid-run raises LeaseLostError: another
+    # process may have taken the job over, so this run must not count
+    ensure_held = getattr(lock, "ensure_held", None)
+    if ensure_held is not None:
+        ensure_held()
+
+
+def _ok_result(
+    job_id: str, user_id: Optional[str], metrics: JobMetrics, data: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "job_id": job_id,
+        "user_id": user_id,
+        "attempts": metrics.attempts,
+        "data": data,
+        "errors": [],
+    }
+
+
+def _failed_result(
+    job_id: str, user_id: Optional[str], metrics: JobMetrics, exc: Exception
+) -> Dict[str, Any]:
+    return {
+        "ok": False,
+        "job_id": job_id,
+        "user_id": user_id,
+        "attempts": metrics.attempts,
+        "data": {},
+        "errors": [str(exc)],
+    }
+
+
+def _observe(
+    job_name: str,
+    queue_wait_sec: Optional[float],
+    started: float,
+    metrics: JobMetrics,
+    first_attempts: int,
+    result: Dict[str, Any],
+) -> None:
+    if result["ok"]:
+        outcome = "succeeded"
+    else:
+        outcome = "retrying" if "retry" in result else "failed"
+    metrics_registry.observe_job(
+        job_name,
+        run_sec=time.perf_counter() - started,
+        attempts=metrics.attempts - first_attempts,
+        outcome=outcome,
+        queue_wait_sec=queue_wait_sec,
+    )
+
+
+def _plan_requeue(
+    result: Dict[str, Any],
+    exc: Exception,
+    policy: RetryPolicy,
+    attempt: int,
+    retry_delay_sec: float,
+) -> None:
+    # requeue mode: decide the next attempt here, the dispatcher queues it
+    state = RetryState(attempt=attempt, last_error=str(exc), last_delay=retry_delay_sec)
+    delay = plan_retry(exc, state, policy, retry_budget)
+    if delay is not None:
+        result["retry"] = {
+            "attempt": attempt + 1,
+            "delay_sec": round(delay, 3),
+            "not_before": time.time() + delay,
+        }
 
 
 def run_job(
@@ -19,6 +129,13 @@ def run_job(
     payload: Dict[str, Any],
     user_id: Optional[str] = None,
     retry_policy: Optional[RetryPolicy] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    lock_key: Optional[str] = None,
+    requeue: bool = False,
+    attempt: int = 1,
+    retry_delay_sec: float = 0.0,
+    job_name: Optional[str] = None,
+    queued_at: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Executes a job safely and consistently.
@@ -26,17 +143,33 @@ def run_job(
     Guarantees:
     - context exists
     - metrics recorded
-    - retries applied
-    - lock enforced
+    - retries applied (budgeted by the global retry_budget)
+    - lock enforced (on lock_key, default job_id; backend per JOB_LOCK_BACKEND)
     - structured result returned
+    - large worker payloads spilled to the blob store (see jobs.results)
+
+    requeue=True runs only `attempt` and never sleeps: if it fails and the
+    policy allows another try, result["retry"] carries the next attempt
+    number and its not-before time for the caller to put back on the queue
+    (see dispatcher). retry_delay_sec is the previous backoff, for jitter.
+
+    Every call is recorded in metrics_registry under job_name (default: the
+    worker's function name); queued_at (epoch seconds the job became
+    runnable) adds its queue wait.
     """
 
     ctx = JobContext(
         job_id=job_id,
         user_id=user_id,
+        progress_hook=on_progress,
     )
 
-    metrics = JobMetrics(job_id)
+    metric_name = job_name or str(getattr(worker, "__name__", "job"))
+    queue_wait_sec = None if queued_at is None else time.time() - queued_at
+
+    # in requeue mode earlier attempts ran in earlier deliveries
+    metrics = JobMetrics(job_id, attempts=attempt - 1 if requeue else 0)
+    first_attempts = metrics.attempts
     retry_policy = retry_policy or RetryPolicy()
 
     def _execute() -> None:
@@ -49,38 +182,126 @@ def run_job(
 
         ctx.result = result
 
-    with JobLock(job_id):
+    with job_lock(lock_key or job_id) as lock:
+        _note_fencing_token(ctx, lock)
+        started = time.perf_counter()
         try:
-            run_with_retry(
-                fn=_execute,
-                policy=retry_policy,
-                on_error=lambda exc, state: metrics.mark_retry(
-                    attempt=state.attempt,
-                    error=str(exc),
-                ),
-            )
+            if requeue:
+                _execute()
+            else:
+                run_with_retry(
+                    fn=_execute,
+                    policy=retry_policy,
+                    on_error=lambda exc, state: metrics.mark_retry(
+                        attempt=state.attempt,
+                        error=str(exc),
+                    ),
+                    budget=retry_budget,
+                )
+
+            _ensure_lease(lock)
+            metrics.mark_success()
+            result = _ok_result(job_id, user_id, metrics, spill_result(job_id, ctx.result or {}))
+
+        except Exception as exc:
+            metrics.mark_failure(str(exc))
+            result = _failed_result(job_id, user_id, metrics, exc)
+            if requeue:
+                _plan_requeue(result, exc, retry_policy, attempt, retry_delay_sec)
+
+        _observe(metric_name, queue_wait_sec, started, metrics, first_attempts, result)
+        return result
 
+
+async def run_job_async(
+    *,
+    job_id: str,
+    worker: Union[WorkerFn, AsyncWorkerFn],
+    payload: Dict[str, Any],
+    user_id: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    lock_key: Optional[str] = None,
+    requeue: bool = False,
+    attempt: int = 1,
+    retry_delay_sec: float = 0.0,
+    job_name: Optional[str] = None,
+    queued_at: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    run_job for an event loop: same guarantees and result shape.
+
+    Coroutine workers run on the loop; sync workers run in a shared thread
+    pool (JOB_ASYNC_SYNC_THREADS, default 64). Retry backoff and lock waits
+    never block the loop, so one process can keep hundreds of I/O-bound
+    jobs in flight. requeue / attempt / retry_delay_sec / job_name /
+    queued_at as in run_job.
+    """
+
+    ctx = JobContext(
+        job_id=job_id,
+        user_id=user_id,
+        progress_hook=on_progress,
+    )
+
+    metric_name = job_name or str(getattr(worker, "__name__", "job"))
+    queue_wait_sec = None if queued_at is None else time.time() - queued_at
+
+    # in requeue mode earlier attempts ran in earlier deliveries
+    metrics = JobMetrics(job_id, attempts=attempt - 1 if requeue else 0)
+    first_attempts = metrics.attempts
+    retry_policy = retry_policy or RetryPolicy()
+    is_async = inspect.iscoroutinefunction(worker)
+    loop = asyncio.get_running_loop()
+
+    async def _execute() -> None:
+        metrics.mark_attempt()
+
+        result: Any
+        if is_async:
+            pending = worker(ctx, payload)
+            result = await pending if inspect.isawaitable(pending) else pending
+        else:
+            result = await loop.run_in_executor(_sync_executor(), worker, ctx, payload)
+
+        if not isinstance(result, dict):
+            raise RuntimeError("Worker must return dict result")
+
+        ctx.result = result
+
+    async with async_job_lock(lock_key or job_id) as lock:
+        _note_fencing_token(ctx, lock)
+        started = time.perf_counter()
+        try:
+            if requeue:
+                await _execute()
+            else:
+                await run_with_retry_async(
+                    fn=_execute,
+                    policy=retry_policy,
+                    on_error=lambda exc, state: metrics.mark_retry(
+                        attempt=state.attempt,
+                        error=str(exc),
+                    ),
+                    budget=retry_budget,
+                )
+
+            _ensure_lease(lock)
             metrics.mark_success()
-            return {
-                "ok": True,
-                "job_id": job_id,
-                "user_id": user_id,
-                "attempts": metrics.attempts,
-                "data": ctx.result or {},
-                "errors": [],
-            }
+            # spilling may write to the blob store
+            data = await loop.run_in_executor(
+                _sync_executor(), spill_result, job_id, ctx.result or {}
+            )
+            result = _ok_result(job_id, user_id, metrics, data)
 
         except Exception as exc:
             metrics.mark_failure(str(exc))
+            result = _failed_result(job_id, user_id, metrics, exc)
+            if requeue:
+                _plan_requeue(result, exc, retry_policy, attempt, retry_delay_sec)
 
-            return {
-                "ok": False,
-                "job_id": job_id,
-                "user_id": user_id,
-                "attempts": metrics.attempts,
-                "data": {},
-                "errors": [str(exc)],
-            }
+        _observe(metric_name, queue_wait_sec, started, metrics, first_attempts, result)
+        return result
 
 
-__all__ = ["run_job"]
\ No newline at end of file
+__all__ = ["AsyncWorkerFn", "WorkerFn", "run_job", "run_job_async"]
\ No newline at end of file
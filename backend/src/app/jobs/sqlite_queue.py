@@ -0,0 +1,360 @@
+# LOCATION: backend/src/app/jobs/sqlite_queue.py
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.jobs.queue import JOB_PRIORITIES, PRIORITY_IMPORT, Job
+
+# Seconds a dequeued job stays invisible before it's handed out again
+DEFAULT_VISIBILITY_TIMEOUT_SEC = 30 * 60
+# Deliveries after which a job is parked as dead instead of redelivered
+DEFAULT_MAX_DELIVERIES = 5
+
+# Blocking dequeue polls the table (other processes can't notify us)
+_POLL_MIN_SEC = 0.005
+_POLL_MAX_SEC = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT    NOT NULL,
+    payload     TEXT    NOT NULL,
+    user_id     TEXT,
+    user_key    TEXT    NOT NULL,
+    priority    INTEGER NOT NULL,
+    round       INTEGER NOT NULL,
+    enqueued_at REAL    NOT NULL,
+    visible_at  REAL    NOT NULL,
+    deliveries  INTEGER NOT NULL DEFAULT 0,
+    lease       TEXT,
+    uid         TEXT,
+    attempt     INTEGER NOT NULL DEFAULT 1,
+    retry_delay REAL    NOT NULL DEFAULT 0,
+    not_before  REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (priority, round, id);
+CREATE INDEX IF NOT EXISTS jobs_user ON jobs (priority, user_key, round);
+"""
+_ADDED_COLUMNS = (
+    ("uid", "TEXT"),
+    ("attempt", "INTEGER NOT NULL DEFAULT 1"),
+    ("retry_delay", "REAL NOT NULL DEFAULT 0"),
+    ("not_before", "REAL"),
+)
+
+
+class SqliteJobQueue:
+    """
+    Durable job queue in a SQLite file (WAL mode), shared by every process
+    on the host that opens the same path.
+
+    Same enqueue / dequeue / size / snapshot interface as InMemoryJobQueue,
+    with the same ordering: priority class first, then round-robin across
+    users (each job gets a per-user "round"; a user's first pending job
+    joins the current round, later ones queue behind it).
+
+    Delivery is at-least-once: dequeue leases a job for visibility_timeout
+    seconds; ack() deletes it, nack() makes it visible again. A job whose
+    worker died reappears once its lease expires; after max_deliveries it
+    is parked (kept in the table, never handed out) for inspection.
+
+    reschedule() turns a failed attempt into a delayed row (visible_at in
+    the future, no lease), so retries wait in the table, not in a worker.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SEC,
+        max_deliveries: int = DEFAULT_MAX_DELIVERIES,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self._local = threading.local()
+        # wakes blocked dequeues in this process; other processes are polled
+        self._enqueued = threading.Condition()
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+        # queue files created before jobs carried these
+        for column, ddl in _ADDED_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+
+    # -------------------------
+    # Connection
+    # -------------------------
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; autocommit, explicit BEGIN IMMEDIATE for writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -------------------------
+    # Queue interface
+    # -------------------------
+    def enqueue(
+        self,
+        *,
+        name: str,
+        payload: Dict[str, Any],
+        user_id: Optional[str] = None,
+        priority: Optional[int] = None,
+    ) -> Job:
+        if priority is None:
+            priority = JOB_PRIORITIES.get(name, PRIORITY_IMPORT)
+        now = time.time()
+        user_key = user_id or ""
+        body = json.dumps(payload, separators=(",", ":"), default=str)
+        uid = uuid.uuid4().hex
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT COALESCE(
+                    (SELECT MAX(round) + 1 FROM jobs
+                     WHERE priority = ? AND user_key = ? AND deliveries < ?),
+                    (SELECT MIN(round) FROM jobs WHERE priority = ? AND deliveries < ?),
+                    0)
+                """,
+                (priority, user_key, self.max_deliveries, priority, self.max_deliveries),
+            ).fetchone()
+            cur = conn.execute(
+                """
+                INSERT INTO jobs (name, payload, user_id, user_key, priority, round,
+                                  enqueued_at, visible_at, uid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (name, body, user_id, user_key, priority, row[0], now, now, uid),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._enqueued:
+            self._enqueued.notify()
+
+        return Job(
+            name=name,
+            payload=payload,
+            user_id=user_id,
+            enqueued_at=now,
+            priority=priority,
+            receipt=f"{cur.lastrowid}:",
+            uid=uid,
+        )
+
+    def dequeue_batch(self, max_jobs: int) -> List[Job]:
+        """
+        Leases up to max_jobs visible jobs in one transaction.
+        """
+        if max_jobs <= 0:
+            return []
+        now = time.time()
+        token = secrets.token_hex(8)
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """
+                SELECT id, name, payload, user_id, priority, enqueued_at, uid,
+                       attempt, retry_delay, not_before FROM jobs
+                WHERE visible_at <= ? AND deliveries < ?
+                ORDER BY priority, round, id
+                LIMIT ?
+                """,
+                (now, self.max_deliveries, max_jobs),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE jobs SET visible_at = ?, deliveries = deliveries + 1, lease = ?"
+                    " WHERE id = ?",
+                    [(now + self.visibility_timeout, token, r["id"]) for r in rows],
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        return [
+            Job(
+                name=r["name"],
+                payload=json.loads(r["payload"]),
+                user_id=r["user_id"],
+                enqueued_at=r["enqueued_at"],
+                priority=r["priority"],
+                receipt=f"{r['id']}:{token}",
+                uid=r["uid"] or f"q{r['id']}",
+                attempt=r["attempt"],
+                retry_delay_sec=r["retry_delay"],
+                not_before=r["not_before"],
+            )
+            for r in rows
+        ]
+
+    def dequeue(self, timeout: Optional[float] = 0.0) -> Optional[Job]:
+        """
+        Next job (leased), or None. timeout as in InMemoryJobQueue.dequeue.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = _POLL_MIN_SEC
+        while True:
+            jobs = self.dequeue_batch(1)
+            if jobs:
+                return jobs[0]
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            with self._enqueued:
+                self._enqueued.wait(delay)
+            delay = min(delay * 2, _POLL_MAX_SEC)
+
+    def _receipt(self, job: Job) -> tuple:
+        if not job.receipt:
+            raise ValueError("job was not dequeued from a SqliteJobQueue")
+        row_id, _, token = job.receipt.partition(":")
+        return int(row_id), token
+
+    def ack(self, job: Job) -> bool:
+        """
+        Deletes a finished job. False if its lease expired and it was handed out again.
+        """
+        row_id, token = self._receipt(job)
+        cur = self._conn().execute("DELETE FROM jobs WHERE id = ? AND lease = ?", (row_id, token))
+        return cur.rowcount == 1
+
+    def nack(self, job: Job, *, delay_sec: float = 0.0) -> bool:
+        """
+        Returns a leased job to the queue, visible again after delay_sec.
+        """
+        row_id, token = self._receipt(job)
+        cur = self._conn().execute(
+            "UPDATE jobs SET visible_at = ?, lease = NULL WHERE id = ? AND lease = ?",
+            (time.time() + delay_sec, row_id, token),
+        )
+        if delay_sec <= 0:
+            with self._enqueued:
+                self._enqueued.notify()
+        return cur.rowcount == 1
+
+    def reschedule(self, job: Job, *, delay_sec: float) -> Optional[Job]:
+        """
+        Turns the leased row into the job's next attempt, visible after
+        delay_sec. Deliveries restart at 0: the retry policy bounds
+        attempts, max_deliveries only catches crashed workers.
+        None if the lease expired and the job was handed out again.
+        """
+        row_id, token = self._receipt(job)
+        not_before = time.time() + delay_sec
+        cur = self._conn().execute(
+            """
+            UPDATE jobs SET visible_at = ?, not_before = ?, lease = NULL, deliveries = 0,
+                            attempt = attempt + 1, retry_delay = ?
+            WHERE id = ? AND lease = ?
+            """,
+            (not_before, not_before, delay_sec, row_id, token),
+        )
+        if cur.rowcount != 1:
+            return None
+        if delay_sec <= 0:
+            with self._enqueued:
+                self._enqueued.notify()
+        return replace(
+            job,
+            attempt=job.attempt + 1,
+            retry_delay_sec=delay_sec,
+            not_before=not_before,
+            receipt=f"{row_id}:",
+        )
+
+    def size(self) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE visible_at <= ? AND deliveries < ?",
+            (time.time(), self.max_deliveries),
+        ).fetchone()
+        return int(row[0])
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        rows = self._conn().execute(
+            """
+            SELECT priority,
+                   SUM(visible_at <= ? AND deliveries < ?)                      AS ready,
+                   SUM(visible_at > ? AND lease IS NOT NULL AND deliveries < ?) AS leased,
+                   SUM(visible_at > ? AND lease IS NULL AND deliveries < ?)     AS delayed,
+                   SUM(deliveries >= ?)                                         AS dead
+            FROM jobs GROUP BY priority
+            """,
+            (
+                now, self.max_deliveries,
+                now, self.max_deliveries,
+                now, self.max_deliveries,
+                self.max_deliveries,
+            ),
+        ).fetchall()
+        return {
+            "size": sum(r["ready"] for r in rows),
+            "by_priority": {r["priority"]: r["ready"] for r in rows},
+            "leased": sum(r["leased"] for r in rows),
+            "delayed": sum(r["delayed"] for r in rows),
+            "dead": sum(r["dead"] for r in rows),
+        }
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            """
+            SELECT name, user_id, priority, enqueued_at FROM jobs
+            WHERE visible_at <= ? AND deliveries < ?
+            ORDER BY priority, round, id LIMIT ?
+            """,
+            (time.time(), self.max_deliveries, -1 if limit is None else limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def open_sqlite_job_queue() -> SqliteJobQueue:
+    """
+    Opens the queue at JOB_QUEUE_PATH (default data/jobs/queue.sqlite3).
+    """
+    return SqliteJobQueue(
+        Path(os.getenv("JOB_QUEUE_PATH", "data/jobs/queue.sqlite3")),
+        visibility_timeout=float(
+            os.getenv("JOB_QUEUE_VISIBILITY_SEC", str(DEFAULT_VISIBILITY_TIMEOUT_SEC))
+        ),
+    )
+
+
+__all__ = [
+    "SqliteJobQueue",
+    "open_sqlite_job_queue",
+]
@@ -0,0 +1,245 @@
+# LOCATION: backend/src/app/jobs/status.py
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.jobs.queue import Job
+
+# Job states
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_RETRYING = "retrying"  # failed attempt, next one queued for retry_at
+STATE_SUCCEEDED = "succeeded"
+STATE_FAILED = "failed"
+FINISHED_STATES = (STATE_SUCCEEDED, STATE_FAILED)
+
+DEFAULT_MAX_ENTRIES = 10_000
+# Finished jobs are forgotten this long after they finish
+DEFAULT_TTL_SEC = 60 * 60
+
+
+@dataclass
+class JobStatus:
+    job_id: str
+    name: str
+    user_id: Optional[str]
+    state: str = STATE_QUEUED
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float = field(default_factory=time.time)
+    progress: Dict[str, Any] = field(default_factory=dict)
+    # run_job's result (large payloads already spilled, see jobs.results);
+    # while retrying, the failed attempt's result
+    result: Optional[Dict[str, Any]] = None
+    attempt: int = 1
+    retry_at: Optional[float] = None
+    # bumped on every change; lets pollers / SSE streams wait for the next one
+    version: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def snapshot(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# (loop, future) of a coroutine parked in wait_for_change_async
+_Waiter = Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]
+
+
+def _wake(fut: "asyncio.Future[None]") -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class JobStatusStore:
+    """
+    In-process, bounded record of recent jobs: state, progress and result.
+
+    Memory stays bounded: finished entries expire after ttl_sec, and past
+    max_entries the least recently updated entries are dropped. Entries
+    are kept in update order, so both evictions only look at the front.
+
+    NOTE: process-local. With a separate worker process the API process
+    only sees jobs it enqueued, not their progress.
+    """
+
+    def __init__(
+        self, *, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_sec: float = DEFAULT_TTL_SEC
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[str, JobStatus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # event-loop waiters per job_id (wait_for_change_async)
+        self._waiters: Dict[str, List[_Waiter]] = {}
+
+    # -------------------------
+    # Writers
+    # -------------------------
+    def _touch_locked(self, st: JobStatus) -> None:
+        st.updated_at = time.time()
+        st.version += 1
+        self._entries.move_to_end(st.job_id)
+        self._evict_locked(st.updated_at)
+        self._changed.notify_all()
+        for loop, fut in self._waiters.pop(st.job_id, ()):
+            try:
+                loop.call_soon_threadsafe(_wake, fut)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def _evict_locked(self, now: float) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        # the front is the least recently updated; stop at the first live entry
+        while self._entries:
+            st = next(iter(self._entries.values()))
+            if not (st.finished and now - st.updated_at > self.ttl_sec):
+                break
+            self._entries.popitem(last=False)
+
+    def queued(self, job: Job) -> JobStatus:
+        with self._lock:
+            st = JobStatus(
+                job_id=job.job_id,
+                name=job.name,
+                user_id=job.user_id,
+                enqueued_at=job.enqueued_at,
+            )
+            self._entries[st.job_id] = st
+            self._touch_locked(st)
+            return st
+
+    def _get_or_create_locked(self, job: Job) -> JobStatus:
+        # the job may have been enqueued by another process
+        st = self._entries.get(job.job_id)
+        if st is None:
+            st = self._entries[job.job_id] = JobStatus(
+                job_id=job.job_id,
+                name=job.name,
+                user_id=job.user_id,
+                enqueued_at=job.enqueued_at,
+            )
+        return st
+
+    def running(self, job: Job) -> None:
+        with self._lock:
+            st = self._get_or_create_locked(job)
+            st.state = STATE_RUNNING
+            st.started_at = time.time()
+            st.attempt = job.attempt
+            st.retry_at = None
+            self._touch_locked(st)
+
+    def progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        with self._lock:
+            st = self._entries.get(job_id)
+            if st is None:
+                return
+            st.progress = dict(progress)
+            self._touch_locked(st)
+
+    def retrying(self, job: Job, result: Dict[str, Any], retry_at: float) -> None:
+        with self._lock:
+            st = self._get_or_create_locked(job)
+            st.state = STATE_RETRYING
+            st.result = result
+            st.retry_at = retry_at
+            self._touch_locked(st)
+
+    def finished(self, job: Job, result: Dict[str, Any]) -> None:
+        with self._lock:
+            st = self._get_or_create_locked(job)
+            st.state = STATE_SUCCEEDED if result.get("ok") else STATE_FAILED
+            st.finished_at = time.time()
+            st.result = result
+            st.retry_at = None
+            self._touch_locked(st)
+
+    # -------------------------
+    # Readers
+    # -------------------------
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._evict_locked(time.time())
+            st = self._entries.get(job_id)
+            return st.snapshot() if st is not None else None
+
+    def wait_for_change(
+        self, job_id: str, version: int, timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Blocks until the job's version passes `version` (or timeout), then
+        returns its snapshot; None once the job is unknown / evicted.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                st = self._entries.get(job_id)
+                if st is None or st.version > version:
+                    return st.snapshot() if st is not None else None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return st.snapshot()
+                self._changed.wait(remaining)
+
+    async def wait_for_change_async(
+        self, job_id: str, version: int, timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        wait_for_change for coroutines. The wait is a future on the loop,
+        resolved by the next change to the job from whichever thread makes
+        it, so no thread is held per waiter (e.g. per SSE client).
+        """
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[None]" = loop.create_future()
+        with self._lock:
+            st = self._entries.get(job_id)
+            if st is None or st.version > version:
+                return st.snapshot() if st is not None else None
+            self._waiters.setdefault(job_id, []).append((loop, fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters[:] = [w for w in waiters if w[1] is not fut]
+                    if not waiters:
+                        del self._waiters[job_id]
+        return self.get(job_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Global singleton status store
+job_status = JobStatusStore(
+    max_entries=int(os.getenv("JOB_STATUS_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+    ttl_sec=float(os.getenv("JOB_STATUS_TTL_SEC", str(DEFAULT_TTL_SEC))),
+)
+
+__all__ = [
+    "FINISHED_STATES",
+    "JobStatus",
+    "JobStatusStore",
+    "STATE_FAILED",
+    "STATE_QUEUED",
+    "STATE_RETRYING",
+    "STATE_RUNNING",
+    "STATE_SUCCEEDED",
+    "job_status",
+]
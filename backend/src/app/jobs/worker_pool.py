@@ -0,0 +1,269 @@
+# LOCATION: backend/src/app/jobs/worker_pool.py
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.jobs.dispatcher import dispatch_job, dispatch_job_async
+from app.jobs.queue import job_queue
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKER_THREADS = 2
+# How long an idle worker blocks on the queue before re-checking for shutdown
+DEFAULT_POLL_TIMEOUT_SEC = 1.0
+# Concurrent jobs per event loop for run_async_workers
+DEFAULT_ASYNC_CONCURRENCY = 200
+
+
+class WorkerPool:
+    """
+    Background threads that pull jobs from the queue and run them.
+
+    HTTP handlers only enqueue; this pool does the work, so a slow job
+    (or a retry backoff) never holds a request thread.
+
+    Shutdown:
+    - stop(drain=False): workers finish the job they are running, then exit;
+      queued jobs stay queued (durable queues keep them across restarts).
+    - stop(drain=True): workers keep going until the queue is empty, then exit.
+    Both wait at most `timeout` seconds for the threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue: Any = None,
+        concurrency: int = DEFAULT_WORKER_THREADS,
+        poll_timeout: float = DEFAULT_POLL_TIMEOUT_SEC,
+        name: str = "job-worker",
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("WorkerPool.concurrency must be >= 1")
+        self.queue = queue if queue is not None else job_queue
+        self.concurrency = concurrency
+        self.poll_timeout = poll_timeout
+        self.name = name
+
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._drain = False
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> "WorkerPool":
+        if self._threads:
+            return self
+        self._stopping.clear()
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._loop, name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        log.info("worker pool started (%d threads)", self.concurrency)
+        return self
+
+    def stop(self, *, drain: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Signals shutdown and waits for the threads. False if some were still
+        running when `timeout` ran out.
+        """
+        self._drain = drain
+        self._stopping.set()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+        alive = [t for t in self._threads if t.is_alive()]
+        if alive:
+            log.warning("worker pool stop timed out with %d threads busy", len(alive))
+            return False
+        self._threads = []
+        log.info("worker pool stopped (%d processed)", self._processed)
+        return True
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop(drain=True)
+
+    # -------------------------
+    # Worker loop
+    # -------------------------
+    def _loop(self) -> None:
+        while True:
+            if self._stopping.is_set() and not self._drain:
+                return
+
+            job = self.queue.dequeue(timeout=self.poll_timeout)
+            if job is None:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            with self._stats_lock:
+                self._in_flight += 1
+            ok = False
+            try:
+                result = dispatch_job(job, self.queue)
+                ok = bool(result.get("ok"))
+                log.info("job %s finished ok=%s", job.job_id, ok)
+            except Exception:
+                # dispatch_job/run_job return errors as dicts; this is a bug
+                log.exception("job %s crashed its worker", job.job_id)
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+                    self._processed += 1
+                    if not ok:
+                        self._failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "threads": sum(t.is_alive() for t in self._threads),
+                "in_flight": self._in_flight,
+                "processed": self._processed,
+                "failed": self._failed,
+                "stopping": self._stopping.is_set(),
+            }
+
+
+async def run_async_workers(
+    *,
+    queue: Any = None,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    poll_timeout: float = DEFAULT_POLL_TIMEOUT_SEC,
+    stop: Optional[asyncio.Event] = None,
+    drain: bool = False,
+) -> int:
+    """
+    Runs up to `concurrency` jobs at once on the current event loop until
+    `stop` is set (or, with drain=True, until the queue is empty), then
+    waits for the jobs in flight. Returns the number of jobs run.
+
+    For I/O-bound workers (enrich): one process keeps hundreds of jobs
+    waiting on HTTP instead of one per thread.
+    """
+    queue = queue if queue is not None else job_queue
+    stop = stop if stop is not None else asyncio.Event()
+    slots = asyncio.Semaphore(concurrency)
+    in_flight: set = set()
+    processed = 0
+
+    async def _run(job) -> None:
+        nonlocal processed
+        try:
+            result = await dispatch_job_async(job, queue)
+            log.info("job %s finished ok=%s", job.job_id, bool(result.get("ok")))
+        except Exception:
+            log.exception("job %s crashed its worker", job.job_id)
+        finally:
+            processed += 1
+            slots.release()
+
+    while not stop.is_set() or drain:
+        await slots.acquire()
+        # the queue API is blocking; wait for the next job off the loop
+        job = await asyncio.to_thread(queue.dequeue, poll_timeout)
+        if job is None:
+            slots.release()
+            if drain or stop.is_set():
+                break
+            continue
+
+        task = asyncio.create_task(_run(job))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    return processed
+
+
+def worker_threads_from_env() -> int:
+    """
+    JOB_WORKER_THREADS: worker threads started inside the API process
+    (0 = none; run `python -m app.jobs.worker_pool` separately instead).
+    """
+    return int(os.getenv("JOB_WORKER_THREADS", str(DEFAULT_WORKER_THREADS)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Run job workers outside the API process.")
+    ap.add_argument("--concurrency", type=int, default=None,
+                    help=f"threads (default JOB_WORKER_THREADS or {DEFAULT_WORKER_THREADS}); "
+                         f"with --async, jobs in flight (default {DEFAULT_ASYNC_CONCURRENCY})")
+    ap.add_argument("--poll-timeout", type=float, default=DEFAULT_POLL_TIMEOUT_SEC)
+    ap.add_argument("--drain-timeout", type=float, default=60.0,
+                    help="seconds to let running jobs finish on SIGTERM/SIGINT")
+    ap.add_argument("--exit-when-empty", action="store_true",
+                    help="process the backlog, then exit")
+    ap.add_argument("--async", dest="use_async", action="store_true",
+                    help="run jobs on one event loop (--concurrency jobs in flight) "
+                         "instead of threads")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s"
+    )
+
+    if args.use_async:
+        args.concurrency = args.concurrency or DEFAULT_ASYNC_CONCURRENCY
+        return asyncio.run(_main_async(args))
+    args.concurrency = args.concurrency or worker_threads_from_env() or DEFAULT_WORKER_THREADS
+
+    pool = WorkerPool(concurrency=args.concurrency, poll_timeout=args.poll_timeout)
+    stop = threading.Event()
+
+    def _on_signal(signum, frame) -> None:
+        log.info("signal %s: finishing running jobs", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    pool.start()
+    if args.exit_when_empty:
+        return 0 if pool.stop(drain=True) else 1
+
+    stop.wait()
+    return 0 if pool.stop(drain=False, timeout=args.drain_timeout) else 1
+
+
+async def _main_async(args: argparse.Namespace) -> int:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await run_async_workers(
+        concurrency=args.concurrency,
+        poll_timeout=args.poll_timeout,
+        stop=stop,
+        drain=args.exit_when_empty,
+    )
+    return 0
+
+
+__all__ = [
+    "WorkerPool",
+    "run_async_workers",
+    "worker_threads_from_env",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
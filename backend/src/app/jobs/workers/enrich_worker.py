@@ -1,10 +1,12 @@
 # LOCATION: backend/src/app/jobs/workers/enrich_worker.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Tuple
 
-from app.integrations.youtube_api.client import YouTubeClient, YouTubeAPIError
+from app.integrations.youtube_api.client import YouTubeAPIError, YouTubeClient
 from app.integrations.youtube_api.quota import InMemoryQuota
+from app.jobs.retry import is_retryable
+
 
 def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -19,6 +21,10 @@ def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
     This worker does NOT write to DB directly (keeps it safe + testable).
     Caller decides persistence.
 
+    A transient API error (5xx / 429) is raised at once, so the job is
+    retried later without spending more quota on the remaining steps;
+    other API errors are reported in "errors".
+
     Returns:
       {
         "ok": bool,
@@ -45,13 +51,18 @@ def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
 
     errors: List[str] = []
 
+    def _api_error(e: YouTubeAPIError) -> None:
+        if is_retryable(e):
+            raise e
+        errors.append(str(e))
+
     # 1) channel
     channel = {}
     try:
         quota.charge(1)  # channels.list is typically low unit cost
         channel = yt.channels_me()
     except YouTubeAPIError as e:
-        errors.append(str(e))
+        _api_error(e)
 
     # 2) playlists (cap for safety during early dev)
     playlists: List[Dict[str, Any]] = []
@@ -65,7 +76,7 @@ def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
             if len(playlists) >= cap_playlists:
                 break
     except YouTubeAPIError as e:
-        errors.append(str(e))
+        _api_error(e)
 
     # 3) playlist items (cap per playlist)
     playlist_items: Dict[str, List[Dict[str, Any]]] = {}
@@ -83,7 +94,7 @@ def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
                     break
             playlist_items[pid] = items
     except YouTubeAPIError as e:
-        errors.append(str(e))
+        _api_error(e)
 
     # 4) collect video ids (optional enrichment)
     video_ids: List[str] = []
@@ -106,7 +117,7 @@ def run_enrich(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
             quota.charge(1)
             videos = yt.videos_by_ids(video_ids[:cap_videos])
     except YouTubeAPIError as e:
-        errors.append(str(e))
+        _api_error(e)
 
     snap = quota.snapshot()
 
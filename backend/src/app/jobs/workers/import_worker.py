@@ -1,8 +1,20 @@
 # LOCATION: backend/src/app/jobs/workers/import_worker.py
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from app.data.import_pipeline import (
+    DEFAULT_PERSIST_BATCH,
+    ImportSummary,
+    TakeoutImport,
+    summarize_reports,
+)
+from app.data.parsers.takeout_common import TakeoutParseError
+
+# Accepted shapes of an inline takeout_raw payload
+_RAW_TYPES = (dict, list, str, bytes)
+
 
 def run_import(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -14,10 +26,17 @@ def run_import(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
       - MAY raise only for programmer errors (should be rare)
 
     Expected payload (one of these):
-      A) {"takeout_path": "..."}               # server can read local file
-      B) {"takeout_blob_key": "..."}           # blob_store key (future)
+      A) {"takeout_path": "..."}               # server can read local file / folder / archive
+      B) {"takeout_blob_key": "..."}           # blob_store key of an uploaded export
       C) {"takeout_raw": <dict|list|str>}      # already provided (dev/testing)
 
+    Optional flags: music_only (True), dedupe (True), incremental (True),
+    batch_size (rows per persisted NDJSON blob).
+
+    The export is streamed parse -> music filter -> dedupe -> batch-persist;
+    events are never held in memory or returned. Live counters (files,
+    bytes, rows) are published via context.set_progress while it runs.
+
     Output:
       {"ok": bool, "counts": {...}, "data": {...}, "errors": [...]}
     """
@@ -28,52 +47,79 @@ def run_import(context: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
     takeout_blob_key = payload.get("takeout_blob_key")
     takeout_raw = payload.get("takeout_raw")
 
+    input_error: Optional[str] = None
     if not (takeout_path or takeout_blob_key or takeout_raw is not None):
+        input_error = "missing takeout input (takeout_path | takeout_blob_key | takeout_raw)"
+    elif not (takeout_path or takeout_blob_key) and not isinstance(takeout_raw, _RAW_TYPES):
+        input_error = (
+            f"takeout_raw must be a dict, list or str, not {type(takeout_raw).__name__}"
+        )
+    if input_error is not None:
         return {
             "ok": False,
             "user_id": user_id,
             "counts": {},
             "data": {},
-            "errors": ["missing takeout input (takeout_path | takeout_blob_key | takeout_raw)"],
+            "errors": [input_error],
         }
 
-    # V1 strategy:
-    # - Do NOT try to “be smart” and parse everything right now.
-    # - Return a deterministic structure that downstream code can persist.
-    # - Keep this worker safe: never crash on weird user exports.
-
-    # Minimal canonical outputs (safe placeholders for now)
-    parsed_events: List[Dict[str, Any]] = []
     source: str = "unknown"
+    summary: Optional[ImportSummary] = None
+    importer: Optional[TakeoutImport] = None
 
     try:
+        # lazy: blob_store pulls in settings
+        from app.integrations.storage.blob_store import get_blob_store
+
+        store = get_blob_store()
+        importer = TakeoutImport(
+            user_id=str(user_id or "anonymous"),
+            job_id=str(getattr(context, "job_id", None) or "adhoc"),
+            store=store,
+            music_only=bool(payload.get("music_only", True)),
+            dedupe=bool(payload.get("dedupe", True)),
+            incremental=bool(payload.get("incremental", True)),
+            batch_size=int(payload.get("batch_size") or DEFAULT_PERSIST_BATCH),
+            on_progress=getattr(context, "set_progress", None),
+        )
+
         if takeout_path:
             source = "path"
-            # V1: we don't parse on server yet without validated parser contract.
-            # Keep it deterministic:
-            parsed_events = []
+            summary = importer.run_path(Path(takeout_path))
         elif takeout_blob_key:
             source = "blob"
-            parsed_events = []
-        else:
+            summary = importer.run_blob(takeout_blob_key, store)
+        elif isinstance(takeout_raw, _RAW_TYPES):
             source = "raw"
-            parsed_events = []  # V1: leave raw parse for next gate
+            summary = importer.run_raw(takeout_raw)
 
+    except (FileNotFoundError, TakeoutParseError) as exc:
+        errors.append(f"import failed: {exc}")
     except Exception as exc:
         errors.append(f"import_worker exception: {exc}")
 
+    if summary is None:
+        counts = importer.progress.snapshot() if importer is not None else {}
+        data: Dict[str, Any] = {"source": source}
+    else:
+        counts = summary.progress.snapshot()
+        data = {
+            "source": source,
+            "batch_keys": summary.batch_keys,
+            "reports": summarize_reports(summary.reports),
+            "filter": summary.filter_stats,
+            "elapsed_sec": summary.elapsed_sec,
+        }
+    # kept for callers that read counts["events"]
+    counts["events"] = counts.get("rows_persisted", 0)
+
     return {
         "ok": len(errors) == 0,
         "user_id": user_id,
-        "counts": {
-            "events": len(parsed_events),
-        },
-        "data": {
-            "source": source,
-            "events": parsed_events,
-        },
+        "counts": counts,
+        "data": data,
         "errors": errors,
     }
 
 
-__all__ = ["run_import"]
\ No newline at end of file
+__all__ = ["run_import"]
@@ -1,26 +1,46 @@
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.v1.routes import (
     exports_router,
     health_router,
     imports_router,
+    jobs_router,
+    metrics_router,
     privacy_router,
     rewind_router,
     timeline_router,
 )
+from app.jobs.worker_pool import WorkerPool, worker_threads_from_env
 from app.settings import settings
 
 print(">>> app.main module executing <<<")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # job workers run beside the API unless JOB_WORKER_THREADS=0 (separate worker process)
+    threads = worker_threads_from_env()
+    pool = WorkerPool(concurrency=threads).start() if threads > 0 else None
+    yield
+    if pool is not None:
+        pool.stop(drain=False, timeout=30.0)
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME)
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
     app.include_router(health_router, prefix="/api/v1")
     app.include_router(privacy_router, prefix="/api/v1")
     app.include_router(imports_router, prefix="/api/v1")
     app.include_router(exports_router, prefix="/api/v1")
+    app.include_router(jobs_router, prefix="/api/v1")
     app.include_router(timeline_router, prefix="/api/v1")
     app.include_router(rewind_router, prefix="/api/v1")
+    # unversioned, where Prometheus scrapers look by default
+    app.include_router(metrics_router)
 
     return app
 app = create_app()
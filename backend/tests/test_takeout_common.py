@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.data.parsers.takeout_common import parse_locale_datetime
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Jan 1, 2023, 1:23:45 PM UTC", datetime(2023, 1, 1, 13, 23, 45, tzinfo=timezone.utc)),
+        ("Mar 3, 2022, 9:00:00 AM GMT+01:00", datetime(2022, 3, 3, 8, 0, tzinfo=timezone.utc)),
+        ("Mar 3, 2022, 9:00:00 AM GMT-0530", datetime(2022, 3, 3, 14, 30, tzinfo=timezone.utc)),
+        ("Sep 30, 2024, 11:02:07 PM CEST", datetime(2024, 9, 30, 21, 2, 7, tzinfo=timezone.utc)),
+    ],
+)
+def test_parse_locale_datetime(value, expected):
+    assert parse_locale_datetime(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "Jan 1, 2023, 1:23:45 PM GMT+25:00",
+        "Jan 1, 2023, 1:23:45 PM UTC+99",
+        "Jan 1, 2023, 1:23:45 PM GMT-24",
+        "Jan 1, 2023, 1:23:45 PM GMT+01:75",
+    ],
+)
+def test_parse_locale_datetime_out_of_range_offset(value):
+    assert parse_locale_datetime(value) is None
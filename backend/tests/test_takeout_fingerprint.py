@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from app.data.parsers.takeout_columnar import EventBatch
+from app.data.parsers.takeout_common import FP_SHA256, build_event, make_fingerprint_key
+from app.data.parsers.takeout_fingerprint import fingerprint_batch
+
+
+def _event(occurred_at):
+    return build_event(
+        source_file="watch-history.json",
+        source_kind="json",
+        occurred_at=occurred_at,
+        title="Song",
+        artist="Artist",
+        album=None,
+        raw=None,
+        fingerprint_mode=FP_SHA256,
+    )
+
+
+def test_missing_time_does_not_collide_with_epoch_minus_one():
+    assert make_fingerprint_key(None, "Song", "Artist") != make_fingerprint_key(
+        -1, "Song", "Artist"
+    )
+
+
+def test_fingerprint_batch_matches_single_keys():
+    events = [
+        _event(None),
+        _event(datetime(1969, 12, 31, 23, 59, 59, tzinfo=timezone.utc)),
+        _event(datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)),
+    ]
+    keys = fingerprint_batch(EventBatch.from_events(events))
+    expected = [
+        make_fingerprint_key(ev.occurred_epoch, ev.title, ev.artist, ev.source_file)
+        for ev in events
+    ]
+    assert list(keys) == expected
+    assert len(set(keys)) == 3
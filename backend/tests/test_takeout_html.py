@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from app.data.parsers.takeout_filter import MusicRowFilter
+from app.data.parsers.takeout_html import iter_takeout_html_stream
+
+
+def _entry(i: int, header: str) -> str:
+    return (
+        '<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp">'
+        '<div class="mdl-grid">'
+        '<div class="header-cell mdl-cell mdl-cell--12-col">'
+        f'<p class="mdl-typography--title">{header}<br></p></div>'
+        '<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1">'
+        f'Watched <a href="https://www.youtube.com/watch?v=vid{i:05d}">Song {i}</a><br>'
+        f'<a href="https://www.youtube.com/channel/UC{i:05d}">Artist {i}</a><br>'
+        "Jan 2, 2024, 3:04:05 PM UTC</div>"
+        '<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1 '
+        'mdl-typography--text-right"></div>'
+        "</div></div>"
+    )
+
+
+def _document(n: int) -> str:
+    # only the header-cell marks these rows as music: no music URL, Topic or VEVO
+    entries = [_entry(i, "YouTube Music" if i % 3 else "YouTube") for i in range(n)]
+    return "<html><body>" + "".join(entries) + "</body></html>"
+
+
+def _titles(doc: str, chunk_size: int) -> list:
+    row_filter = MusicRowFilter()
+    events = iter_takeout_html_stream(
+        io.StringIO(doc), "watch-history.html", chunk_size=chunk_size, row_filter=row_filter
+    )
+    return [ev.title for ev in events]
+
+
+@pytest.mark.parametrize("chunk_size", [64, 333, 4096, 1 << 20])
+def test_music_header_survives_buffer_edges(chunk_size):
+    doc = _document(300)
+    expected = [f"Song {i}" for i in range(300) if i % 3]
+    assert _titles(doc, chunk_size) == expected